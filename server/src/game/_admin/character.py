@@ -2,6 +2,7 @@
 from django.contrib import admin
 
 from game import models
+from .mixins import ReadOnlyInlineMixin, CachedChoicesInlineMixin
 
 
 @admin.register(models.Persona)
@@ -14,9 +15,14 @@ class AbilityAdmin(admin.ModelAdmin):
     pass
 
 
-class CharacterAbilityInlineAdmin(admin.TabularInline):
+class CharacterAbilityInlineAdmin(CachedChoicesInlineMixin, admin.TabularInline):
     model = models.CharacterAbility
     extra = 0
+    cached_choices_fields = ('ability', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('ability', 'character__player',
+                                                            'character__persona', 'character__game')
 
 
 @admin.register(models.Objective)
@@ -24,24 +30,79 @@ class ObjectiveAdmin(admin.ModelAdmin):
     pass
 
 
-class CharacterObjectiveInlineAdmin(admin.TabularInline):
+class CharacterObjectiveInlineAdmin(CachedChoicesInlineMixin, admin.TabularInline):
     model = models.CharacterObjective
     extra = 0
+    cached_choices_fields = ('objective', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('objective', 'character__player',
+                                                            'character__persona', 'character__game')
 
-class CharacterWeaponInlineAdmin(admin.TabularInline):
+class CharacterWeaponInlineAdmin(CachedChoicesInlineMixin, admin.TabularInline):
     model = models.CharacterWeapon
     extra = 0
+    fields = ('weapon', 'ammo', 'picked_at')
+    readonly_fields = ('picked_at', )
+    cached_choices_fields = ('weapon', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('picked_at__room', 'picked_at__game')
+
+
+class MessageRecipientInlineAdmin(ReadOnlyInlineMixin, admin.TabularInline):
+    model = models.MessageRecipient
+    fields = ('received_on', 'text', 'read')
+    ordering = ('-message__received_on', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('message', 'character__player',
+                                                            'character__persona', 'character__game')
+
+    def received_on(self, receipt):
+        return receipt.message.received_on
+
+    def text(self, receipt):
+        return receipt.message.text
+
+
+class NightActionInlineAdmin(ReadOnlyInlineMixin, admin.TabularInline):
+    model = models.NightAction
+    fk_name = 'character'
+    fields = ('night_turn', 'action', 'confirmed', 'character_target', 'room_target', 'weapon_target')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'character__persona', 'night_turn__night__game', 'weapon_target',
+            'character_target__player', 'character_target__persona', 'character_target__game',
+            'room_target__room', 'room_target__game',
+        )
 
 
 @admin.register(models.Character)
 class CharacterAdmin(admin.ModelAdmin):
+    list_select_related = ('player', 'persona', 'game')
+    list_filter = ('alive', )
+    raw_id_fields = ('game', 'player', 'current_room')
     inlines = [
         CharacterAbilityInlineAdmin,
         CharacterObjectiveInlineAdmin,
-        CharacterWeaponInlineAdmin
+        CharacterWeaponInlineAdmin,
+        NightActionInlineAdmin,
+        MessageRecipientInlineAdmin,
     ]
 
 
 class CharacterInlineAdmin(admin.TabularInline):
     model = models.Character
     extra = 0
+    show_change_link = True
+    fields = ('player', 'persona', 'alive', 'hidden', 'turns_to_die', 'current_room')
+    readonly_fields = ('player', 'persona', 'current_room')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('player', 'persona', 'game',
+                                                            'current_room__room', 'current_room__game')
+
+    def has_add_permission(self, request):
+        return False
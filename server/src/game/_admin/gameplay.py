@@ -9,6 +9,9 @@ from .stage import NightInlineAdmin
 
 @admin.register(models.Game)
 class GameAdmin(admin.ModelAdmin):
+    list_select_related = ('created_by', )
+    list_display = ('__str__', 'created_by', 'created_on')
+    raw_id_fields = ('created_by', 'starting_room', 'current_night', 'current_day')
     inlines = [
         NightInlineAdmin,
         CharacterInlineAdmin,
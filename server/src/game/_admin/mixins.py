@@ -0,0 +1,35 @@
+
+
+class ReadOnlyInlineMixin:
+    """
+    Inline for append-only game records, rendered without any form widgets
+    """
+    extra = 0
+    can_delete = False
+
+    def get_readonly_fields(self, request, obj=None):
+        return self.fields
+
+    def has_add_permission(self, request):
+        return False
+
+
+class CachedChoicesInlineMixin:
+    """
+    Inline that loads the choices of its catalog foreign keys once per request,
+    instead of once per inline row.
+    """
+    cached_choices_fields = ()
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name not in self.cached_choices_fields or request is None:
+            return formfield
+
+        cache = request.__dict__.setdefault('_cached_choices', {})
+        key = (self.model, db_field.name)
+        if key not in cache:
+            cache[key] = list(formfield.choices)
+
+        formfield.choices = cache[key]
+        return formfield
@@ -12,7 +12,18 @@ class RoomAdmin(admin.ModelAdmin):
 class GameRoomInlineAdmin(admin.TabularInline):
     model = models.GameRoom
     extra = 0
+    fields = ('room', 'is_open', 'weapons')
+    readonly_fields = ('room', )
+    raw_id_fields = ('weapons', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('room', 'game').prefetch_related('weapons')
+
+    def has_add_permission(self, request):
+        return False
 
 @admin.register(models.GameRoom)
 class GameRoomAdmin(admin.ModelAdmin):
+    list_select_related = ('room', 'game')
+    raw_id_fields = ('game', )
     filter_horizontal = ('weapons', )
@@ -0,0 +1,46 @@
+from functools import wraps
+
+from django.contrib import admin
+
+from game.sharding import is_sharded, shards, using_shard
+
+
+class ShardAdminSite(admin.AdminSite):
+    """
+    Admin of the games on one shard, serving every view from that shard
+    """
+
+    def __init__(self, alias):
+        super().__init__(name='admin-{}'.format(alias))
+        self.alias = alias
+        self.site_header = '{} ({})'.format(admin.site.site_header, alias)
+
+    def admin_view(self, view, cacheable=False):
+        view = super().admin_view(view, cacheable)
+
+        @wraps(view)
+        def shard_view(request, *args, **kwargs):
+            with using_shard(self.alias):
+                response = view(request, *args, **kwargs)
+                # the templates query the shard while they render
+                if hasattr(response, 'render'):
+                    response.render()
+                return response
+        return shard_view
+
+
+def register_shard_sites(site=admin.site):
+    """
+    Moves the sharded models of `site` to an admin site per shard, leaving it
+    with the catalog and the users. Returns the shard sites.
+    """
+    sites = [ShardAdminSite(alias) for alias in shards()]
+    if not sites:
+        return sites
+
+    for (model, model_admin) in list(site._registry.items()):
+        if is_sharded(model):
+            site.unregister(model)
+            for shard_site in sites:
+                shard_site.register(model, type(model_admin))
+    return sites
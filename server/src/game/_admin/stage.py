@@ -7,13 +7,22 @@ from game import models
 class NightInlineAdmin(admin.TabularInline):
     model = models.Night
     extra = 0
+    readonly_fields = ('current_turn', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('game', 'current_turn__night__game')
 
 class NightTurnInLineAdmin(admin.TabularInline):
     model = models.NightTurn
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('night__game')
+
 @admin.register(models.Night)
 class NightAdmin(admin.ModelAdmin):
+    list_select_related = ('game', )
+    raw_id_fields = ('game', 'current_turn')
     inlines = [
         NightTurnInLineAdmin,
     ]
@@ -0,0 +1,63 @@
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import Character, CharacterWeapon, NightAction, NightTurn, Weapon
+from game.models.stage import NightActions
+
+
+class AdminQueriesTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        User.objects.filter(pk=self.owner.pk).update(is_staff=True, is_superuser=True)
+        self.client.force_login(self.owner)
+        self.game.start()
+
+    def count_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def grow_game(self, character):
+        night = self.game.current_night
+        knife = Weapon.objects.get(name='Knife')
+        for target in self.game.characters.exclude(pk=character.pk):
+            character.post_message('hello {}'.format(target.pk))
+            CharacterWeapon.objects.create(character=character, weapon=knife)
+            # characters select one action per turn
+            turn = NightTurn.objects.create(night=night, number=night.night_turns.count() + 1)
+            NightAction.objects.create(night_turn=turn, character=character, action=NightActions.MOVE,
+                                       character_target=target, room_target=target.current_room)
+
+    def test_character_change_page_queries_are_bounded(self):
+        character = self.game.characters.order_by('pk')[0]
+        url = '/admin/game/character/{}/change/'.format(character.pk)
+
+        self.grow_game(character)
+        before = self.count_queries(url)
+        self.grow_game(character)
+        self.assertEqual(self.count_queries(url), before)
+
+    def test_changelists_queries_are_bounded(self):
+        for model in ('character', 'game', 'gameroom', 'night'):
+            url = '/admin/game/{}/'.format(model)
+            before = self.count_queries(url)
+            self.game.pk = None
+            self.game.save()
+            Character.objects.bulk_create([Character(game=self.game, player=self.owner, persona=c.persona)
+                                           for c in Character.objects.all()[:3]])
+            self.assertEqual(self.count_queries(url), before, url)
+
+    def test_game_change_page_queries_are_bounded(self):
+        url = '/admin/game/game/{}/change/'.format(self.game.pk)
+        self.game.next_stage()
+        before = self.count_queries(url)
+        self.game.next_stage()
+        self.game.next_stage()
+        self.assertEqual(self.count_queries(url), before)
@@ -0,0 +1,98 @@
+import json
+import random
+
+from .utils import DefaultGameModeTestCase
+
+from game.bots import Bot, GreedyPolicy, play
+from game.models import Night, NightAction
+from game.models.stage import NightActions
+
+
+class ActionEndpointsTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.character = self.game.characters.order_by('pk')[0]
+        self.client.force_login(self.character.player)
+        self.url = '/api/games/{}/actions/'.format(self.game.pk)
+
+    def post(self, url, data=None):
+        response = self.client.post(url, json.dumps(data or {}), content_type='application/json')
+        return response, json.loads(response.content.decode('utf-8'))
+
+    def test_submit_requires_a_player(self):
+        self.client.logout()
+        response, _ = self.post(self.url, {'action': NightActions.ATTACK_BLANK})
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('Deprecated', response['Warning'])
+
+    def test_submit_rejects_unknown_actions_and_targets(self):
+        response, _ = self.post(self.url, {'action': 'dance'})
+        self.assertEqual(response.status_code, 400)
+
+        response, body = self.post(self.url, {'action': NightActions.MOVE, 'room_target': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(body['error'], 'invalid room_target')
+
+    def test_pending_action_is_replaced_until_confirmed(self):
+        _, first = self.post(self.url, {'action': NightActions.ATTACK_BLANK})
+        response, second = self.post(self.url, {'action': NightActions.ATTACK_DEFEND})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(first['id'], second['id'])
+        self.assertEqual(NightAction.objects.get(pk=second['id']).action, NightActions.ATTACK_DEFEND)
+
+        response, body = self.post('{}{}/confirm/'.format(self.url, second['id']))
+        self.assertEqual(body, {'confirmed': True, 'complete': False})
+        self.assertEqual(response['Warning'],
+                         '299 - "Deprecated, use /api/games/{}/turn/"'.format(self.game.pk))
+
+        response, _ = self.post(self.url, {'action': NightActions.ATTACK_BLANK})
+        self.assertEqual(response.status_code, 409)
+
+    def test_submit_never_undoes_a_confirmation(self):
+        turn = self.game.current_night.current_turn
+        NightAction.objects.bulk_create([NightAction(night_turn=turn, character=self.character,
+                                                     action=NightActions.ATTACK_DEFEND, confirmed=True)])
+
+        response, body = self.post(self.url, {'action': NightActions.ATTACK_BLANK})
+        self.assertEqual(response.status_code, 409)
+        action = NightAction.objects.get(night_turn=turn, character=self.character)
+        self.assertEqual((action.action, action.confirmed), (NightActions.ATTACK_DEFEND, True))
+
+    def test_only_actions_of_the_current_turn_are_confirmed(self):
+        _, body = self.post(self.url, {'action': NightActions.ATTACK_BLANK})
+        Night.objects.get(pk=self.game.current_night_id).next_turn()
+
+        response, _ = self.post('{}{}/confirm/'.format(self.url, body['id']))
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(NightAction.objects.get(pk=body['id']).confirmed)
+
+    def test_only_the_owner_ends_the_day(self):
+        other = self.game.characters.exclude(player=self.owner)[0]
+        self.client.force_login(other.player)
+        response, _ = self.post('/api/games/{}/day/end/'.format(self.game.pk))
+        self.assertEqual(response.status_code, 403)
+
+
+class BotTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+
+    def test_bot_acts_once_per_turn(self):
+        character = self.game.characters.order_by('pk')[0]
+        bot = Bot(character.player, self.game.pk, GreedyPolicy(random.Random(0)))
+
+        self.assertTrue(bot.step())
+        self.assertTrue(bot.step())
+
+        self.assertEqual(bot.stats['actions'], 1)
+        self.assertEqual(NightAction.objects.filter(character=character, confirmed=True).count(), 1)
+
+    def test_bots_play_a_game_to_completion(self):
+        stats = play(self.game, policy='greedy', max_steps=2000, seed=1)
+
+        self.assertTrue(stats['complete'])
+        self.assertGreater(stats['actions'], 0)
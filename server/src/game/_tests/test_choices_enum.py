@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test import TestCase
+
+from utils import ChoicesEnum
+
+from game.models import NightAction, Room, RoomType, WeaponType
+from game.models.stage import NightActions
+from .utils import DefaultGameModeTestCase
+
+
+class ChoicesEnumTestCase(TestCase):
+
+    def test_each_enum_keeps_its_own_choices(self):
+        class First(ChoicesEnum):
+            A = 'a'
+
+        class Second(ChoicesEnum):
+            B = 'b'
+            C = 'c'
+
+        self.assertEqual(First.choices(), (('a', 'A'), ))
+        self.assertEqual(Second.choices(), (('b', 'B'), ('c', 'C')))
+        self.assertEqual(WeaponType.values(), ('gun', 'knife', 'stunt', 'poison'))
+
+    def test_codes_follow_declaration_order(self):
+        self.assertEqual(WeaponType.to_code(WeaponType.GUN), 1)
+        self.assertEqual(WeaponType.from_code(4), WeaponType.POISON)
+        self.assertIs(WeaponType.choices(), WeaponType.choices())
+
+
+class ChoicesEnumFieldTestCase(DefaultGameModeTestCase):
+
+    def test_values_are_stored_as_codes(self):
+        self.game.start()
+        turn = self.game.current_night.current_turn
+        character = self.game.characters.first()
+        action = NightAction.objects.create(night_turn=turn, character=character, action=NightActions.MOVE)
+
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT action FROM game_nightaction WHERE id = %s', [action.pk])
+            self.assertEqual(cursor.fetchone()[0], NightActions.to_code(NightActions.MOVE))
+
+        action = NightAction.objects.get(pk=action.pk)
+        self.assertEqual(action.action, NightActions.MOVE)
+        self.assertEqual(action.get_action_display(), 'MOVE')
+        self.assertTrue(NightAction.objects.filter(action__in=[NightActions.MOVE]).exists())
+
+    def test_fixtures_load_enum_values(self):
+        self.assertEqual(Room.objects.get(name='Hall').room_type, RoomType.HALL)
+        self.assertEqual(Room.objects.filter(room_type=RoomType.HALL).count(), 1)
@@ -0,0 +1,60 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.bots import play
+from game.cloning import CLONED
+from game.models import Game, GameMessage, NightAction, MessageRecipient
+from game.replay import outcome
+
+
+def statements(queries, kind):
+    return len([query for query in queries if query['sql'].startswith(kind)])
+
+
+class CloneTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+
+    def rows(self, game):
+        return [model.objects.filter(**{path: game.pk}).count() for (model, path) in CLONED]
+
+    def test_clone_is_an_exact_copy(self):
+        play(self.game, policy='greedy', max_steps=60, seed=1)
+        game = Game.objects.get(pk=self.game.pk)
+
+        clone = game.clone()
+        self.assertNotEqual(clone.pk, game.pk)
+        self.assertEqual(outcome(clone), outcome(game))
+        self.assertEqual(self.rows(clone), self.rows(game))
+        self.assertEqual(clone.current_night.game_id, clone.pk)
+        self.assertEqual(clone.current_night.number, game.current_night.number)
+        self.assertFalse(NightAction.objects.filter(night_turn__night__game=clone)
+                                            .exclude(character__game=clone).exists())
+        self.assertFalse(MessageRecipient.objects.filter(message__game=clone)
+                                                 .exclude(character__game=clone).exists())
+
+    def test_clone_can_be_played(self):
+        clone = self.game.clone()
+        stats = play(clone, policy='greedy', max_steps=2000, seed=1)
+        self.assertTrue(stats['complete'])
+        self.assertEqual(Game.objects.get(pk=self.game.pk).current_night.number, 0)
+
+    def test_queries_do_not_depend_on_the_game_size(self):
+        play(self.game, policy='greedy', max_steps=60, seed=1)
+        game = Game.objects.get(pk=self.game.pk)
+        with CaptureQueriesContext(connection) as small:
+            game.clone()
+
+        characters = list(game.characters.all())
+        for n in range(50):
+            GameMessage.objects.post(game, characters, 'message {}'.format(n))
+        with CaptureQueriesContext(connection) as large:
+            game.clone()
+
+        # reads are one per table, and inserts grow with batches, not with rows
+        self.assertEqual(statements(large, 'SELECT'), statements(small, 'SELECT'))
+        self.assertLessEqual(statements(large, 'INSERT'), statements(small, 'INSERT') + 3)
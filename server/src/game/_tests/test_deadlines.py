@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .utils import DefaultGameModeTestCase
+
+from game.deadlines import DeadlineScheduler, DeadlineWorker, expire
+from game.models import CharacterWeapon, Game, GameState, NightAction, Terror
+from game.models.stage import NightActions
+from game.modes import DefaultGameMode
+from mansion import settings
+
+
+class DeadlineSchedulerTestCase(DefaultGameModeTestCase):
+
+    def test_entries_pop_in_deadline_order(self):
+        now = timezone.now()
+        scheduler = DeadlineScheduler()
+        scheduler.schedule(1, now + timedelta(seconds=5))
+        scheduler.schedule(2, now - timedelta(seconds=5))
+        scheduler.schedule(3, now)
+
+        self.assertFalse(scheduler.schedule(3, now))
+        self.assertEqual([game_id for (deadline, game_id) in scheduler.due(now)], [2, 3])
+        self.assertEqual(len(scheduler), 1)
+
+
+class DeadlineTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.game.refresh_from_db()
+
+    def after(self, game):
+        return Game.objects.get(pk=game.pk).deadline + timedelta(seconds=1)
+
+    def test_stages_get_a_deadline(self):
+        expected = timezone.now() + timedelta(seconds=settings.GAME_TURN_TIMEOUT)
+        self.assertAlmostEqual(self.game.deadline.timestamp(), expected.timestamp(), delta=5)
+
+    def test_nothing_expires_before_the_deadline(self):
+        self.assertEqual(DeadlineWorker().tick(), [])
+
+    def test_expired_turn_is_resolved_with_idle_characters_passing(self):
+        turn = self.game.current_night.current_turn
+        character = self.game.characters.order_by('pk')[0]
+        NightAction.objects.create(night_turn=turn, character=character, action=NightActions.ATTACK_DEFEND)
+
+        self.assertEqual(DeadlineWorker().tick(self.after(self.game)), [self.game.pk])
+
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.current_night.current_turn.number, 2)
+        self.assertEqual(turn.actions.confirmed().count(), 10)
+        self.assertEqual(turn.actions.get(character=character).action, NightActions.ATTACK_DEFEND)
+        self.assertEqual(turn.actions.filter(action=NightActions.ATTACK_BLANK).count(), 9)
+
+    def test_expired_day_ends(self):
+        for i in range(settings.GAME_NIGHT_TURNS):
+            DeadlineWorker().tick(self.after(self.game))
+        self.game.refresh_from_db()
+        self.assertIsNotNone(self.game.current_day)
+
+        DeadlineWorker().tick(self.after(self.game))
+        self.game.refresh_from_db()
+        self.assertIsNone(self.game.current_day)
+        self.assertEqual(self.game.current_night.number, 1)
+
+    def test_only_expired_games_advance(self):
+        other = DefaultGameMode.create(self.owner, self.players)
+        other.start()
+        Game.objects.filter(pk=other.pk).update(deadline=timezone.now() + timedelta(days=1))
+
+        self.assertEqual(DeadlineWorker().tick(self.after(self.game)), [self.game.pk])
+
+    def test_games_that_moved_on_are_skipped(self):
+        deadline = self.game.deadline
+        self.game.schedule_deadline(60)
+        self.assertFalse(expire(self.game.pk, deadline))
+
+    def test_completed_games_lose_their_deadline(self):
+        worker = DeadlineWorker()
+        while Game.objects.get(pk=self.game.pk).deadline is not None:
+            worker.tick(self.after(self.game))
+
+        self.game.refresh_from_db()
+        self.assertEqual(self.game.nights.count(), settings.GAME_NUMBER_NIGHTS)
+
+    def test_finished_games_lose_their_deadline(self):
+        self.game.finish()
+        self.assertIsNone(Game.objects.get(pk=self.game.pk).deadline)
+
+    def test_finished_games_are_not_expired(self):
+        deadline = self.game.deadline
+        Game.objects.filter(pk=self.game.pk).update(state=GameState.COMPLETE)
+
+        self.assertFalse(expire(self.game.pk, deadline))
+        self.assertFalse(NightAction.objects.filter(night_turn__night__game=self.game).exists())
+
+    def test_resolved_turns_are_not_expired_again(self):
+        turn = self.game.current_night.current_turn
+        NightAction.objects.bulk_create(
+            NightAction(night_turn=turn, character=character, action=NightActions.ATTACK_BLANK,
+                        confirmed=True)
+            for character in self.game.characters.all()
+        )
+        terrors = Terror.objects.count()
+        weapons = CharacterWeapon.objects.filter(character__game=self.game)
+        ammo = sorted(weapons.values_list('pk', 'ammo'))
+
+        self.assertFalse(expire(self.game.pk, self.game.deadline))
+        self.assertIsNone(Game.objects.get(pk=self.game.pk).deadline)
+        self.assertEqual(Terror.objects.count(), terrors)
+        self.assertEqual(sorted(weapons.values_list('pk', 'ammo')), ammo)
+        self.assertEqual(Game.objects.get(pk=self.game.pk).current_night.current_turn, turn)
@@ -0,0 +1,84 @@
+import csv
+import gzip
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+
+from .utils import DefaultGameModeTestCase
+
+from game.export import Exporter
+from game.models import CharacterObjective, GameMessage
+from game.modes import DefaultGameMode
+
+
+def read_csv(path):
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as exported:
+        return list(csv.reader(exported))
+
+
+class ExportTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        for i in range(5):
+            self.game.broadcast_message('message {}'.format(i))
+
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = os.path.join(self.directory, 'checkpoint.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        super().tearDown()
+
+    def path(self, name, extension='csv'):
+        return os.path.join(self.directory, '{}.{}.gz'.format(name, extension))
+
+    def test_csv_export(self):
+        exporter = Exporter(self.directory, chunk_size=3)
+        stats = exporter.run(['objectives', 'messages'])
+
+        rows = read_csv(self.path('messages'))
+        self.assertEqual(rows[0][:2], ['id', 'game'])
+        self.assertEqual(len(rows) - 1, GameMessage.objects.count())
+        self.assertEqual(len(read_csv(self.path('objectives'))) - 1, CharacterObjective.objects.count())
+        self.assertEqual(stats['rows'], GameMessage.objects.count() + CharacterObjective.objects.count())
+        self.assertGreater(exporter.rows_per_second, 0)
+
+    def test_jsonl_export(self):
+        Exporter(self.directory, fmt='jsonl').run(['messages'])
+
+        with gzip.open(self.path('messages', 'jsonl'), 'rt', encoding='utf-8') as exported:
+            rows = [json.loads(line) for line in exported]
+        self.assertEqual([row['id'] for row in rows],
+                         list(GameMessage.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual(rows[-1]['message'], 'message 4')
+
+    def test_resume_from_checkpoint(self):
+        Exporter(self.directory, chunk_size=2, checkpoint=self.checkpoint).run(['messages'])
+
+        # an interrupted run leaves a partial chunk behind
+        with open(self.path('messages'), 'ab') as exported:
+            exported.write(b'partial chunk')
+        self.game.broadcast_message('message 5')
+
+        stats = Exporter(self.directory, chunk_size=2, checkpoint=self.checkpoint).run(['messages'])
+        self.assertEqual(stats['rows'], 1)
+
+        rows = read_csv(self.path('messages'))
+        self.assertEqual([int(row[0]) for row in rows[1:]],
+                         list(GameMessage.objects.order_by('pk').values_list('pk', flat=True)))
+
+    def test_game_range(self):
+        User.objects.create(username='other')
+        other = DefaultGameMode.create(self.owner, self.players)
+        other.start()
+        other.broadcast_message('elsewhere')
+
+        Exporter(self.directory, games=(other.pk, other.pk)).run(['messages'])
+        rows = read_csv(self.path('messages'))
+        self.assertEqual(set(row[1] for row in rows[1:]), {str(other.pk)})
+        self.assertEqual(len(rows) - 1, GameMessage.objects.filter(game=other).count())
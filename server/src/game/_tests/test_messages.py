@@ -0,0 +1,67 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import GameMessage, MessageRecipient, MessageTemplates
+from game.models.message import TEMPLATE_TEXTS
+
+
+class MessagesTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        # starting may reveal characters to each other, depending on the seed
+        GameMessage.objects.all().delete()
+        self.character = self.game.characters.order_by('pk')[0]
+
+    def test_broadcast_is_stored_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.game.broadcast_message('The lights go out')
+
+        inserts = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(GameMessage.objects.count(), 1)
+        self.assertEqual(GameMessage.objects.get().recipients.count(), 10)
+
+    def test_templates_are_rendered_when_read(self):
+        message = self.character.post_message(template=MessageTemplates.OUT_OF_AMMO, weapon='Gun')
+
+        message = GameMessage.objects.get(pk=message.pk)
+        self.assertEqual(message.message, '')
+        self.assertEqual(message.text, 'Your Gun is out of ammo')
+        self.assertEqual(list(self.character.messages.all()), [message])
+
+    def test_free_text_messages(self):
+        message = self.character.post_message('Welcome to the mansion')
+        self.assertIsNone(message.template)
+        self.assertEqual(message.text, 'Welcome to the mansion')
+
+    def test_free_text_is_never_taken_for_a_template(self):
+        for text in (TEMPLATE_TEXTS[MessageTemplates.OUT_OF_AMMO], MessageTemplates.OUT_OF_AMMO):
+            message = self.character.post_message(text)
+            self.assertIsNone(message.template)
+            self.assertEqual(GameMessage.objects.get(pk=message.pk).text, text)
+
+    def test_mark_read(self):
+        first = self.character.post_message('first')
+        self.character.post_message('second')
+
+        self.assertEqual(MessageRecipient.objects.mark_read(self.character, [first.pk]), 1)
+        self.assertEqual(MessageRecipient.objects.mark_read(self.character), 1)
+        self.assertFalse(MessageRecipient.objects.filter(character=self.character, read=False).exists())
+
+    def test_message_endpoints(self):
+        self.character.post_message(template=MessageTemplates.WEAPON_UNAVAILABLE, weapon='Knife')
+        self.client.force_login(self.character.player)
+        url = '/api/games/{}/messages/'.format(self.game.pk)
+
+        listed = json.loads(self.client.get(url).content.decode('utf-8'))['messages']
+        self.assertEqual(listed[0]['text'], 'The Knife was no longer there')
+        self.assertFalse(listed[0]['read'])
+
+        response = self.client.post(url + 'read/', '', content_type='application/json')
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['read'], len(listed))
@@ -0,0 +1,160 @@
+import json
+from unittest import mock
+
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.exceptions import IllegalMove
+from game.models import Character, CharacterWeapon, Game, GameRoom, NightAction, Weapon
+from game.models.stage import NightActions, NightTurn
+from game.moves import LegalMoves
+
+
+class LegalMovesTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.character = self.game.characters.order_by('pk')[0]
+        self.rooms = set(GameRoom.objects.filter(game=self.game).values_list('pk', flat=True))
+
+    def test_moves_from_nowhere(self):
+        moves = LegalMoves.for_character(self.character)
+
+        self.assertIn(NightActions.ATTACK_DEFEND, moves)
+        self.assertNotIn(NightActions.PICK_WEAPON, moves)
+        self.assertEqual(set(moves.as_dict()[NightActions.MOVE]['room_target']), self.rooms)
+
+    def test_moves_between_connected_rooms(self):
+        game_room = GameRoom.objects.filter(game=self.game).select_related('room')[0]
+        self.character.move(game_room)
+
+        connected = set(GameRoom.objects.filter(game=self.game, room__in=game_room.room.connections.all())
+                                        .values_list('pk', flat=True))
+        moves = LegalMoves.for_character(Character.objects.get(pk=self.character.pk))
+        self.assertEqual(set(moves.as_dict()[NightActions.MOVE]['room_target']), connected)
+
+    def test_attacks_need_a_room(self):
+        CharacterWeapon.objects.create(character=self.character, weapon=Weapon.objects.get(name='Knife'))
+        self.assertNotIn(NightActions.ATTACK_KILL, LegalMoves.for_character(self.character))
+
+        self.game.characters.update(current_room=GameRoom.objects.filter(game=self.game)[0])
+        moves = LegalMoves.for_character(Character.objects.get(pk=self.character.pk))
+        self.assertIn(NightActions.ATTACK_KILL, moves)
+
+    def test_the_dead_may_only_move_or_pass(self):
+        Character.objects.filter(pk=self.character.pk).update(alive=False)
+        moves = LegalMoves.for_character(Character.objects.get(pk=self.character.pk))
+        self.assertEqual(moves.actions(), sorted([NightActions.ATTACK_BLANK, NightActions.MOVE]))
+
+    def test_checks_need_no_queries(self):
+        moves = LegalMoves.for_character(self.character)
+        with self.assertNumQueries(0):
+            for intent in ({'action': 'dance'},
+                           {'action': NightActions.MOVE},
+                           {'action': NightActions.MOVE, 'room_target': 0},
+                           {'action': NightActions.MOVE, 'room_target': [1]}):
+                with self.assertRaises(IllegalMove):
+                    moves.check(intent)
+
+            room = min(self.rooms)
+            self.assertEqual(moves.check({'action': NightActions.MOVE, 'room_target': room}),
+                             (NightActions.MOVE, {'character_target': None, 'room_target': room,
+                                                  'weapon_target': None}))
+
+
+class CachedLegalMovesTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.character = self.game.characters.order_by('pk')[0]
+
+    def fetch(self):
+        return Character.objects.select_related('game__current_night').get(pk=self.character.pk)
+
+    def test_repeated_calls_are_free(self):
+        moves = self.fetch().available_actions()
+
+        character = self.fetch()
+        with self.assertNumQueries(0):
+            self.assertEqual(character.available_actions().as_dict(), moves.as_dict())
+
+    def test_changes_invalidate_the_cached_moves(self):
+        everywhere = self.fetch().available_actions().as_dict()[NightActions.MOVE]['room_target']
+
+        game_room = GameRoom.objects.filter(game=self.game)[0]
+        self.character.move(game_room)
+        nearby = self.fetch().available_actions().as_dict()[NightActions.MOVE]['room_target']
+        self.assertLess(len(nearby), len(everywhere))
+
+    def test_no_moves_outside_night_turns(self):
+        self.game.next_stage()
+        character = self.fetch()
+        with self.assertNumQueries(0):
+            self.assertEqual(character.available_actions().actions(), [])
+
+
+class PlayTurnTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.url = '/api/games/{}/turn/'.format(self.game.pk)
+
+    def play(self, character, intent):
+        self.client.force_login(character.player)
+        response = self.client.post(self.url, json.dumps(intent), content_type='application/json')
+        return response, json.loads(response.content.decode('utf-8'))
+
+    def test_legal_moves(self):
+        character = self.game.characters.order_by('pk')[0]
+        self.client.force_login(character.player)
+        body = json.loads(self.client.get(self.url).content.decode('utf-8'))
+        self.assertEqual(body['turn'], 1)
+        self.assertIn(NightActions.MOVE, body['moves'])
+
+    def test_turn_is_written_with_a_single_statement(self):
+        character = self.game.characters.order_by('pk')[0]
+        self.client.force_login(character.player)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(self.url, json.dumps({'action': NightActions.ATTACK_BLANK}),
+                             content_type='application/json')
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith(('INSERT', 'UPDATE'))]
+        self.assertEqual(len([sql for sql in writes if 'game_nightaction' in sql]), 1)
+
+        response, body = self.play(character, {'action': NightActions.ATTACK_DEFEND, 'confirm': True})
+        self.assertEqual(body, {'turn': 1, 'confirmed': True, 'complete': False})
+        action = NightAction.objects.get(character=character)
+        self.assertEqual((action.action, action.confirmed), (NightActions.ATTACK_DEFEND, True))
+
+        response, _ = self.play(character, {'action': NightActions.ATTACK_BLANK})
+        self.assertEqual(response.status_code, 409)
+
+    def test_illegal_moves_are_rejected(self):
+        character = self.game.characters.order_by('pk')[0]
+        response, body = self.play(character, {'action': NightActions.MOVE, 'room_target': 0,
+                                               'confirm': True})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(body['error'], 'invalid room_target')
+        self.assertFalse(NightAction.objects.exists())
+
+    def test_turn_advances_once_everyone_played(self):
+        for character in self.game.characters.order_by('pk'):
+            self.play(character, {'action': NightActions.ATTACK_BLANK, 'confirm': True})
+
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.current_night.current_turn.number, 2)
+
+    def test_resolution_errors_are_not_conflicts(self):
+        characters = list(self.game.characters.order_by('pk'))
+        for character in characters[:-1]:
+            self.play(character, {'action': NightActions.ATTACK_BLANK, 'confirm': True})
+
+        with mock.patch.object(NightTurn, 'resolve', side_effect=IntegrityError('resolution failed')):
+            with self.assertRaises(IntegrityError):
+                self.play(characters[-1], {'action': NightActions.ATTACK_BLANK, 'confirm': True})
+        self.assertFalse(NightAction.objects.filter(character=characters[-1]).exists())
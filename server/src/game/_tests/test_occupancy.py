@@ -0,0 +1,113 @@
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import Character, GameRoom, MessageRecipient, MessageTemplates, NightAction, Weapon, Terror
+from game.models.stage import NightActions
+from game.occupancy import RoomOccupancy
+
+
+class OccupancyTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.rooms = list(GameRoom.objects.filter(game=self.game).order_by('pk'))
+        self.characters = list(self.game.characters.order_by('pk'))
+        for (i, character) in enumerate(self.characters):
+            character.current_room = self.rooms[i % 2]
+            character.save()
+
+    def test_occupancy_is_built_with_a_single_query(self):
+        with self.assertNumQueries(1):
+            occupancy = RoomOccupancy.for_game(self.game)
+            for room in self.rooms:
+                occupancy.characters(room)
+
+        self.assertEqual(len(occupancy.characters(self.rooms[0])), 5)
+        self.assertEqual(occupancy.characters(self.rooms[2]), [])
+
+    def test_occupancy_splits_living_hidden_and_dead(self):
+        room = self.rooms[0]
+        dead, hidden = self.characters[0], self.characters[2]
+        Character.objects.filter(pk=dead.pk).update(alive=False)
+        Character.objects.filter(pk=hidden.pk).update(hidden=True)
+
+        occupancy = RoomOccupancy.for_game(self.game)
+        self.assertEqual([c.pk for c in occupancy.dead(room)], [dead.pk])
+        self.assertEqual([c.pk for c in occupancy.hidden(room)], [hidden.pk])
+        self.assertEqual(len(occupancy.living(room)), 4)
+        self.assertEqual(len(occupancy.visible(room)), 3)
+
+    def test_character_move_keeps_occupancy_in_sync(self):
+        character = self.game.characters.order_by('pk')[0]
+        occupancy = self.game.occupancy
+        character.move(self.rooms[3])
+
+        self.assertEqual(occupancy.room_of(character), self.rooms[3].pk)
+        self.assertEqual([c.pk for c in occupancy.characters(self.rooms[3])], [character.pk])
+        self.assertEqual(len(occupancy.characters(self.rooms[0])), 4)
+
+    def test_turn_resolution_moves_characters_with_bounded_queries(self):
+        self.game.start()
+        turn = self.game.current_night.current_turn
+        for character in self.characters[:4]:
+            NightAction.objects.create(night_turn=turn, character=character, action=NightActions.MOVE,
+                                       room_target=self.rooms[4], confirmed=True)
+
+        turn = type(turn).objects.get(pk=turn.pk)
+        with self.assertNumQueries(6):
+            turn.resolve()
+
+        moved = Character.objects.filter(current_room=self.rooms[4]).count()
+        self.assertEqual(moved, 4)
+        self.assertEqual(len(turn.night.game.occupancy.characters(self.rooms[4])), 4)
+
+    def test_intention_weapon_attack_is_announced_to_the_room(self):
+        self.game.start()
+        turn = self.game.current_night.current_turn
+        attacker = self.characters[0]
+        Character.objects.filter(pk=self.characters[2].pk).update(hidden=True)
+
+        NightAction.objects.create(night_turn=turn, character=attacker, action=NightActions.ATTACK_KILL,
+                                   character_target=self.characters[4],
+                                   weapon_target=Weapon.objects.get(name='Knife'))
+
+        told = (MessageRecipient.objects.filter(message__template=MessageTemplates.ATTACK_INTENTION)
+                                        .values_list('character', flat=True))
+        self.assertEqual(set(told), {c.pk for c in self.characters[4::2]})
+
+    def test_terrors_are_detected_for_living_characters_alone_with_ghosts(self):
+        alone, ghost = self.characters[0], self.characters[1]
+        Character.objects.filter(pk=ghost.pk).update(alive=False, current_room=self.rooms[2])
+        Character.objects.filter(pk=alone.pk).update(current_room=self.rooms[2])
+
+        terrors = list(RoomOccupancy.for_game(self.game).terrors())
+        self.assertEqual(len(terrors), 1)
+        (room_id, terrorized, ghosts) = terrors[0]
+        self.assertEqual(room_id, self.rooms[2].pk)
+        self.assertEqual(terrorized.pk, alone.pk)
+        self.assertEqual([g.pk for g in ghosts], [ghost.pk])
+
+    def test_hidden_characters_are_not_terrorized_nor_protect_others(self):
+        alone, hidden, ghost = self.characters[:3]
+        Character.objects.filter(pk__in=(alone.pk, hidden.pk, ghost.pk)).update(current_room=self.rooms[2])
+        Character.objects.filter(pk=ghost.pk).update(alive=False)
+        Character.objects.filter(pk=hidden.pk).update(hidden=True)
+
+        terrors = list(RoomOccupancy.for_game(self.game).terrors())
+        self.assertEqual([t[1].pk for t in terrors], [alone.pk])
+
+    def test_turn_resolution_records_terrors_in_bulk(self):
+        self.game.start()
+        turn = self.game.current_night.current_turn
+        ghosts = self.characters[1:3]
+        Character.objects.filter(pk__in=[g.pk for g in ghosts]).update(alive=False,
+                                                                      current_room=self.rooms[2])
+        NightAction.objects.create(night_turn=turn, character=self.characters[0], action=NightActions.MOVE,
+                                   room_target=self.rooms[2], confirmed=True)
+
+        turn = type(turn).objects.get(pk=turn.pk)
+        with self.assertNumQueries(8):
+            turn.resolve()
+
+        terrors = Terror.objects.filter(terrorized=self.characters[0], room=self.rooms[2].room)
+        self.assertEqual(set(terrors.values_list('ghost', flat=True)), {g.pk for g in ghosts})
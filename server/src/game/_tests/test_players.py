@@ -0,0 +1,102 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import Client
+
+from .utils import DefaultGameModeTestCase
+
+from game.exceptions import InvalidToken
+from game.models import NightAction
+from game.models.stage import NightActions
+from game.modes import DefaultGameMode
+from game.players import PlayerToken, create_guests, issue_token, issue_tokens, verify_token
+
+
+class PlayerTokenTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.character = self.game.characters.order_by('pk')[0]
+        self.token = issue_token(self.character.player_id, self.game.pk, self.character.pk)
+        self.client = Client(enforce_csrf_checks=True, HTTP_AUTHORIZATION='Bearer ' + self.token)
+
+    def test_verify(self):
+        with self.assertNumQueries(0):
+            player = verify_token(self.token)
+        self.assertEqual(player, PlayerToken(self.character.player_id, self.game.pk, self.character.pk))
+
+        with self.assertRaisesMessage(InvalidToken, 'invalid token'):
+            verify_token(self.token[:-1] + ('A' if self.token[-1] != 'A' else 'B'))
+        with self.assertRaisesMessage(InvalidToken, 'invalid token'):
+            verify_token('1:2:3')
+        with self.assertRaisesMessage(InvalidToken, 'token expired'):
+            verify_token(self.token, max_age=-1)
+
+    def test_issue_tokens(self):
+        tokens = issue_tokens(self.game)
+        self.assertEqual(len(tokens), self.game.characters.count())
+        for (character_id, token) in tokens.items():
+            self.assertEqual(verify_token(token).character_id, character_id)
+
+    def test_polls_without_sessions_or_users(self):
+        url = '/api/games/{}/'.format(self.game.pk)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Authorization', response['Vary'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_play_with_a_token(self):
+        response = self.client.post('/api/games/{}/turn/'.format(self.game.pk),
+                                    json.dumps({'action': NightActions.ATTACK_BLANK, 'confirm': True}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(NightAction.objects.filter(character=self.character, confirmed=True).exists())
+
+    def test_rejected_tokens(self):
+        response = self.client.get('/api/games/{}/'.format(self.game.pk), HTTP_AUTHORIZATION='Bearer nope')
+        self.assertEqual(response.status_code, 401)
+
+        other = DefaultGameMode.create(self.owner, self.players)
+        response = self.client.get('/api/games/{}/'.format(other.pk))
+        self.assertEqual(response.status_code, 403)
+
+    def test_token_endpoint(self):
+        client = Client()
+        client.force_login(self.character.player)
+        response = client.post('/api/games/{}/token/'.format(self.game.pk))
+        body = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(verify_token(body['token']),
+                         PlayerToken(self.character.player_id, self.game.pk, self.character.pk))
+
+        client.logout()
+        self.assertEqual(client.post('/api/games/{}/token/'.format(self.game.pk)).status_code, 403)
+
+    def test_tokens_do_not_renew_themselves(self):
+        response = self.client.post('/api/games/{}/token/'.format(self.game.pk))
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(json.loads(response.content.decode('utf-8')),
+                         {'error': 'tokens cannot issue tokens'})
+
+    def test_inactive_users_get_no_tokens(self):
+        client = Client()
+        client.force_login(self.character.player)
+        User.objects.filter(pk=self.character.player_id).update(is_active=False)
+        self.assertEqual(client.post('/api/games/{}/token/'.format(self.game.pk)).status_code, 403)
+
+
+class GuestTestCase(DefaultGameModeTestCase):
+
+    def test_create_guests(self):
+        with self.assertNumQueries(2):
+            guests = create_guests(20)
+        self.assertEqual(len(guests), 20)
+        self.assertEqual(guests, sorted(guests, key=lambda guest: guest.pk))
+        self.assertFalse(any(guest.has_usable_password() for guest in guests))
+        self.assertEqual(User.objects.filter(username__startswith='guest-').count(), 20)
+
+        game = DefaultGameMode.create(guests[0], guests[:10])
+        self.assertEqual(len(issue_tokens(game)), 10)
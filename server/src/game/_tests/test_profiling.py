@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+import threading
+import tracemalloc
+import warnings
+from unittest import mock
+
+from django.core.management import call_command
+from django.utils.six import StringIO
+
+from .utils import DefaultGameModeTestCase
+
+from mansion import settings
+
+from game import profiling
+from game.profiling import hotspots, profiled, read_profiles
+
+
+class ProfilingTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for (name, value) in (('GAME_PROFILE_DIR', self.directory), ('GAME_PROFILE_RATE', 1)):
+            patcher = mock.patch.object(settings, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def profiles(self):
+        return sorted(name.split('-', 2)[2] for name in os.listdir(self.directory))
+
+    def test_outermost_calls_are_profiled(self):
+        self.game.start()
+        self.assertEqual(self.profiles(), ['game.start.cpu.folded', 'game.start.mem.folded'])
+
+        self.game.next_stage()
+        self.assertEqual(len(self.profiles()), 4)
+
+    def test_collapsed_stacks(self):
+        self.game.start()
+        stacks = dict(read_profiles(self.directory, 'cpu'))
+        self.assertTrue(stacks)
+        self.assertTrue(all(value > 0 for value in stacks.values()))
+        self.assertTrue(any('(start)' in stack.split(';')[0] for stack in stacks))
+        self.assertTrue(any(';' in stack for stack in stacks))
+        self.assertTrue(list(read_profiles(self.directory, 'mem')))
+
+    def test_overlapping_calls_share_tracing(self):
+        first_in, second_in = threading.Event(), threading.Event()
+        results = []
+
+        @profiled('first')
+        def first():
+            first_in.set()
+            second_in.wait(5)
+            return 'first'
+
+        @profiled('second')
+        def second():
+            second_in.set()
+            thread.join(5)  # the first call stops tracing its own way out
+            return 'second'
+
+        thread = threading.Thread(target=lambda: results.append(first()))
+        thread.start()
+        first_in.wait(5)
+        results.append(second())
+
+        self.assertEqual(results, ['first', 'second'])
+        self.assertEqual(self.profiles(), ['first.cpu.folded', 'first.mem.folded',
+                                           'second.cpu.folded', 'second.mem.folded'])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_profiler_failures_do_not_reach_the_caller(self):
+        failing = mock.Mock(side_effect=RuntimeError('broken'))
+        for name in ('take_snapshot', 'collapse_cpu', 'write_profile'):
+            with mock.patch.object(profiling, name, failing), warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                self.assertEqual(profiled('entry')(lambda: 42)(), 42)
+            self.assertTrue(caught, name)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    @mock.patch.object(settings, 'GAME_PROFILE_RATE', 0)
+    def test_disabled(self):
+        self.game.start()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    @mock.patch.object(settings, 'GAME_PROFILE_KEEP', 4)
+    def test_rotation(self):
+        self.game.start()
+        for n in range(3):
+            self.game.next_stage()
+        self.assertEqual(len(self.profiles()), 4)
+        self.assertNotIn('game.start.cpu.folded', self.profiles())
+
+    def test_hotspots(self):
+        self.game.start()
+        frames = hotspots(self.directory, 'cpu', limit=5)
+        self.assertEqual(len(frames), 5)
+        self.assertTrue(all(total >= own for (frame, own, total) in frames))
+        self.assertEqual(hotspots(self.directory, 'cpu', entry='night.next_turn'), [])
+
+        root = hotspots(self.directory, 'cpu', limit=1, inclusive=True)[0]
+        self.assertIn('(start)', root[0])
+
+        out = StringIO()
+        call_command('profile_hotspots', directory=self.directory, kind='mem', stdout=out)
+        self.assertIn('KiB', out.getvalue())
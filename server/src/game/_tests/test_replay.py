@@ -0,0 +1,39 @@
+from .utils import DefaultGameModeTestCase
+
+from game.bots import play
+from game.modes import DefaultGameMode
+from game.replay import record, replay
+
+
+class SeedTestCase(DefaultGameModeTestCase):
+
+    def personas(self, game):
+        return list(game.characters.order_by('pk').values_list('persona__title', flat=True))
+
+    def test_games_get_their_own_seed(self):
+        other = DefaultGameMode.create(self.owner, self.players)
+        self.assertNotEqual(self.game.seed, other.seed)
+
+    def test_same_seed_deals_the_same_characters(self):
+        first = DefaultGameMode.create(self.owner, self.players, seed=42)
+        second = DefaultGameMode.create(self.owner, self.players, seed=42)
+        self.assertEqual(self.personas(first), self.personas(second))
+
+    def test_rng_scopes_are_independent(self):
+        self.assertEqual(self.game.rng('a').random(), self.game.rng('a').random())
+        self.assertNotEqual(self.game.rng('a').random(), self.game.rng('b').random())
+
+
+class ReplayTestCase(DefaultGameModeTestCase):
+
+    def test_replay_reproduces_the_recorded_outcome(self):
+        self.game.start()
+        play(self.game, policy='greedy', max_steps=2000, seed=3)
+        recording = record(self.game)
+
+        game, outcome, elapsed = replay(recording)
+
+        self.assertNotEqual(game.pk, self.game.pk)
+        self.assertEqual(len(recording['turns']), 12)
+        self.assertEqual(outcome, recording['outcome'])
+        self.assertGreater(elapsed, 0)
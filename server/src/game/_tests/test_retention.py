@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import Game, GameMessage, GameState, MessageRecipient
+from game.retention import Pruner, archive_games, expired_messages
+
+
+class RetentionTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        GameMessage.objects.all().delete()
+        self.now = timezone.now()
+
+    def age_messages(self, days):
+        GameMessage.objects.update(received_on=self.now - timedelta(days=days))
+
+    def test_finish(self):
+        self.game.finish()
+        game = Game.objects.get(pk=self.game.pk)
+        self.assertEqual(game.state, GameState.COMPLETE)
+        self.assertIsNotNone(game.finished_on)
+
+        finished_on = game.finished_on
+        game.finish()
+        self.assertEqual(Game.objects.get(pk=self.game.pk).finished_on, finished_on)
+
+    def test_archive_games(self):
+        self.game.finish()
+        self.assertEqual(archive_games(self.now, days=1), 0)
+        self.assertEqual(archive_games(self.now + timedelta(days=2), days=1), 1)
+        self.assertEqual(Game.objects.get(pk=self.game.pk).state, GameState.ARCHIVED)
+
+    def test_retention_depends_on_game_state(self):
+        retention = {GameState.ACTIVE: None, GameState.COMPLETE: 30}
+        self.game.broadcast_message('The lights go out')
+        self.age_messages(days=60)
+        self.assertFalse(expired_messages(self.now, retention).exists())
+
+        self.game.finish()
+        self.assertEqual(expired_messages(self.now, retention).count(), 1)
+        self.age_messages(days=10)
+        self.assertFalse(expired_messages(self.now, retention).exists())
+
+    def test_pruner_deletes_in_chunks(self):
+        for i in range(5):
+            self.game.broadcast_message('message {}'.format(i))
+        self.game.finish()
+        self.age_messages(days=60)
+
+        reports = []
+        pruner = Pruner(chunk_size=2, pause=0, retention={GameState.COMPLETE: 30})
+        stats = pruner.run(self.now, on_chunk=lambda stats: reports.append(dict(stats)))
+
+        self.assertEqual(stats['chunks'], 3)
+        self.assertEqual([report['messages'] for report in reports], [2, 4, 5])
+        self.assertEqual(stats['receipts'], 50)
+        self.assertGreater(pruner.rows_per_second, 0)
+        self.assertFalse(GameMessage.objects.exists())
+        self.assertFalse(MessageRecipient.objects.exists())
+
+    def test_deleting_a_game_deletes_its_messages(self):
+        self.game.broadcast_message('The lights go out')
+        Game.objects.filter(pk=self.game.pk).delete()
+        self.assertFalse(GameMessage.objects.exists())
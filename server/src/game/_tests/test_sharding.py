@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from game._admin.gameplay import GameAdmin
+from game._admin.room import RoomAdmin
+from game._admin.sharding import ShardAdminSite, register_shard_sites
+from game.bots import play
+from game.export import Exporter
+from game.models import Character, Game, GameId, GameMessage, GameState, Persona, Room
+from game.modes import DefaultGameMode
+from game.replay import record, replay
+from game.retention import Pruner, archive_games
+from game.sharding import (GameShardMiddleware, GameShardRouter, ShardNotSelected, allocate_game_id,
+                           current_shard, new_game_shard, shard_for, shards, using_game)
+from game.stress import check_invariants
+from mansion import settings
+
+
+class ShardingTestCase(TestCase):
+
+    def setUp(self):
+        self.router = GameShardRouter()
+
+    def test_unsharded(self):
+        self.assertEqual(shards(), [])
+        self.assertEqual(shard_for(7), 'default')
+        self.assertIsNone(self.router.db_for_write(Game))
+        with new_game_shard([]) as game_id:
+            self.assertIsNone(game_id)
+
+    @mock.patch.object(settings, 'GAME_SHARDS', 4)
+    def test_games_are_placed_by_id(self):
+        self.assertEqual(shards(), ['shard0', 'shard1', 'shard2', 'shard3'])
+        self.assertEqual(shard_for(7), 'shard3')
+        self.assertEqual(shard_for('8'), 'shard0')
+
+    @mock.patch.object(settings, 'GAME_SHARDS', 4)
+    def test_routing(self):
+        with using_game(5):
+            self.assertEqual(self.router.db_for_read(Character), 'shard1')
+            self.assertEqual(self.router.db_for_write(Game), 'shard1')
+            self.assertEqual(self.router.db_for_read(Room), 'default')
+            self.assertEqual(self.router.db_for_read(Persona), 'default')
+            self.assertEqual(self.router.db_for_read(Room.connections.through), 'default')
+            self.assertEqual(self.router.db_for_write(User), 'default')
+            self.assertEqual(self.router.db_for_write(GameId), 'default')
+
+            game = Game()
+            game._state.db = 'shard2'
+            self.assertEqual(self.router.db_for_read(Character, instance=game), 'shard2')
+        self.assertIsNone(current_shard())
+
+    @mock.patch.object(settings, 'GAME_SHARDS', 4)
+    def test_sharded_models_need_a_shard(self):
+        self.assertEqual(self.router.db_for_read(Room), 'default')
+        with self.assertRaises(ShardNotSelected):
+            self.router.db_for_read(Character)
+        with self.assertRaises(ShardNotSelected):
+            self.router.db_for_write(Game, instance=Game())
+
+    @mock.patch.object(settings, 'GAME_SHARDS', 2)
+    def test_games_are_administered_per_shard(self):
+        site = admin.AdminSite()
+        site.register(Game, GameAdmin)
+        site.register(Room, RoomAdmin)
+
+        shard_sites = register_shard_sites(site)
+        self.assertEqual([shard_site.alias for shard_site in shard_sites], ['shard0', 'shard1'])
+        self.assertEqual(list(site._registry), [Room])
+        self.assertTrue(all(list(shard_site._registry) == [Game] for shard_site in shard_sites))
+
+    def test_game_ids_are_allocated_in_sequence(self):
+        first = allocate_game_id()
+        self.assertEqual(allocate_game_id(), first + 1)
+
+    @mock.patch.object(settings, 'GAME_SHARDS', 2)
+    def test_middleware_routes_game_requests(self):
+        seen = []
+
+        def view(request):
+            middleware.process_view(request, view, (), {'game_id': '3'})
+            seen.append(current_shard())
+
+        middleware = GameShardMiddleware(view)
+        middleware(RequestFactory().get('/api/games/3/'))
+        self.assertEqual(seen, ['shard1'])
+        self.assertIsNone(current_shard())
+
+
+class ShardedGameTestCase(TestCase):
+    """
+    Games on a shard database of their own, created for these tests
+    """
+    multi_db = True
+    fixtures = ['initial_data']
+    shard = 'shard0'
+
+    @classmethod
+    def setUpClass(cls):
+        connections.databases[cls.shard] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}
+        connections.ensure_defaults(cls.shard)
+        connections.prepare_test_settings(cls.shard)
+        connections[cls.shard].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+        cls.sharding = mock.patch.object(settings, 'GAME_SHARDS', 1)
+        cls.sharding.start()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.sharding.stop()
+        del connections[cls.shard]
+        del connections.databases[cls.shard]
+
+    def setUp(self):
+        self.players = [User.objects.create(username='player{}'.format(i)) for i in range(10)]
+        self.game = DefaultGameMode.create(self.players[0], self.players)
+
+    def test_games_live_on_their_shard(self):
+        self.assertEqual(self.game._state.db, self.shard)
+        self.assertFalse(Game.objects.using(DEFAULT_DB_ALIAS).filter(pk=self.game.pk).exists())
+        self.assertEqual(User.objects.using(self.shard).count(), len(self.players))
+
+    def test_play_clone_and_replay(self):
+        with using_game(self.game.pk):
+            self.game.start()
+            stats = play(self.game, policy='greedy', max_steps=2000, seed=1)
+            self.assertTrue(stats['complete'])
+            self.assertEqual(check_invariants(self.game), [])
+
+            clone = self.game.clone()
+            self.assertEqual(clone._state.db, self.shard)
+            self.assertEqual(clone.characters.count(), self.game.characters.count())
+
+            recording = record(self.game)
+        replayed, outcome, elapsed = replay(recording)
+        self.assertEqual(replayed._state.db, self.shard)
+        self.assertEqual(outcome, recording['outcome'])
+
+    def test_admin_reads_the_shard(self):
+        site = ShardAdminSite(self.shard)
+        site.register(Game, GameAdmin)
+        request = RequestFactory().get('/admin/{}/game/game/'.format(self.shard))
+        request.user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+
+        response = site.admin_view(site._registry[Game].changelist_view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context_data['cl'].result_list), [self.game])
+
+    def test_retention_and_export_cover_every_shard(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        now = timezone.now()
+        with using_game(self.game.pk):
+            self.game.start()
+            self.game.broadcast_message('The lights go out')
+            self.game.finish()
+            messages = GameMessage.objects.count()
+
+        Exporter(directory).run(['messages'])
+        self.assertEqual(os.listdir(directory), ['messages.{}.csv.gz'.format(self.shard)])
+
+        self.assertEqual(archive_games(now + timedelta(days=2), days=1), 1)
+        stats = Pruner(pause=0, retention={GameState.ARCHIVED: 0}).run(now + timedelta(days=1))
+        self.assertEqual(stats['messages'], messages)
+        with using_game(self.game.pk):
+            self.assertEqual(Game.objects.get(pk=self.game.pk).state, GameState.ARCHIVED)
+            self.assertFalse(GameMessage.objects.exists())
@@ -0,0 +1,160 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import Character, Game, GameRoom, Weapon
+from game.versioning import get_version
+from game import wire
+
+
+class VersioningTestCase(DefaultGameModeTestCase):
+
+    def stored_version(self):
+        return Game.objects.filter(pk=self.game.pk).values_list('version', flat=True).get()
+
+    def assertVersionBumped(self, previous):
+        version = self.stored_version()
+        self.assertGreater(version, previous)
+        self.assertEqual(get_version(self.game.pk), version)
+        return version
+
+    def test_saves_never_write_a_stale_version(self):
+        version = self.stored_version()
+        self.game.start()
+        version = self.assertVersionBumped(version)
+
+        self.game.current_night.next_turn()
+        version = self.assertVersionBumped(version)
+
+        for stage in range(2):
+            self.game.next_stage()
+            version = self.assertVersionBumped(version)
+
+        stale = Game.objects.get(pk=self.game.pk)
+        self.game.current_night.next_turn()
+        version = self.assertVersionBumped(version)
+        stale.save()
+        self.assertEqual(self.stored_version(), version)
+
+
+class SnapshotTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.character = self.game.characters.order_by('pk')[0]
+        self.client.force_login(self.character.player)
+        self.url = '/api/games/{}/'.format(self.game.pk)
+
+    def get(self, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, **headers)
+        game_queries = [q['sql'] for q in queries.captured_queries if '"game_' in q['sql']]
+        return response, game_queries
+
+    def test_snapshot_requires_a_player(self):
+        self.client.logout()
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 403)
+
+    def test_snapshot_returns_the_game_state(self):
+        response, _ = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['ETag'].startswith('"'))
+
+        snapshot = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(snapshot['stage'], {'night': 0, 'day': None, 'turn': 1})
+        self.assertEqual(len(snapshot['rooms']), 6)
+        self.assertEqual(len(snapshot['characters']), 10)
+        self.assertEqual(snapshot['me']['character'], self.character.pk)
+        self.assertIn('Gun', [weapon['name'] for weapon in snapshot['me']['weapons']])
+
+    def test_snapshot_does_not_disclose_hidden_rooms(self):
+        room = GameRoom.objects.filter(game=self.game)[0]
+        other = self.game.characters.exclude(pk=self.character.pk)[0]
+        Character.objects.filter(pk=other.pk).update(current_room=room, hidden=True)
+        self.game.next_stage()
+
+        snapshot = json.loads(self.get()[0].content.decode('utf-8'))
+        [seen] = [c for c in snapshot['characters'] if c['id'] == other.pk]
+        self.assertTrue(seen['hidden'])
+        self.assertIsNone(seen['room'])
+
+    def test_unchanged_game_answers_not_modified_without_game_queries(self):
+        response, _ = self.get()
+        response, game_queries = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(game_queries, [])
+
+    def test_repeated_polls_are_served_from_the_cache(self):
+        self.get()
+        response, game_queries = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(game_queries, [])
+
+    def test_state_changes_invalidate_the_snapshot(self):
+        etag = self.get()[0]['ETag']
+        GameRoom.objects.filter(game=self.game, room__closeable=True)[0].close()
+
+        response, _ = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        snapshot = json.loads(response.content.decode('utf-8'))
+        self.assertIn(False, [room['open'] for room in snapshot['rooms']])
+
+    def test_binary_snapshot_is_negotiated_and_decodes_to_the_same_state(self):
+        response, _ = self.get(HTTP_ACCEPT=wire.CONTENT_TYPE)
+        self.assertEqual(response['Content-Type'], wire.CONTENT_TYPE)
+        self.assertIn('Accept', response['Vary'])
+
+        state = json.loads(self.get()[0].content.decode('utf-8'))
+        compact = wire.decode_snapshot(response.content)
+        self.assertLess(len(response.content), len(json.dumps(state)))
+
+        self.assertEqual(compact['stage'], state['stage'])
+        self.assertEqual([r['id'] for r in compact['rooms']], [r['id'] for r in state['rooms']])
+        self.assertEqual([r['weapons'] for r in compact['rooms']],
+                         [[w['id'] for w in r['weapons']] for r in state['rooms']])
+        self.assertEqual(compact['characters'], [dict((k, c[k]) for k in compact['characters'][0])
+                                                 for c in state['characters']])
+        self.assertEqual(compact['me']['weapons'], [{'id': w['id'], 'ammo': w['ammo']}
+                                                    for w in state['me']['weapons']])
+
+    def test_refused_binary_encoding_is_not_negotiated(self):
+        response, _ = self.get(HTTP_ACCEPT='{};q=0, application/json'.format(wire.CONTENT_TYPE))
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        response, _ = self.get(HTTP_ACCEPT='application/json, {};q=0.5'.format(wire.CONTENT_TYPE))
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        response, _ = self.get(HTTP_ACCEPT='{}, */*;q=0.1'.format(wire.CONTENT_TYPE))
+        self.assertEqual(response['Content-Type'], wire.CONTENT_TYPE)
+
+    def test_encodings_have_their_own_etags(self):
+        json_etag = self.get()[0]['ETag']
+        response, _ = self.get(HTTP_ACCEPT=wire.CONTENT_TYPE, HTTP_IF_NONE_MATCH=json_etag)
+        self.assertEqual(response.status_code, 200)
+
+        response, _ = self.get(HTTP_ACCEPT=wire.CONTENT_TYPE, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_catalog_resolves_snapshot_ids(self):
+        catalog = json.loads(self.client.get('/api/catalog/').content.decode('utf-8'))
+        state = json.loads(self.get()[0].content.decode('utf-8'))
+
+        personas = dict((persona['id'], persona['name']) for persona in catalog['personas'])
+        self.assertEqual(personas[state['me']['persona_id']], state['me']['persona'])
+
+    def test_catalog_changes_are_served(self):
+        self.client.get('/api/catalog/')
+        weapon = Weapon.objects.order_by('pk')[0]
+        weapon.description = 'Freshly sharpened'
+        weapon.save()
+
+        catalog = json.loads(self.client.get('/api/catalog/').content.decode('utf-8'))
+        self.assertEqual(catalog['weapons'][0]['description'], 'Freshly sharpened')
@@ -0,0 +1,126 @@
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client
+
+from .utils import DefaultGameModeTestCase
+
+from mansion import settings
+
+from game.spectators import build_public_view, feed_key, feed_path, feed_state
+from game.versioning import get_version
+
+
+class SpectatorFeedTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.object(settings, 'GAME_FEED_DIR', self.directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.game.start()
+        self.client = Client()
+        self.url = '/api/games/{}/spectate/'.format(self.game.pk)
+
+    def frames(self, content):
+        return [json.loads(line) for line in content.decode('utf-8').splitlines()]
+
+    def test_public_view_is_redacted(self):
+        character, other = self.game.characters.order_by('pk')[:2]
+        room = self.game.rooms.first()
+        character.move(room)
+        character.hide()
+        other.move(room)
+
+        view = build_public_view(self.game, 7)
+        self.assertEqual(set(view), {'game', 'version', 'state', 'stage', 'rooms', 'characters'})
+        self.assertEqual(view['stage'], {'night': 0, 'day': None, 'turn': 1})
+        self.assertEqual(set(view['characters'][0]), {'id', 'player', 'alive', 'room'})
+        self.assertEqual(view['characters'][0]['id'], character.pk)
+        self.assertIsNone(view['characters'][0]['room'])
+        self.assertEqual(view['characters'][1]['room'], room.pk)
+        self.assertEqual(view['version'], 7)
+
+    def test_reads_the_whole_feed(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['X-Feed-Version'], str(get_version(self.game.pk)))
+        self.assertEqual(response['X-Feed-Last-Frame'], '0')
+
+        frames = self.frames(response.content)
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0]['game'], self.game.pk)
+
+    def test_reads_are_served_from_the_cache(self):
+        response = self.client.get(self.url)
+        length = len(response.content)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_RANGE='bytes={}-'.format(length))
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */{}'.format(length))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.content), length)
+
+    def test_one_frame_per_change(self):
+        length = len(self.client.get(self.url).content)
+        self.game.characters.order_by('pk')[0].hide()
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes={}-'.format(length))
+        self.assertEqual(response.status_code, 206)
+        frames = self.frames(response.content)
+        self.assertEqual(len(frames), 1)
+        self.assertIsNone(frames[0]['characters'][0]['room'])
+        self.assertEqual(response['X-Feed-Last-Frame'], str(length))
+        self.assertEqual(response['Content-Range'],
+                         'bytes {}-{}/{}'.format(length, length + len(response.content) - 1,
+                                                 length + len(response.content)))
+
+        self.game.next_stage()
+        frames = self.frames(self.client.get(self.url).content)
+        self.assertEqual(len(frames), 3)
+        versions = [frame['version'] for frame in frames]
+        self.assertEqual(versions, sorted(set(versions)))
+        self.assertEqual(versions[-1], get_version(self.game.pk))
+
+    def test_feed_position_is_recovered_from_the_file(self):
+        self.client.get(self.url)
+        cache.clear()
+
+        state = feed_state(self.game.pk)
+        self.assertEqual(state.length, os.path.getsize(feed_path(self.game.pk)))
+        self.assertEqual(state.last_frame, 0)
+        self.assertEqual(len(self.frames(self.client.get(self.url).content)), 1)
+
+    def test_readers_wait_for_the_publisher(self):
+        published = feed_state(self.game.pk)
+        cache.delete(feed_key(self.game.pk))
+
+        states = []
+        with open(feed_path(self.game.pk), 'rb') as feed:
+            fcntl.flock(feed, fcntl.LOCK_EX)
+            reader = threading.Thread(target=lambda: states.append(feed_state(self.game.pk)))
+            reader.start()
+            reader.join(0.2)
+            self.assertTrue(reader.is_alive())
+            fcntl.flock(feed, fcntl.LOCK_UN)
+        reader.join(5)
+
+        self.assertEqual(states, [published])
+
+    def test_unknown_game(self):
+        response = self.client.get('/api/games/{}/spectate/'.format(self.game.pk + 1000))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,55 @@
+import random
+
+from .utils import DefaultGameModeTestCase
+
+from game.bots import play
+from game.models import CharacterWeapon, Game, Night, NightTurn
+from game.stress import StressBot, check_invariants
+
+
+class StressTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+
+    def test_invariants_hold_in_played_games(self):
+        self.assertEqual(check_invariants(self.game), [])
+        play(self.game, policy='greedy', max_steps=2000, seed=1)
+        self.assertEqual(check_invariants(self.game), [])
+
+    def test_duplicated_turns(self):
+        NightTurn.objects.create(night=self.game.current_night, number=1)
+        violations = check_invariants(self.game)
+        self.assertIn('night 0 has 2 turns number 1', violations)
+
+    def test_stage_sequence(self):
+        Night.objects.create(game=self.game, number=2)
+        violations = check_invariants(self.game)
+        self.assertIn('nights are numbered [0, 2]', violations)
+        self.assertIn('2 nights and 0 days', violations)
+        self.assertIn('night 0 is current, not the last one', violations)
+
+    def test_negative_ammo(self):
+        weapon = CharacterWeapon.objects.filter(character__game=self.game).first()
+        CharacterWeapon.objects.filter(pk=weapon.pk).update(ammo=-1)
+        self.assertEqual(check_invariants(self.game), ['weapon {} has -1 rounds'.format(weapon.pk)])
+
+    def test_stress_bot(self):
+        bots = [StressBot(player, self.game.pk, random.Random(n), owner=player == self.owner)
+                for (n, player) in enumerate(self.players)]
+        for turn in range(3):
+            for bot in bots:
+                bot.act()
+
+        stats = [bot.stats for bot in bots]
+        self.assertTrue(all(bot['accepted'] for bot in stats))
+        self.assertEqual(sum(bot['errors'] for bot in stats), 0)
+        self.assertGreater(Game.objects.get(pk=self.game.pk).current_night.current_turn.number, 1)
+        self.assertEqual(check_invariants(self.game), [])
+
+
+        # workers stop once the game is over
+        requests = bots[1].stats['requests']
+        self.game.finish()
+        self.assertEqual(bots[1].hammer(5)['requests'], requests)
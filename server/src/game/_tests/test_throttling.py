@@ -0,0 +1,95 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import User
+
+from .utils import DefaultGameModeTestCase
+
+from mansion import settings
+
+from game.models.stage import NightActions
+from game.throttling import TokenBucket, rejected, throttle
+
+
+class TokenBucketTestCase(DefaultGameModeTestCase):
+
+    def test_burst_and_refill(self):
+        bucket = TokenBucket('bucket', burst=3, rate=1.0)
+        self.assertEqual([bucket.take(now=100) for n in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(bucket.take(now=100), 1.0)
+        self.assertAlmostEqual(bucket.take(now=100.5), 0.5)
+        self.assertEqual(bucket.take(now=101), 0)
+        self.assertAlmostEqual(bucket.take(now=101), 1.0)
+
+    def test_no_queries(self):
+        with self.assertNumQueries(0):
+            throttle(self.game.pk, self.owner.pk)
+
+    @mock.patch.object(settings, 'GAME_THROTTLE', {'player': (2, 1.0), 'game': (3, 1.0)})
+    def test_players_run_out_before_their_game(self):
+        player, other = self.players[0].pk, self.players[1].pk
+        self.assertEqual([throttle(self.game.pk, player, now=100) for n in range(4)][:2], [0, 0])
+        self.assertEqual(rejected(), {'player': 2, 'game': 0})
+
+        # rejected requests take no tokens from the game
+        self.assertEqual(throttle(self.game.pk, other, now=100), 0)
+        self.assertAlmostEqual(throttle(self.game.pk, other, now=100), 1.0)
+        self.assertEqual(rejected(), {'player': 2, 'game': 1})
+
+
+class ThrottledViewsTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.url = '/api/games/{}/turn/'.format(self.game.pk)
+        self.characters = list(self.game.characters.select_related('player').order_by('pk'))
+
+    def post(self, character):
+        self.client.force_login(character.player)
+        return self.client.post(self.url, json.dumps({'action': NightActions.ATTACK_BLANK}),
+                                content_type='application/json')
+
+    @mock.patch.object(settings, 'GAME_THROTTLE', {'player': (2, 0.5), 'game': None})
+    def test_player_limit(self):
+        statuses = [self.post(self.characters[0]).status_code for n in range(3)]
+        self.assertEqual(statuses, [200, 200, 429])
+
+        response = self.post(self.characters[0])
+        self.assertEqual(response['Retry-After'], '2')
+        self.assertGreater(json.loads(response.content.decode('utf-8'))['retry_after'], 1)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.assertEqual(self.post(self.characters[1]).status_code, 200)
+
+    @mock.patch.object(settings, 'GAME_THROTTLE', {'player': None, 'game': (1, 0.1)})
+    def test_game_limit(self):
+        self.assertEqual(self.post(self.characters[0]).status_code, 200)
+        self.assertEqual(self.post(self.characters[1]).status_code, 429)
+
+        confirm = '/api/games/{}/actions/1/confirm/'.format(self.game.pk)
+        self.assertEqual(self.client.post(confirm).status_code, 429)
+
+    @mock.patch.object(settings, 'GAME_THROTTLE', {'player': None, 'game': (1, 0.1)})
+    def test_only_players_spend_tokens(self):
+        outsider = User.objects.create(username='outsider')
+        self.client.force_login(outsider)
+        for n in range(3):
+            response = self.client.post(self.url, json.dumps({'action': NightActions.ATTACK_BLANK}),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 403)
+
+        self.assertEqual(self.post(self.characters[0]).status_code, 200)
+
+    @mock.patch.object(settings, 'GAME_THROTTLE', {'player': (1, 0.1), 'game': None})
+    def test_rejected_counters(self):
+        self.post(self.characters[0])
+        self.post(self.characters[0])
+
+        response = self.client.get('/api/throttling/')
+        self.assertEqual(response.status_code, 403)
+
+        self.characters[0].player.is_staff = True
+        self.characters[0].player.save()
+        response = self.client.get('/api/throttling/')
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'rejected': {'player': 1, 'game': 0}})
@@ -0,0 +1,100 @@
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.exceptions import InvalidVote
+from game.models import Character, Execution, Game, Vote, VoteTally
+from game.models.objective import ObjectiveTrigger, objective_triggered
+
+
+class VotingTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.game.start()
+        self.game.next_stage()
+        self.day = Game.objects.get(pk=self.game.pk).current_day
+        self.characters = list(self.game.characters.order_by('pk'))
+
+    def test_votes_keep_running_counts(self):
+        a, b, c = self.characters[:3]
+        self.day.vote(a, c)
+        self.day.vote(b, c)
+        self.assertEqual(self.day.tally(), {c.pk: 2})
+
+        self.day.vote(b, a)
+        self.assertEqual(self.day.tally(), {c.pk: 1, a.pk: 1})
+
+        self.day.vote(a, None)
+        self.assertEqual(self.day.tally(), {a.pk: 1})
+        self.assertEqual(Vote.objects.filter(day=self.day).count(), 1)
+
+    def test_repeated_vote_is_a_no_op(self):
+        a, b = self.characters[:2]
+        self.assertTrue(self.day.vote(a, b))
+        self.assertFalse(self.day.vote(a, b))
+        self.assertEqual(VoteTally.objects.get(day=self.day, target=b).votes, 1)
+
+    def test_tally_read_does_not_depend_on_the_number_of_votes(self):
+        target = self.characters[0]
+        for voter in self.characters[1:]:
+            self.day.vote(voter, target)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.day.tally(), {target.pk: 9})
+        self.assertEqual(len(queries), 1)
+
+    def test_dead_characters_can_not_vote_or_be_voted(self):
+        a, b, c = self.characters[:3]
+        Character.objects.filter(pk=c.pk).update(alive=False)
+        c.refresh_from_db()
+
+        with self.assertRaises(InvalidVote):
+            self.day.vote(c, a)
+        with self.assertRaises(InvalidVote):
+            self.day.vote(a, c)
+
+    def test_day_end_executes_the_most_voted_and_fires_triggers(self):
+        a, b, c, d = self.characters[:4]
+        self.day.vote(a, c)
+        self.day.vote(b, c)
+        self.day.vote(c, d)
+
+        fired = []
+
+        def receiver(sender, trigger, objectives, executed, **kwargs):
+            fired.append((trigger, sorted(set(objectives.values_list('character', flat=True)))))
+
+        objective_triggered.connect(receiver)
+        try:
+            self.day.end()
+        finally:
+            objective_triggered.disconnect(receiver)
+
+        self.assertEqual(list(Execution.objects.filter(day=self.day).values_list('executed', 'votes')),
+                         [(c.pk, 2)])
+        self.assertFalse(Character.objects.get(pk=c.pk).alive)
+        self.assertEqual([trigger for (trigger, characters) in fired],
+                         [ObjectiveTrigger.EXECUTE, ObjectiveTrigger.EXECUTED, ObjectiveTrigger.DEAD])
+        self.assertTrue(set(fired[0][1]) <= {a.pk, b.pk})
+
+    def test_ties_execute_everyone_tied(self):
+        a, b = self.characters[:2]
+        self.day.vote(a, b)
+        self.day.vote(b, a)
+        self.assertEqual(len(self.day.execute()), 2)
+
+    def test_vote_endpoint(self):
+        voter, target = self.characters[:2]
+        url = '/api/games/{}/votes/'.format(self.game.pk)
+        self.client.force_login(voter.player)
+
+        response = self.client.post(url, json.dumps({'target': target.pk}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        self.client.logout()
+        tally = json.loads(self.client.get(url).content.decode('utf-8'))['tally']
+        self.assertEqual(tally, [{'character': target.pk, 'votes': 1}])
@@ -0,0 +1,41 @@
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .utils import DefaultGameModeTestCase
+
+from game.modes import DefaultGameMode
+from game.warmup import warm_up
+
+
+CATALOG_TABLES = ('"game_room"', '"game_weapon"', '"game_ability"', '"game_objective"', '"game_persona"')
+
+
+class WarmUpTestCase(DefaultGameModeTestCase):
+
+    def catalog_queries(self, queries):
+        return [q['sql'] for q in queries.captured_queries
+                if q['sql'].startswith('SELECT') and
+                any('FROM {}'.format(t) in q['sql'] for t in CATALOG_TABLES)]
+
+    def test_warmed_up_process_creates_games_without_catalog_queries(self):
+        warm_up()
+
+        with CaptureQueriesContext(connection) as queries:
+            DefaultGameMode.create(self.owner, self.players)
+
+        self.assertEqual(self.catalog_queries(queries), [])
+
+    def test_game_creation_bulk_creates_character_rows(self):
+        warm_up()
+        with CaptureQueriesContext(connection) as queries:
+            game = DefaultGameMode.create(self.owner, self.players)
+
+        inserts = [q['sql'] for q in queries.captured_queries
+                   if q['sql'].startswith('INSERT INTO "game_characterability"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(game.characters.count(), 10)
+
+    def test_prefork_workers_need_a_shared_cache(self):
+        with self.assertRaisesMessage(CommandError, 'cannot share a local memory cache'):
+            call_command('serve_prefork', '127.0.0.1:0', workers=2)
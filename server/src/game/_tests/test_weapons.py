@@ -0,0 +1,182 @@
+
+from .utils import DefaultGameModeTestCase
+
+from game.models import (Character, CharacterWeapon, DelayedEffect, GameRoom, Kill, Night, NightAction,
+                         ObjectiveTrigger, Weapon)
+from game.models.objective import objective_triggered
+from game.models.stage import NightActions
+from game.exceptions import OutOfAmmo, WeaponUnavailable
+
+
+class InventoryTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.character = self.game.characters.order_by('pk')[0]
+        self.gun = CharacterWeapon.objects.get(character=self.character, weapon__name='Gun')
+
+    def test_consume_ammo_is_a_single_update(self):
+        CharacterWeapon.objects.filter(pk=self.gun.pk).update(ammo=2)
+        with self.assertNumQueries(1):
+            CharacterWeapon.objects.consume_ammo(self.gun)
+
+        self.gun.refresh_from_db()
+        self.assertEqual(self.gun.ammo, 1)
+
+    def test_consume_ammo_raises_when_empty(self):
+        CharacterWeapon.objects.filter(pk=self.gun.pk).update(ammo=0)
+        with self.assertRaises(OutOfAmmo):
+            CharacterWeapon.objects.consume_ammo(self.gun)
+
+        self.gun.refresh_from_db()
+        self.assertEqual(self.gun.ammo, 0)
+
+    def test_weapons_without_ammo_never_run_out(self):
+        knife = CharacterWeapon.objects.create(character=self.character,
+                                               weapon=Weapon.objects.get(name='Knife'))
+        for i in range(3):
+            CharacterWeapon.objects.consume_ammo(knife)
+
+        knife.refresh_from_db()
+        self.assertIsNone(knife.ammo)
+
+    def test_reload_raises_without_the_weapon(self):
+        with self.assertRaises(WeaponUnavailable):
+            CharacterWeapon.objects.reload(self.character, 'Knife', ammo=2)
+
+    def test_pick_up_takes_weapon_out_of_the_room(self):
+        room = GameRoom.objects.get(game=self.game, room__name='Observatory')
+        wrench = Weapon.objects.get(name='Wrench')
+        CharacterWeapon.objects.pick_up(self.character, room, wrench)
+
+        self.assertFalse(room.weapons.filter(pk=wrench.pk).exists())
+        with self.assertRaises(WeaponUnavailable):
+            CharacterWeapon.objects.pick_up(self.character, room, wrench)
+
+    def test_pick_up_leaves_resource_weapons_in_the_room(self):
+        room = GameRoom.objects.get(game=self.game, room__name='Kitchen')
+        knife = Weapon.objects.get(name='Knife')
+        CharacterWeapon.objects.pick_up(self.character, room, knife)
+
+        self.assertTrue(room.weapons.filter(pk=knife.pk).exists())
+        self.assertTrue(CharacterWeapon.objects.filter(character=self.character, weapon=knife).exists())
+
+    def test_resource_weapons_are_carried_once(self):
+        room = GameRoom.objects.get(game=self.game, room__name='Kitchen')
+        knife = Weapon.objects.get(name='Knife')
+        carried = CharacterWeapon.objects.pick_up(self.character, room, knife)
+
+        self.assertEqual(CharacterWeapon.objects.pick_up(self.character, room, knife), carried)
+        self.assertEqual(CharacterWeapon.objects.filter(character=self.character, weapon=knife).count(), 1)
+
+    def test_drop_returns_weapon_to_the_room(self):
+        room = GameRoom.objects.get(game=self.game, room__name='Observatory')
+        wrench = Weapon.objects.get(name='Wrench')
+        CharacterWeapon.objects.pick_up(self.character, room, wrench)
+        CharacterWeapon.objects.drop(self.character, room, wrench)
+
+        self.assertTrue(room.weapons.filter(pk=wrench.pk).exists())
+        self.assertFalse(CharacterWeapon.objects.filter(character=self.character, weapon=wrench).exists())
+
+
+class AttackResolutionTestCase(DefaultGameModeTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.room = GameRoom.objects.get(game=self.game, room__name='Hall')
+        self.attacker, self.victim = self.game.characters.order_by('pk')[:2]
+        self.game.characters.update(current_room=self.room)
+        self.game.start()
+        self.turn = self.game.current_night.current_turn
+
+    def attack(self, weapon_name):
+        NightAction.objects.create(night_turn=self.turn, character=self.attacker,
+                                   action=NightActions.ATTACK_KILL, character_target=self.victim,
+                                   weapon_target=Weapon.objects.get(name=weapon_name),
+                                   confirmed=True)
+        type(self.turn).objects.get(pk=self.turn.pk).resolve()
+        self.victim.refresh_from_db()
+
+    def test_loaded_gun_kills(self):
+        CharacterWeapon.objects.reload(self.attacker, 'Gun', ammo=1)
+        self.attack('Gun')
+
+        self.assertFalse(self.victim.alive)
+        self.assertTrue(Kill.objects.filter(killer=self.attacker, killed=self.victim,
+                                            room=self.room).exists())
+        self.assertEqual(CharacterWeapon.objects.get(character=self.attacker, weapon__name='Gun').ammo, 0)
+
+    def test_empty_gun_does_not_kill(self):
+        self.attack('Gun')
+
+        self.assertTrue(self.victim.alive)
+        self.assertFalse(Kill.objects.exists())
+
+    def test_first_turn_attacks_miss(self):
+        # characters are in no room until they first move
+        self.game.characters.update(current_room=None)
+        CharacterWeapon.objects.reload(self.attacker, 'Gun', ammo=1)
+        self.attack('Gun')
+
+        self.assertTrue(self.victim.alive)
+        self.assertFalse(Kill.objects.exists())
+        self.assertEqual(CharacterWeapon.objects.get(character=self.attacker, weapon__name='Gun').ammo, 1)
+
+    def test_poison_starts_the_countdown(self):
+        poison = Weapon.objects.get(name='Poison')
+        CharacterWeapon.objects.create(character=self.attacker, weapon=poison)
+        self.attack('Poison')
+
+        self.assertTrue(self.victim.alive)
+        self.assertEqual(self.victim.turns_to_die, poison.effect_turns)
+
+    def poison(self):
+        CharacterWeapon.objects.create(character=self.attacker, weapon=Weapon.objects.get(name='Poison'))
+        self.attack('Poison')
+
+    def next_turn(self):
+        night = Night.objects.get(pk=self.game.current_night_id)
+        night.next_turn()
+        self.victim.refresh_from_db()
+        return night.current_turn
+
+    def test_poison_schedules_its_effect(self):
+        self.poison()
+        effect = DelayedEffect.objects.get(victim=self.victim)
+        self.assertEqual(effect.due, self.turn.index + Weapon.objects.get(name='Poison').effect_turns)
+        self.assertEqual(effect.killer, self.attacker)
+
+    def test_poison_kills_when_due(self):
+        triggers = []
+
+        def triggered(sender, trigger, objectives, **context):
+            triggers.append((trigger, context['kills'][0].killed_id))
+        objective_triggered.connect(triggered)
+        self.addCleanup(objective_triggered.disconnect, triggered)
+
+        self.poison()
+        self.next_turn()
+        self.assertTrue(self.victim.alive)
+        self.assertEqual(triggers, [])
+
+        self.next_turn()
+        self.assertFalse(self.victim.alive)
+        kill = Kill.objects.get(killer=self.attacker, killed=self.victim)
+        self.assertEqual((kill.room, kill.weapon.weapon.name), (self.room, 'Poison'))
+        self.assertEqual(triggers, [(ObjectiveTrigger.KILLED, self.victim.pk),
+                                    (ObjectiveTrigger.DEAD, self.victim.pk)])
+        self.assertFalse(DelayedEffect.objects.exists())
+
+    def test_effects_on_the_dead_are_dropped(self):
+        self.poison()
+        Character.objects.filter(pk=self.victim.pk).update(alive=False)
+        self.next_turn()
+        self.next_turn()
+        self.assertFalse(Kill.objects.exists())
+        self.assertFalse(DelayedEffect.objects.exists())
+
+    def test_turns_without_due_effects(self):
+        self.poison()
+        turn = self.next_turn()
+        with self.assertNumQueries(1):
+            self.assertEqual(turn.resolve_effects(), [])
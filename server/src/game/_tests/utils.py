@@ -1,7 +1,9 @@
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.contrib.auth.models import User
 
+from game.catalog import reset_catalog_index
 from game.modes import DefaultGameMode
 from game import models
 
@@ -10,6 +12,8 @@ class DefaultGameModeTestCase(TestCase):
     fixtures = ['initial_data']
 
     def setUp(self):
+        cache.clear()
+        reset_catalog_index()
         for i in range(10):
             User.objects.create(username='player{}'.format(i), password='password')
 
@@ -18,6 +22,8 @@ class DefaultGameModeTestCase(TestCase):
         self.game = DefaultGameMode.create(self.owner, self.players)
 
     def tearDown(self):
+        models.NightAction.objects.all().delete()
+        models.Kill.objects.all().delete()
         models.Character.objects.all().delete()
         models.Game.objects.all().delete()
         User.objects.all().delete()
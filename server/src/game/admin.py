@@ -5,3 +5,7 @@ from game._admin.weapon import WeaponAdmin
 from game._admin.stage import NightAdmin
 from game._admin.character import (PersonaAdmin, CharacterAdmin,
                                    AbilityAdmin, ObjectiveAdmin)
+from game._admin.sharding import register_shard_sites
+
+
+shard_sites = register_shard_sites()
@@ -1,5 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save
 
 
 class GameConfig(AppConfig):
     name = 'game'
+
+    def ready(self):
+        from game.catalog import invalidate_catalog
+        from game.sharding import catalog_models
+
+        for model in catalog_models():
+            post_save.connect(invalidate_catalog, sender=model)
+            post_delete.connect(invalidate_catalog, sender=model)
+            m2m_changed.connect(invalidate_catalog, sender=model)
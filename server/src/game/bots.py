@@ -0,0 +1,220 @@
+"""
+Bot players.
+
+Bots play through the same HTTP API as humans: they poll the game snapshot,
+choose an intent with a pluggable policy, and submit and confirm it. They are
+used to fill tables that are short of players and to generate load.
+"""
+import abc
+import json
+import random
+import time
+
+from django.db import OperationalError
+from django.test import Client
+
+from game.models.stage import NightActions, NIGHT_ACTIONS
+
+
+class Policy(metaclass=abc.ABCMeta):
+    """
+    Chooses a bot's night action from its snapshot.
+
+    Returns a dict with the `action` and its optional targets, as expected by
+    the action submission endpoint.
+    """
+
+    def __init__(self, rng=None):
+        self.rng = rng or random.Random()
+
+    @abc.abstractmethod
+    def choose(self, snapshot):
+        pass
+
+    @staticmethod
+    def surroundings(snapshot):
+        me = snapshot['me']
+        characters = dict((character['id'], character) for character in snapshot['characters'])
+        rooms = dict((room['id'], room) for room in snapshot['rooms'])
+        room = rooms.get(characters[me['character']]['room'])
+
+        others = [character for character in snapshot['characters']
+                  if character['id'] != me['character'] and character['alive']
+                  and room is not None and character['room'] == room['id']]
+        return (room, rooms, others)
+
+
+class RandomPolicy(Policy):
+    """
+    Picks any action type, with random valid-looking targets
+    """
+
+    def choose(self, snapshot):
+        room, rooms, others = self.surroundings(snapshot)
+        weapons = snapshot['me']['weapons']
+        connections = room['connections'] if room else list(rooms)
+
+        action = self.rng.choice(sorted(NIGHT_ACTIONS))
+        intent = {'action': action}
+
+        if action == NightActions.MOVE and connections:
+            intent['room_target'] = self.rng.choice(connections)
+        elif action == NightActions.ATTACK_KILL and others and weapons:
+            intent['character_target'] = self.rng.choice(others)['id']
+            intent['weapon_target'] = self.rng.choice(weapons)['id']
+        elif action == NightActions.PICK_WEAPON and room and room['weapons']:
+            intent['weapon_target'] = self.rng.choice(room['weapons'])['id']
+        elif action in (NightActions.CLOSE_DOOR, NightActions.OPEN_DOOR) and connections:
+            intent['room_target'] = self.rng.choice(connections)
+
+        return intent
+
+
+class GreedyPolicy(Policy):
+    """
+    Attacks whenever a loaded weapon and a victim are at hand, arms itself
+    otherwise, and moves towards the rooms with weapons.
+    """
+
+    def choose(self, snapshot):
+        room, rooms, others = self.surroundings(snapshot)
+        loaded = [weapon for weapon in snapshot['me']['weapons']
+                  if weapon['ammo'] is None or weapon['ammo'] > 0]
+
+        if others and loaded:
+            return {'action': NightActions.ATTACK_KILL,
+                    'character_target': self.rng.choice(others)['id'],
+                    'weapon_target': loaded[0]['id']}
+
+        if room and room['weapons']:
+            return {'action': NightActions.PICK_WEAPON, 'weapon_target': room['weapons'][0]['id']}
+
+        connections = room['connections'] if room else list(rooms)
+        armed = [room_id for room_id in connections if rooms[room_id]['weapons']]
+        if armed or connections:
+            return {'action': NightActions.MOVE, 'room_target': self.rng.choice(armed or connections)}
+
+        return {'action': NightActions.ATTACK_BLANK}
+
+
+POLICIES = {
+    'random': RandomPolicy,
+    'greedy': GreedyPolicy,
+}
+
+
+class Bot:
+    """
+    An automated player for one game.
+
+    Each call to `step` polls the snapshot and, if a night turn is waiting for
+    this bot, submits a confirmed action in a single request. Steps return
+    False once the game is complete.
+    """
+
+    retries = 5
+    retry_delay = 0.05
+
+    def __init__(self, player, game_id, policy, client=None):
+        self.player = player
+        self.game_id = game_id
+        self.policy = policy
+        self.client = client or Client()
+        self.client.force_login(player)
+
+        self.etag = None
+        self.snapshot = None
+        self.acted_on = None
+        self.stats = {'requests': 0, 'actions': 0, 'retries': 0, 'throttled': 0}
+
+    def url(self, path=''):
+        return '/api/games/{}/{}'.format(self.game_id, path)
+
+    def request(self, method, path, data=None, **headers):
+        for attempt in range(self.retries):
+            try:
+                self.stats['requests'] += 1
+                if method == 'post':
+                    response = self.client.post(self.url(path), json.dumps(data or {}),
+                                                content_type='application/json', **headers)
+                else:
+                    response = self.client.get(self.url(path), **headers)
+            except OperationalError:
+                # the database is locked by another game, back off and retry
+                self.stats['retries'] += 1
+                time.sleep(self.retry_delay * (attempt + 1))
+                continue
+
+            if response.status_code != 429 or attempt == self.retries - 1:
+                return response
+            # rate limited, wait as told
+            self.stats['throttled'] += 1
+            time.sleep(float(response['Retry-After']))
+
+        raise OperationalError('bot gave up after {} attempts'.format(self.retries))
+
+    def observe(self):
+        headers = {'HTTP_IF_NONE_MATCH': self.etag} if self.etag else {}
+        response = self.request('get', '', **headers)
+        if response.status_code == 200:
+            self.etag = response['ETag']
+            self.snapshot = json.loads(response.content.decode('utf-8'))
+        return self.snapshot
+
+    def step(self):
+        snapshot = self.observe()
+        stage = snapshot['stage']
+
+        if stage['day'] is not None:
+            return self.end_day()
+
+        turn = (stage['night'], stage['turn'])
+        if turn == self.acted_on:
+            return True
+
+        intent = dict(self.policy.choose(snapshot), confirm=True)
+        response = self.request('post', 'turn/', intent)
+        if response.status_code == 400:
+            # the policy picked an illegal move, pass instead
+            response = self.request('post', 'turn/', {'action': NightActions.ATTACK_BLANK, 'confirm': True})
+        if response.status_code == 409:
+            self.acted_on = turn
+        if response.status_code != 200:
+            return True
+
+        self.acted_on = turn
+        self.stats['actions'] += 1
+
+        return not json.loads(response.content.decode('utf-8')).get('complete', False)
+
+    def end_day(self):
+        response = self.request('post', 'day/end/')
+        if response.status_code != 200:
+            return True
+        return not json.loads(response.content.decode('utf-8'))['complete']
+
+
+def play(game, policy='random', max_steps=1000, seed=None):
+    """
+    Plays a whole game with bots, one per character, taking turns in order.
+
+    Returns the aggregated bot stats, with the number of steps played.
+    """
+    rng = random.Random(seed)
+    bots = [Bot(character.player, game.pk, POLICIES[policy](random.Random(rng.random())))
+            for character in game.characters.select_related('player').order_by('pk')]
+
+    steps = 0
+    playing = True
+    while playing and steps < max_steps:
+        for bot in bots:
+            steps += 1
+            if not bot.step():
+                playing = False
+                break
+
+    stats = {'steps': steps, 'complete': not playing}
+    for bot in bots:
+        for (key, value) in bot.stats.items():
+            stats[key] = stats.get(key, 0) + value
+    return stats
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+
+from game.models import Room, Weapon, Ability, Objective, Persona
+
+
+CATALOG_KEY = 'game:catalog'
+
+_index = None
+
+
+def build_catalog():
+    """
+    The rules catalog, used by clients to resolve the ids in compact snapshots
+    """
+    return {
+        'rooms': [{
+            'id': room.pk,
+            'name': room.name,
+            'room_type': room.room_type,
+            'closeable': room.closeable,
+        } for room in Room.objects.order_by('pk')],
+        'weapons': [{
+            'id': weapon.pk,
+            'name': weapon.name,
+            'description': weapon.description,
+            'weapon_type': weapon.weapon_type,
+            'max_ammo': weapon.max_ammo,
+            'resource': weapon.resource,
+            'intention': weapon.intention,
+            'effect_turns': weapon.effect_turns,
+        } for weapon in Weapon.objects.order_by('pk')],
+        'abilities': [{
+            'id': ability.pk,
+            'name': ability.name,
+            'description': ability.description,
+            'action_phase': ability.action_phase,
+        } for ability in Ability.objects.order_by('pk')],
+        'personas': [{
+            'id': persona.pk,
+            'name': persona.name,
+            'title': persona.title,
+            'bio': persona.bio,
+        } for persona in Persona.objects.order_by('pk')],
+    }
+
+
+def get_catalog():
+    """
+    The rules catalog, cached until a catalog model changes
+    """
+    catalog = cache.get(CATALOG_KEY)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(CATALOG_KEY, catalog, None)
+    return catalog
+
+
+class CatalogIndex:
+    """
+    The catalog model instances by name (personas by title), loaded with one
+    query per model.
+
+    The catalog is static rules data, so the index is built once per process and
+    shared by every game created in it. Instances must be treated as read-only.
+    Catalog changes only reset the index of the process that made them, other
+    processes keep theirs until they restart.
+    """
+
+    def __init__(self):
+        self.rooms = dict((room.name, room) for room in Room.objects.all())
+        self.weapons = dict((weapon.name, weapon) for weapon in Weapon.objects.all())
+        self.abilities = dict((ability.name, ability) for ability in Ability.objects.all())
+        self.objectives = dict((objective.name, objective) for objective in Objective.objects.all())
+        self.personas = dict((persona.title, persona) for persona in Persona.objects.all())
+
+
+def get_catalog_index():
+    global _index
+    if _index is None:
+        _index = CatalogIndex()
+    return _index
+
+
+def reset_catalog_index():
+    global _index
+    _index = None
+
+
+def invalidate_catalog(**kwargs):
+    """
+    Drops the cached catalog and the index, connected to the catalog models'
+    signals in `GameConfig.ready`
+    """
+    cache.delete(CATALOG_KEY)
+    reset_catalog_index()
@@ -0,0 +1,112 @@
+"""
+Game cloning.
+
+A clone is an exact copy of a game at its current stage: rooms and their
+weapons, characters with their abilities, objectives and weapons, nights,
+turns, actions, days, votes, kills, pending effects, terrors and messages.
+Every table is read with one query and written with bulk inserts. New primary
+keys are assigned up front, from the highest key of each table, so foreign keys
+between the copied rows are remapped in memory before anything is inserted.
+The whole copy runs in one transaction, with one read per table and one insert
+per batch of rows, however many rows there are.
+"""
+from django.db import router, transaction
+from django.db.models import Max
+
+from game.models import (Character, CharacterAbility, CharacterObjective, CharacterWeapon, Day, DelayedEffect,
+                         Execution, Game, GameMessage, GameRoom, Kill, MessageRecipient, Night, NightAction,
+                         NightTurn, Terror, Vote, VoteTally)
+from game.sharding import allocate_game_id, replicate_players, shard_for, shards
+
+
+# models copied along with a game, in insertion order, with the path to their game
+CLONED = [
+    (GameRoom, 'game'),
+    (GameRoom.weapons.through, 'gameroom__game'),
+    (Character, 'game'),
+    (CharacterAbility, 'character__game'),
+    (CharacterObjective, 'character__game'),
+    (CharacterWeapon, 'character__game'),
+    (Night, 'game'),
+    (NightTurn, 'night__game'),
+    (NightAction, 'night_turn__night__game'),
+    (Day, 'game'),
+    (Vote, 'day__game'),
+    (VoteTally, 'day__game'),
+    (Execution, 'day__game'),
+    (Kill, 'killer__game'),
+    (DelayedEffect, 'game'),
+    (Terror, 'ghost__game'),
+    (GameMessage, 'game'),
+    (MessageRecipient, 'message__game'),
+]
+
+
+class GameCloner:
+    """
+    Copies a game from the `source` database to the `target` one
+    """
+
+    def __init__(self, source, target):
+        self.source = source
+        self.target = target
+        self.ids = {}
+
+    def remap(self, model, row):
+        """
+        Gives a row its new primary key, and points its foreign keys to the copied rows
+        """
+        pk = model._meta.pk.attname
+        row[pk] = self.ids[model][row[pk]]
+        for field in model._meta.concrete_fields:
+            related = field.related_model if field.is_relation else None
+            if related in self.ids and row[field.attname] is not None:
+                row[field.attname] = self.ids[related][row[field.attname]]
+        return row
+
+    def allocate(self, model, rows, first=None):
+        """
+        Maps the old primary keys of the rows to new ones, after the last key in use
+        """
+        if first is None:
+            last = model.objects.using(self.target).aggregate(last=Max('pk'))['last']
+            first = (last or 0) + 1
+        pk = model._meta.pk.attname
+        self.ids[model] = dict((row[pk], first + index) for (index, row) in enumerate(rows))
+
+    def clone(self, game, game_id=None):
+        with transaction.atomic(using=self.target):
+            game_row = Game.objects.using(self.source).filter(pk=game.pk).values().get()
+            tables = [(model, list(model.objects.using(self.source).filter(**{path: game.pk})
+                                                                 .order_by('pk').values()))
+                      for (model, path) in CLONED]
+
+            self.allocate(Game, [game_row], game_id)
+            for (model, rows) in tables:
+                self.allocate(model, rows)
+
+            game_row['deadline'] = None
+            Game.objects.using(self.target).bulk_create([Game(**self.remap(Game, game_row))])
+            for (model, rows) in tables:
+                model.objects.using(self.target).bulk_create(model(**self.remap(model, row)) for row in rows)
+
+        return Game.objects.using(self.target).get(pk=self.ids[Game][game.pk])
+
+
+def clone_game(game):
+    """
+    Copies a game with everything in it. Returns the copy.
+
+    The copy has no deadline, so it stays at the stage it was cloned at until
+    it is played. With sharding it goes to the shard of its new id, and its
+    players are copied there.
+    """
+    source = game._state.db or router.db_for_read(Game, instance=game)
+    if not shards():
+        return GameCloner(source, source).clone(game)
+
+    game_id = allocate_game_id()
+    target = shard_for(game_id)
+    players = Character.objects.using(source).filter(game=game).values_list('player', flat=True)
+    replicate_players([game.created_by_id] + list(players), target)
+    return GameCloner(source, target).clone(game, game_id)
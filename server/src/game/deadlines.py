@@ -0,0 +1,133 @@
+"""
+Stage deadlines.
+
+Every night turn and day gets a deadline (`Game.deadline`) when it starts. A
+worker keeps the deadlines that are about to expire in a heap, loaded through
+the deadline index, and only touches the games whose deadline has passed:
+expired night turns are resolved with whatever was selected, and expired days
+end. The cost of a tick is proportional to the games expiring, not to the
+games in progress.
+"""
+import heapq
+import threading
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from game.models import Game, GameState
+from game.exceptions import GameComplete
+from game.sharding import shards, using_game, using_shard
+
+
+class DeadlineScheduler:
+    """
+    A min-heap of `(deadline, game_id)` entries.
+
+    Entries are not removed when a game moves on; they are checked against the
+    game when they expire instead, so rescheduling a game is a single push.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._scheduled = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def schedule(self, game_id, deadline):
+        entry = (deadline, game_id)
+        if entry in self._scheduled:
+            return False
+
+        heapq.heappush(self._heap, entry)
+        self._scheduled.add(entry)
+        return True
+
+    def next_deadline(self):
+        return self._heap[0][0] if self._heap else None
+
+    def due(self, now):
+        """
+        Pops and yields the entries whose deadline is at or before `now`
+        """
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._scheduled.discard(entry)
+            yield entry
+
+
+def expire(game_id, deadline):
+    """
+    Advances a game whose `deadline` passed.
+
+    Returns False if the game moved on or ended before the deadline was handled.
+    """
+    with using_game(game_id), transaction.atomic(using=router.db_for_write(Game)):
+        game = (Game.objects.select_related('current_night__current_turn', 'current_day')
+                            .filter(pk=game_id, deadline=deadline, state=GameState.ACTIVE)
+                            .first())
+        if game is None:
+            return False
+
+        turn = game.current_night.current_turn if game.current_night is not None else None
+        if game.current_day is None and (turn is None or turn.is_resolved()):
+            game.schedule_deadline(None)
+            return False
+
+        try:
+            if game.current_day is not None:
+                game.current_day.end()
+            else:
+                turn.expire()
+        except GameComplete:
+            game.schedule_deadline(None)
+
+    return True
+
+
+class DeadlineWorker:
+    """
+    Expires the stages whose deadline passed.
+
+    Each tick loads the deadlines due within `lookahead` seconds into the
+    scheduler and expires the ones that already passed.
+    """
+
+    def __init__(self, lookahead=60, scheduler=None):
+        self.lookahead = timedelta(seconds=lookahead)
+        self.scheduler = scheduler or DeadlineScheduler()
+
+    def load(self, now):
+        scheduled = 0
+        for alias in shards() or [None]:
+            with using_shard(alias):
+                upcoming = (Game.objects.filter(deadline__lte=now + self.lookahead)
+                                        .values_list('pk', 'deadline'))
+                scheduled += sum(self.scheduler.schedule(game_id, deadline)
+                                 for (game_id, deadline) in upcoming)
+        return scheduled
+
+    def tick(self, now=None):
+        """
+        Returns the ids of the games advanced in this tick
+        """
+        now = now or timezone.now()
+        self.load(now)
+        return [game_id for (deadline, game_id) in self.scheduler.due(now) if expire(game_id, deadline)]
+
+    def run(self, interval=1, stop=None, on_tick=None):
+        """
+        Ticks until `stop` is set, sleeping until the next deadline or `interval` seconds
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            advanced = self.tick()
+            if on_tick is not None:
+                on_tick(advanced)
+
+            wait = interval
+            next_deadline = self.scheduler.next_deadline()
+            if next_deadline is not None:
+                wait = min(wait, max((next_deadline - timezone.now()).total_seconds(), 0))
+            stop.wait(wait)
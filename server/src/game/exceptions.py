@@ -35,3 +35,33 @@ class GameComplete(GameException):
     """
     The game has ended and does not allow further actions
     """
+
+
+class WeaponUnavailable(GameException):
+    """
+    The weapon is not carried by the character or not found in the room
+    """
+
+
+class OutOfAmmo(GameException):
+    """
+    The weapon has no ammo left
+    """
+
+
+class IllegalMove(GameException):
+    """
+    The night action or its targets are not among the character's legal moves
+    """
+
+
+class InvalidVote(GameException):
+    """
+    The vote is not allowed: there is no day in progress, or the voter or the target are not alive
+    """
+
+
+class InvalidToken(GameException):
+    """
+    The player token is malformed, its signature does not match, or it expired
+    """
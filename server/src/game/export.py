@@ -0,0 +1,197 @@
+"""
+Game history export.
+
+Tables are read in primary key order, one bounded chunk at a time, with
+`values_list().iterator()` so no model instances are built and memory use does
+not grow with the size of the table. Each table is written to its own gzipped
+CSV or JSON Lines file. After every chunk the last exported primary key of the
+table and the size of its file are saved to a checkpoint. Every chunk is a
+gzip member of its own, so an interrupted export started again with the same
+checkpoint cuts each file back to its checkpointed size and appends from there.
+
+With sharding, primary keys are only unique within a shard, so each shard is
+exported to files of its own, named after the table and the shard.
+"""
+import csv
+import gzip
+import io
+import json
+import os
+import time
+from collections import OrderedDict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from game.models import CharacterObjective, GameMessage, Kill, NightAction, Terror
+from game.sharding import shards, using_shard
+
+
+class Table:
+    """
+    An exported table: its columns and the path from its rows to their game
+    """
+
+    def __init__(self, model, game, columns):
+        self.model = model
+        self.game = game
+        self.columns = ('id', game) + tuple(columns)
+
+    def rows(self, after=None, games=None, since=None, until=None):
+        """
+        The rows of the table, ordered by primary key
+        """
+        queryset = self.model.objects.order_by('pk')
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        if games is not None:
+            queryset = queryset.filter(**{self.game + '__id__range': games})
+        if since is not None:
+            queryset = queryset.filter(**{self.game + '__created_on__gte': since})
+        if until is not None:
+            queryset = queryset.filter(**{self.game + '__created_on__lt': until})
+        return queryset.values_list(*self.columns)
+
+
+TABLES = OrderedDict([
+    ('night_actions', Table(NightAction, 'night_turn__night__game', [
+        'night_turn__night__number', 'night_turn__number', 'character', 'action', 'confirmed',
+        'character_target', 'room_target', 'weapon_target'])),
+    ('kills', Table(Kill, 'killer__game', ['killer', 'killed', 'room', 'weapon__weapon'])),
+    ('terrors', Table(Terror, 'ghost__game', ['ghost', 'terrorized', 'room'])),
+    ('objectives', Table(CharacterObjective, 'character__game', [
+        'character', 'objective', 'points', 'complete'])),
+    ('messages', Table(GameMessage, 'game', [
+        'current_night', 'current_day', 'current_room', 'template', 'params', 'message', 'received_on'])),
+])
+
+
+class CSVWriter:
+    extension = 'csv'
+
+    def __init__(self, stream, columns, header):
+        self.writer = csv.writer(stream)
+        if header:
+            self.writer.writerow(columns)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+
+class JSONLinesWriter:
+    extension = 'jsonl'
+
+    def __init__(self, stream, columns, header):
+        self.stream = stream
+        self.columns = columns
+
+    def write(self, row):
+        self.stream.write(json.dumps(dict(zip(self.columns, row)), cls=DjangoJSONEncoder))
+        self.stream.write('\n')
+
+
+FORMATS = {
+    'csv': CSVWriter,
+    'jsonl': JSONLinesWriter,
+}
+
+
+class Exporter:
+    """
+    Exports tables to `directory` in chunks of `chunk_size` rows.
+
+    Filters (`games` as an inclusive id range, `since` and `until` on the game
+    creation date) are passed to every table, and must be the same when resuming.
+    """
+
+    def __init__(self, directory, fmt='csv', chunk_size=5000, checkpoint=None, **filters):
+        self.directory = directory
+        self.writer = FORMATS[fmt]
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+        self.filters = filters
+        self.positions = self.load_checkpoint()
+        self.stats = {'rows': 0, 'chunks': 0, 'elapsed': 0.0}
+
+    @property
+    def rows_per_second(self):
+        return self.stats['rows'] / self.stats['elapsed'] if self.stats['elapsed'] else 0.0
+
+    def load_checkpoint(self):
+        if self.checkpoint is None or not os.path.exists(self.checkpoint):
+            return {}
+        with open(self.checkpoint) as checkpoint:
+            return json.load(checkpoint)
+
+    def save_checkpoint(self):
+        if self.checkpoint is None:
+            return
+        # write and rename, so an interruption never leaves a truncated checkpoint
+        with open(self.checkpoint + '.tmp', 'w') as checkpoint:
+            json.dump(self.positions, checkpoint)
+        os.replace(self.checkpoint + '.tmp', self.checkpoint)
+
+    def path(self, name):
+        return os.path.join(self.directory, '{}.{}.gz'.format(name, self.writer.extension))
+
+    def write_chunk(self, output, table, rows, header):
+        """
+        Writes rows as a gzip member of its own, so the file is complete after
+        every chunk. Returns the number of rows and the last primary key.
+        """
+        count, last = 0, None
+        with gzip.GzipFile(fileobj=output, mode='wb') as compressed:
+            stream = io.TextIOWrapper(compressed, encoding='utf-8', newline='')
+            writer = self.writer(stream, table.columns, header)
+            for row in rows:
+                writer.write(row)
+                count, last = count + 1, row[0]
+            stream.flush()
+            stream.detach()
+        return count, last
+
+    def export_table(self, name, table, on_chunk=None):
+        """
+        Exports a table from its checkpointed position. Returns the rows written
+        """
+        after, offset = self.positions.get(name, (None, 0))
+        rows = 0
+        with open(self.path(name), 'r+b' if after is not None else 'wb') as output:
+            # drop whatever an interrupted run wrote past the checkpoint
+            output.truncate(offset)
+            output.seek(offset)
+
+            while True:
+                started = time.perf_counter()
+                chunk = table.rows(after, **self.filters)[:self.chunk_size].iterator()
+                count, last = self.write_chunk(output, table, chunk, header=after is None)
+                if count:
+                    output.flush()
+                    after, offset = last, output.tell()
+                self.stats['elapsed'] += time.perf_counter() - started
+
+                if not count:
+                    if after is not None:
+                        output.truncate(offset)
+                    break
+
+                rows += count
+                self.stats['rows'] += count
+                self.stats['chunks'] += 1
+                self.positions[name] = (after, offset)
+                self.save_checkpoint()
+                if on_chunk is not None:
+                    on_chunk(name, self.stats)
+
+        return rows
+
+    def run(self, tables=None, on_chunk=None):
+        """
+        Exports the given table names, all of them by default
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        for name in (tables or TABLES):
+            for alias in shards() or [None]:
+                with using_shard(alias):
+                    self.export_table(name if alias is None else '{}.{}'.format(name, alias), TABLES[name],
+                                      on_chunk)
+        return self.stats
@@ -0,0 +1,51 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = ('Measures the request throughput of concurrent bot games with the games '
+            'spread over a growing number of shards, each run on fresh databases')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+        parser.add_argument('--games', type=int, default=8)
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--max-steps', type=int, default=400)
+
+    def manage(self, env, *args):
+        return subprocess.check_output([sys.executable, sys.argv[0]] + list(args), env=env,
+                                       stderr=subprocess.STDOUT, universal_newlines=True)
+
+    def run(self, shards, options):
+        with tempfile.TemporaryDirectory() as directory:
+            env = dict(os.environ, MANSION_SHARDS=str(shards), MANSION_DATABASE_DIR=directory)
+            self.manage(env, 'migrate', '--verbosity', '0')
+            self.manage(env, 'loaddata', 'initial_data', '--verbosity', '0')
+            self.manage(env, 'sync_shards')
+            output = self.manage(env, 'run_bots', '--games', str(options['games']),
+                                 '--threads', str(options['threads']),
+                                 '--max-steps', str(options['max_steps']), '--seed', '1')
+
+        throughput = re.search(r'([\d.]+) requests/s', output)
+        if throughput is None:
+            raise CommandError('unexpected run_bots output:\n' + output)
+        return float(throughput.group(1))
+
+    def handle(self, *args, **options):
+        baseline = None
+        for shards in options['shards']:
+            try:
+                throughput = self.run(shards, options)
+            except subprocess.CalledProcessError as error:
+                # bots give up when the database stays locked for too long
+                reason = error.output.strip().rpartition('\n')[2]
+                self.stdout.write('{:>2} shards: failed ({})'.format(shards, reason))
+                continue
+            baseline = baseline or throughput
+            self.stdout.write('{:>2} shards: {:7.1f} requests/s ({:.2f}x)'.format(
+                shards, throughput, throughput / baseline))
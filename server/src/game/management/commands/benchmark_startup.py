@@ -0,0 +1,80 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from game.modes import DefaultGameMode
+from game.sharding import atomic_everywhere, using_game
+from game.warmup import warm_up
+
+
+def create_first_game(players):
+    """
+    Creates and starts a game, rolling it back so runs leave no trace
+    """
+    with atomic_everywhere(rollback=True):
+        usernames = ['startup-{}-{}'.format(os.getpid(), i) for i in range(players)]
+        User.objects.bulk_create([User(username=username) for username in usernames])
+        users = list(User.objects.filter(username__in=usernames).order_by('pk'))
+        game = DefaultGameMode.create(users[0], users)
+        with using_game(game.pk):
+            game.start()
+
+
+class Command(BaseCommand):
+    help = ('Measures the time to the first game created by a new process, started cold '
+            'or forked from a warmed-up master')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--players', type=int, default=10)
+        parser.add_argument('--first-game', action='store_true',
+                            help='create a game and exit (used for the cold runs)')
+
+    def cold(self, players):
+        started = time.perf_counter()
+        subprocess.check_call([sys.executable, sys.argv[0], 'benchmark_startup', '--first-game',
+                               '--players', str(players)])
+        return time.perf_counter() - started
+
+    def forked(self, players):
+        connections.close_all()
+        started = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                create_first_game(players)
+                code = 0
+            finally:
+                os._exit(code)
+
+        _, status = os.waitpid(pid, 0)
+        if status:
+            raise CommandError('forked worker failed with status {}'.format(status))
+        return time.perf_counter() - started
+
+    def report(self, label, timings):
+        self.stdout.write('{:<8} median {:.3f}s (min {:.3f}s, max {:.3f}s)'.format(
+            label, statistics.median(timings), min(timings), max(timings)))
+
+    def handle(self, *args, **options):
+        players = options['players']
+        if options['first_game']:
+            return create_first_game(players)
+
+        cold = [self.cold(players) for i in range(options['runs'])]
+
+        started = time.perf_counter()
+        warm_up()
+        self.stdout.write('master warm-up {:.3f}s'.format(time.perf_counter() - started))
+
+        forked = [self.forked(players) for i in range(options['runs'])]
+
+        self.report('cold', cold)
+        self.report('forked', forked)
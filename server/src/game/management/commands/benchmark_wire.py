@@ -0,0 +1,40 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.models import Game
+from game.sharding import using_game
+from game.snapshot import build_snapshot, ENCODERS
+
+
+class Command(BaseCommand):
+    help = 'Compares the size and encoding time of the snapshot encodings for every character of a game'
+
+    def add_arguments(self, parser):
+        parser.add_argument('game', type=int)
+        parser.add_argument('--iterations', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with using_game(options['game']):
+            self.benchmark(options['game'], options['iterations'])
+
+    def benchmark(self, game_id, iterations):
+        try:
+            game = Game.objects.select_related('current_night__current_turn', 'current_day') \
+                               .get(pk=game_id)
+        except Game.DoesNotExist:
+            raise CommandError('game {} does not exist'.format(game_id))
+
+        snapshots = [build_snapshot(game, character)
+                     for character in game.characters.select_related('persona')]
+        if not snapshots:
+            raise CommandError('game {} has no characters'.format(game.pk))
+
+        for (content_type, encode) in sorted(ENCODERS.items()):
+            size = sum(len(encode(snapshot)) for snapshot in snapshots) / len(snapshots)
+            elapsed = timeit.timeit(lambda: [encode(snapshot) for snapshot in snapshots], number=iterations)
+            per_snapshot = elapsed / (iterations * len(snapshots)) * 1e6
+
+            self.stdout.write('{:<45} {:>8.0f} bytes {:>10.1f} us/snapshot'.format(
+                content_type, size, per_snapshot
+            ))
@@ -0,0 +1,60 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime, parse_date
+
+from game.export import Exporter, FORMATS, TABLES
+
+
+def _date(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time())
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def _range(value):
+    first, _, last = value.partition(':')
+    return int(first), int(last)
+
+
+class Command(BaseCommand):
+    help = ('Streams the game history tables to gzipped CSV or JSON Lines files, '
+            'in primary key ordered chunks and with constant memory')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--tables', nargs='+', choices=list(TABLES), default=None)
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--games', type=_range, default=None, metavar='FIRST:LAST',
+                            help='only export games with ids in this inclusive range')
+        parser.add_argument('--since', type=_date, default=None, help='only games created since this date')
+        parser.add_argument('--until', type=_date, default=None, help='only games created before this date')
+        parser.add_argument('--checkpoint', default=None,
+                            help='file to save progress to and resume from')
+
+    def handle(self, *args, **options):
+        if options['checkpoint'] is None and options['verbosity'] > 1:
+            self.stdout.write('No checkpoint given, the export can not be resumed')
+
+        exporter = Exporter(options['directory'], options['format'], options['chunk_size'],
+                            options['checkpoint'], games=options['games'],
+                            since=options['since'], until=options['until'])
+
+        def progress(name, stats):
+            if options['verbosity'] > 1:
+                self.stdout.write('{}: {} rows ({:.0f} rows/s)'.format(name, stats['rows'],
+                                                                      exporter.rows_per_second))
+
+        try:
+            stats = exporter.run(options['tables'], on_chunk=progress)
+        except OSError as error:
+            raise CommandError(error)
+
+        self.stdout.write('{rows} rows in {chunks} chunks, {elapsed:.2f}s'.format(**stats) +
+                          ' ({:.0f} rows/s)'.format(exporter.rows_per_second))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from mansion import settings
+
+from game.profiling import KINDS, hotspots
+
+
+UNITS = {
+    'cpu': ('ms', 1000),
+    'mem': ('KiB', 1024),
+}
+
+
+class Command(BaseCommand):
+    help = ('Lists the frames with the most time or allocated memory across the sampled '
+            'profiles of the game entry points')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--directory', default=settings.GAME_PROFILE_DIR)
+        parser.add_argument('--kind', choices=KINDS, default='cpu',
+                            help='time spent (cpu) or memory allocated (mem)')
+        parser.add_argument('--entry', help='only the profiles of an entry point, such as game.next_stage')
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument('--inclusive', action='store_true',
+                            help='rank by the total of each frame, including the frames it calls')
+
+    def handle(self, *args, **options):
+        try:
+            frames = hotspots(options['directory'], options['kind'], options['entry'],
+                              options['limit'], options['inclusive'])
+        except FileNotFoundError:
+            raise CommandError('no profiles in {}'.format(options['directory']))
+
+        unit, scale = UNITS[options['kind']]
+        self.stdout.write('{:>12} {:>12}  frame'.format('self ' + unit, 'total ' + unit))
+        for (frame, own, total) in frames:
+            self.stdout.write('{:>12.1f} {:>12.1f}  {}'.format(own / scale, total / scale, frame))
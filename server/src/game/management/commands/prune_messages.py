@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from game.retention import Pruner, archive_games
+
+
+class Command(BaseCommand):
+    help = ('Archives old completed games and deletes the messages past the retention '
+            'of their game state, in small chunks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='primary keys covered by each delete transaction')
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help='seconds to sleep between chunks, letting writers in')
+        parser.add_argument('--no-archive', action='store_true', help='do not archive completed games')
+
+    def report(self, stats, rows_per_second):
+        self.stdout.write('{chunks} chunks, {messages} messages and {receipts} receipts deleted '
+                          'in {elapsed:.2f}s'.format(**stats) + ' ({:.0f} rows/s)'.format(rows_per_second))
+
+    def handle(self, *args, **options):
+        if not options['no_archive']:
+            self.stdout.write('{} games archived'.format(archive_games()))
+
+        pruner = Pruner(chunk_size=options['chunk_size'], pause=options['pause'])
+        verbose = options['verbosity'] > 1
+        pruner.run(on_chunk=lambda stats: verbose and self.report(stats, pruner.rows_per_second))
+        self.report(pruner.stats, pruner.rows_per_second)
@@ -0,0 +1,30 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.models import Game
+from game.replay import record
+from game.sharding import using_game
+
+
+class Command(BaseCommand):
+    help = 'Records the seed and actions of a game, to be replayed with replay_game'
+
+    def add_arguments(self, parser):
+        parser.add_argument('game', type=int)
+        parser.add_argument('output')
+
+    def handle(self, *args, **options):
+        with using_game(options['game']):
+            try:
+                game = Game.objects.get(pk=options['game'])
+            except Game.DoesNotExist:
+                raise CommandError('game {} does not exist'.format(options['game']))
+
+            recording = record(game)
+        with open(options['output'], 'w') as output:
+            json.dump(recording, output, indent=2, sort_keys=True)
+
+        actions = sum(len(turn['actions']) for turn in recording['turns'])
+        self.stdout.write('Recorded game {} (seed {}): {} turns, {} actions'.format(
+            game.pk, recording['seed'], len(recording['turns']), actions))
@@ -0,0 +1,53 @@
+import json
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from game.replay import replay
+from game.sharding import atomic_everywhere
+
+
+class Command(BaseCommand):
+    help = ('Replays a recorded game, checking that the outcome matches the recording '
+            'and comparing the replay time against the recorded baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('recording')
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help='allowed slowdown over the baseline, as a fraction')
+        parser.add_argument('--save-baseline', action='store_true',
+                            help='store the median replay time in the recording')
+
+    def run(self, recording):
+        # replays never persist, so runs are independent of each other
+        with atomic_everywhere(rollback=True):
+            game, outcome, elapsed = replay(recording)
+        return outcome, elapsed
+
+    def handle(self, *args, **options):
+        with open(options['recording']) as recorded:
+            recording = json.load(recorded)
+
+        timings = []
+        for i in range(options['runs']):
+            outcome, elapsed = self.run(recording)
+            if outcome != recording['outcome']:
+                raise CommandError('run {} diverged from the recorded outcome'.format(i + 1))
+            timings.append(elapsed)
+
+        median = statistics.median(timings)
+        self.stdout.write('{} runs, outcome matches; median {:.3f}s (min {:.3f}s, max {:.3f}s)'.format(
+            len(timings), median, min(timings), max(timings)))
+
+        baseline = recording.get('baseline')
+        if options['save_baseline']:
+            recording['baseline'] = median
+            with open(options['recording'], 'w') as output:
+                json.dump(recording, output, indent=2, sort_keys=True)
+            self.stdout.write('Baseline saved')
+        elif baseline:
+            ratio = median / baseline
+            self.stdout.write('Baseline {:.3f}s, ratio {:.2f}'.format(baseline, ratio))
+            if ratio > 1 + options['tolerance']:
+                raise CommandError('replay is {:.0%} slower than the baseline'.format(ratio - 1))
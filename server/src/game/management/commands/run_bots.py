@@ -0,0 +1,59 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from game.bots import play, POLICIES
+from game.modes import DefaultGameMode
+from game.players import create_guests
+from game.sharding import using_game
+
+
+class Command(BaseCommand):
+    help = 'Plays games with bot players, concurrently, to keep tables moving or to generate load'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=1)
+        parser.add_argument('--players', type=int, default=10)
+        parser.add_argument('--policy', choices=sorted(POLICIES), default='random')
+        parser.add_argument('--threads', type=int, default=4)
+        parser.add_argument('--max-steps', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def create_game(self, index, players, seed=None):
+        bots = create_guests(players, 'bot-{}'.format(index))
+
+        game = DefaultGameMode.create(bots[0], bots, seed=seed)
+        with using_game(game.pk):
+            game.start()
+        return game
+
+    def play_game(self, index, game, options):
+        try:
+            seed = None if options['seed'] is None else options['seed'] + index
+            with using_game(game.pk):
+                return play(game, options['policy'], options['max_steps'], seed)
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, **options):
+        seed = options['seed']
+        games = [self.create_game(index, options['players'], None if seed is None else seed + index)
+                 for index in range(options['games'])]
+
+        started = time.time()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            results = list(pool.map(lambda args: self.play_game(*args, options=options), enumerate(games)))
+        elapsed = time.time() - started
+
+        totals = {}
+        for result in results:
+            for (key, value) in result.items():
+                totals[key] = totals.get(key, 0) + value
+
+        self.stdout.write('{} games ({} complete) in {:.1f}s'.format(len(results), totals['complete'],
+                                                                     elapsed))
+        self.stdout.write('{requests} requests, {actions} actions, {retries} retries, '
+                          '{throttled} throttled'.format(**totals))
+        self.stdout.write('{:.1f} requests/s'.format(totals['requests'] / elapsed))
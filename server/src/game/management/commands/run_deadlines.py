@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from game.deadlines import DeadlineWorker
+
+
+class Command(BaseCommand):
+    help = 'Runs the worker that advances night turns and days once their deadline passes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=1.0,
+                            help='maximum seconds between ticks')
+        parser.add_argument('--lookahead', type=float, default=60.0,
+                            help='seconds ahead to load deadlines into the scheduler')
+        parser.add_argument('--once', action='store_true', help='run a single tick and exit')
+
+    def report(self, advanced):
+        if advanced:
+            self.stdout.write('Advanced {} game(s): {}'.format(len(advanced), ', '.join(map(str, advanced))))
+
+    def handle(self, *args, **options):
+        worker = DeadlineWorker(lookahead=options['lookahead'])
+        if options['once']:
+            return self.report(worker.tick())
+
+        try:
+            worker.run(interval=options['interval'], on_tick=self.report)
+        except KeyboardInterrupt:
+            pass
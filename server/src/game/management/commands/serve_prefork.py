@@ -0,0 +1,36 @@
+import os
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+
+from game.warmup import warm_up
+from mansion.prefork import PreforkServer
+
+
+class Command(BaseCommand):
+    help = 'Serves the project from workers forked off a warmed-up master process'
+
+    def add_arguments(self, parser):
+        parser.add_argument('addrport', nargs='?', default='127.0.0.1:8000')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        host, _, port = options['addrport'].rpartition(':')
+        if not port.isdigit():
+            raise CommandError('"{}" is not a valid address:port'.format(options['addrport']))
+        if options['workers'] > 1 and isinstance(caches['default'], LocMemCache):
+            # each worker would keep its own game versions, legal moves and rate limits
+            raise CommandError('{} workers cannot share a local memory cache, '
+                               'set MANSION_MEMCACHED or serve with 1 worker'.format(options['workers']))
+
+        application = get_wsgi_application()
+        warm_up()
+        connections.close_all()
+
+        self.stdout.write('Serving on {}:{} with {} workers'.format(host or '127.0.0.1', port,
+                                                                  options['workers']))
+        self.stdout.flush()
+        PreforkServer(application, host or '127.0.0.1', int(port), options['workers']).serve()
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from game.modes import DefaultGameMode
+from game.players import create_guests
+from game.sharding import using_game
+from game.stress import StressRun
+
+
+class Command(BaseCommand):
+    help = ('Plays one game with many concurrent workers per player, then checks the game '
+            'invariants and reports throughput, conflicts and retries')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--players', type=int, default=10)
+        parser.add_argument('--contention', type=int, default=2, help='workers per player')
+        parser.add_argument('--operations', type=int, default=200, help='operations per worker')
+        parser.add_argument('--processes', action='store_true', help='run workers as processes, not threads')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def create_game(self, players, seed):
+        users = create_guests(players, 'stress')
+
+        game = DefaultGameMode.create(users[0], users, seed=seed)
+        with using_game(game.pk):
+            game.start()
+        return game
+
+    def handle(self, *args, **options):
+        game = self.create_game(options['players'], options['seed'])
+        stats = StressRun(game, options['contention'], options['operations'], options['processes'],
+                          options['seed']).run()
+
+        self.stdout.write('game {} played by {} {} ({}) in {:.1f}s'.format(
+            game.pk, stats['workers'], 'processes' if options['processes'] else 'threads',
+            'complete' if stats['complete'] else 'incomplete', stats['elapsed']))
+        self.stdout.write('{requests} requests, {accepted} accepted, {conflicts} conflicts, '
+                          '{rejected} rejected, {retries} retries, {throttled} throttled, '
+                          '{errors} errors'.format(**stats))
+        self.stdout.write('{:.1f} requests/s, {:.1%} conflicts, {:.1%} retries'.format(
+            stats['requests_per_second'], stats['conflict_rate'], stats['retry_rate']))
+        for (error, count) in sorted(stats['errors_by_type'].items()):
+            self.stdout.write('  {}: {}'.format(error, count))
+
+        if stats['violations']:
+            raise CommandError('invariants violated:\n' + '\n'.join(stats['violations']))
+        self.stdout.write('invariants hold')
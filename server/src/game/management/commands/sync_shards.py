@@ -0,0 +1,19 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from game.sharding import replicate_catalog, shards, using_shard
+
+
+class Command(BaseCommand):
+    help = 'Migrates every game shard and brings its copy of the catalog up to date'
+
+    def handle(self, *args, **options):
+        if not shards():
+            raise CommandError('sharding is disabled, set MANSION_SHARDS')
+
+        for alias in shards():
+            # data migrations query through the router, which follows the current shard
+            with using_shard(alias):
+                call_command('migrate', database=alias, interactive=False, verbosity=0)
+            copied = replicate_catalog(alias)
+            self.stdout.write('{}: migrated, {} catalog rows copied'.format(alias, copied))
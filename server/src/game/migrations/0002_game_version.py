@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10 on 2026-10-19 16:30
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NightTurn',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='night',
+            name='turns_left',
+        ),
+        migrations.RemoveField(
+            model_name='nightaction',
+            name='night',
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='starting_room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='starting_room', to='game.GameRoom'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='ability',
+            name='action_phase',
+            field=models.CharField(choices=[('startgame', 'STARTGAME'), ('room', 'ROOM'), ('day', 'DAY'), ('night', 'NIGHT'), ('voting', 'VOTING')], max_length=16, null=True),
+        ),
+        migrations.AlterField(
+            model_name='nightaction',
+            name='action',
+            field=models.CharField(choices=[('move', 'MOVE'), ('attack_kill', 'ATTACK_KILL'), ('attack_defend', 'ATTACK_DEFEND'), ('attack_blank', 'ATTACK_BLANK'), ('pick_weapon', 'PICK_WEAPON'), ('special', 'SPECIAL'), ('close_door', 'CLOSE_DOOR'), ('open_door', 'OPEN_DOOR')], max_length=32),
+        ),
+        migrations.AlterField(
+            model_name='objective',
+            name='trigger',
+            field=models.CharField(choices=[('kill', 'KILL'), ('execute', 'EXECUTE'), ('terrorize', 'TERRORIZE'), ('killed', 'KILLED'), ('executed', 'EXECUTED'), ('terrorized', 'TERRORIZED'), ('dead', 'DEAD'), ('endgame', 'ENDGAME')], max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='room_type',
+            field=models.CharField(choices=[('basic', 'BASIC'), ('hall', 'HALL'), ('kitchen', 'KITCHEN'), ('dormitory', 'DORMITORY'), ('observatory', 'OBSERVATORY'), ('library', 'LIBRARY'), ('basement', 'BASEMENT')], max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='weapon',
+            name='weapon_type',
+            field=models.CharField(choices=[('gun', 'GUN'), ('knife', 'KNIFE'), ('stunt', 'STUNT'), ('poison', 'POISON')], max_length=16),
+        ),
+        migrations.AddField(
+            model_name='nightturn',
+            name='night',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='night_turns', to='game.Night'),
+        ),
+        migrations.AddField(
+            model_name='night',
+            name='current_turn',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='current_turn', to='game.NightTurn'),
+        ),
+        migrations.AddField(
+            model_name='nightaction',
+            name='night_turn',
+            field=models.ForeignKey(default=None, on_delete=django.db.models.deletion.CASCADE, related_name='actions', to='game.NightTurn'),
+            preserve_default=False,
+        ),
+    ]
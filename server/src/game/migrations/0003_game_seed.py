@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10 on 2026-10-19 16:38
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import game.models.gameplay
+
+
+def seed_existing_games(apps, schema_editor):
+    # the field default is evaluated once for all existing rows
+    Game = apps.get_model('game', 'Game')
+    games = Game.objects.using(schema_editor.connection.alias)
+    for row in games.only('pk'):
+        games.filter(pk=row.pk).update(seed=game.models.gameplay.new_seed())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_game_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='seed',
+            field=models.PositiveIntegerField(default=game.models.gameplay.new_seed),
+        ),
+        migrations.RunPython(seed_existing_games, migrations.RunPython.noop),
+    ]
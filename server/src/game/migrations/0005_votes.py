@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10 on 2026-10-19 16:42
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0004_game_deadline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Execution',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes', models.PositiveIntegerField()),
+                ('day', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executions', to='game.Day')),
+                ('executed', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='executions', to='game.Character')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Vote',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='game.Day')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes_against', to='game.Character')),
+                ('voter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='votes', to='game.Character')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteTally',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('day', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='game.Day')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tallies', to='game.Character')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='votetally',
+            unique_together=set([('day', 'target')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='vote',
+            unique_together=set([('day', 'voter')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='execution',
+            unique_together=set([('day', 'executed')]),
+        ),
+    ]
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+import game.models.ability
+import game.models.objective
+import game.models.room
+import game.models.stage
+import game.models.weapon
+import utils.choices_enum
+
+
+# storage codes as of this migration, frozen so later enum changes can not alter them
+CODES = {
+    ('nightaction', 'action'): {
+        'move': 1, 'attack_kill': 2, 'attack_defend': 3, 'attack_blank': 4,
+        'pick_weapon': 5, 'special': 6, 'close_door': 7, 'open_door': 8,
+    },
+    ('ability', 'action_phase'): {
+        'startgame': 1, 'room': 2, 'day': 3, 'night': 4, 'voting': 5,
+    },
+    ('room', 'room_type'): {
+        'basic': 1, 'hall': 2, 'kitchen': 3, 'dormitory': 4, 'observatory': 5, 'library': 6, 'basement': 7,
+    },
+    ('weapon', 'weapon_type'): {
+        'gun': 1, 'knife': 2, 'stunt': 3, 'poison': 4,
+    },
+    ('objective', 'trigger'): {
+        'kill': 1, 'execute': 2, 'terrorize': 3, 'killed': 4, 'executed': 5,
+        'terrorized': 6, 'dead': 7, 'endgame': 8,
+    },
+}
+
+
+def encode(apps, schema_editor):
+    for ((model_name, field), codes) in CODES.items():
+        Model = apps.get_model('game', model_name)
+        for (value, code) in codes.items():
+            Model.objects.using(schema_editor.connection.alias).filter(**{field: value}).update(**{field + '_code': code})
+
+
+def decode(apps, schema_editor):
+    for ((model_name, field), codes) in CODES.items():
+        Model = apps.get_model('game', model_name)
+        for (value, code) in codes.items():
+            Model.objects.using(schema_editor.connection.alias).filter(**{field + '_code': code}).update(**{field: value})
+
+
+MAX_LENGTHS = {
+    ('nightaction', 'action'): 32,
+}
+
+
+def code_field(model_name, field):
+    """
+    Adds the code column, and lets the old column be empty so the migration can be reversed
+    """
+    return [
+        migrations.AddField(
+            model_name=model_name,
+            name=field + '_code',
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name=model_name,
+            name=field,
+            field=models.CharField(max_length=MAX_LENGTHS.get((model_name, field), 16), null=True),
+        ),
+    ]
+
+
+def swap_fields(model_name, field):
+    return [
+        migrations.RemoveField(model_name=model_name, name=field),
+        migrations.RenameField(model_name=model_name, old_name=field + '_code', new_name=field),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0005_votes'),
+    ]
+
+    operations = [operation for (model_name, field) in sorted(CODES) for operation in code_field(model_name, field)] + [
+        migrations.RunPython(encode, decode),
+    ] + [operation for (model_name, field) in sorted(CODES) for operation in swap_fields(model_name, field)] + [
+        migrations.AlterField(
+            model_name='nightaction',
+            name='action',
+            field=utils.choices_enum.ChoicesEnumField(enum=game.models.stage.NightActions),
+        ),
+        migrations.AlterField(
+            model_name='ability',
+            name='action_phase',
+            field=utils.choices_enum.ChoicesEnumField(enum=game.models.ability.AbilityActionPhase, null=True),
+        ),
+        migrations.AlterField(
+            model_name='room',
+            name='room_type',
+            field=utils.choices_enum.ChoicesEnumField(enum=game.models.room.RoomType),
+        ),
+        migrations.AlterField(
+            model_name='weapon',
+            name='weapon_type',
+            field=utils.choices_enum.ChoicesEnumField(enum=game.models.weapon.WeaponType),
+        ),
+        migrations.AlterField(
+            model_name='objective',
+            name='trigger',
+            field=utils.choices_enum.ChoicesEnumField(enum=game.models.objective.ObjectiveTrigger),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.10 on 2026-10-19 16:49
+from __future__ import unicode_literals
+
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+import game.models.message
+import utils.choices_enum
+
+
+def link_recipients(apps, schema_editor):
+    GameMessage = apps.get_model('game', 'GameMessage')
+    MessageRecipient = apps.get_model('game', 'MessageRecipient')
+    db = schema_editor.connection.alias
+
+    messages = GameMessage.objects.using(db).filter(character__isnull=False).values_list('pk', 'character').iterator()
+    batch = []
+    for (message_id, character_id) in messages:
+        batch.append(MessageRecipient(message_id=message_id, character_id=character_id))
+        if len(batch) == 1000:
+            MessageRecipient.objects.using(db).bulk_create(batch)
+            batch = []
+    MessageRecipient.objects.using(db).bulk_create(batch)
+
+
+def copy_per_recipient(apps, schema_editor):
+    GameMessage = apps.get_model('game', 'GameMessage')
+    MessageRecipient = apps.get_model('game', 'MessageRecipient')
+    db = schema_editor.connection.alias
+
+    for message in GameMessage.objects.using(db).iterator():
+        text = message.message
+        if message.template is not None:
+            text = game.models.message.TEMPLATE_TEXTS[message.template].format(**json.loads(message.params or '{}'))
+
+        receipts = list(MessageRecipient.objects.using(db).filter(message=message).values_list('character', flat=True))
+        GameMessage.objects.using(db).filter(pk=message.pk).update(message=text, character_id=receipts[0] if receipts else None)
+        for character_id in receipts[1:]:
+            GameMessage.objects.using(db).create(character_id=character_id, message=text, received_on=message.received_on,
+                                       current_night_id=message.current_night_id,
+                                       current_day_id=message.current_day_id,
+                                       current_room_id=message.current_room_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0006_enum_codes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageRecipient',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('read', models.BooleanField(default=False)),
+                ('character', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='game.Character')),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receipts', to='game.GameMessage')),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='messagerecipient',
+            unique_together=set([('character', 'message')]),
+        ),
+        migrations.AddField(
+            model_name='gamemessage',
+            name='params',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='gamemessage',
+            name='template',
+            field=utils.choices_enum.ChoicesEnumField(blank=True, enum=game.models.message.MessageTemplates, null=True),
+        ),
+        migrations.AlterField(
+            model_name='gamemessage',
+            name='message',
+            field=models.TextField(blank=True),
+        ),
+        migrations.RunPython(link_recipients, copy_per_recipient),
+        migrations.RemoveField(
+            model_name='gamemessage',
+            name='character',
+        ),
+        migrations.AddField(
+            model_name='gamemessage',
+            name='recipients',
+            field=models.ManyToManyField(related_name='messages', through='game.MessageRecipient', to='game.Character'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import game.models.gameplay
+import utils.choices_enum
+
+
+def link_games(apps, schema_editor):
+    """
+    Sets the game of existing messages from any of their recipients
+    """
+    GameMessage = apps.get_model('game', 'GameMessage')
+    MessageRecipient = apps.get_model('game', 'MessageRecipient')
+    db = schema_editor.connection.alias
+
+    games = {}
+    for (message_id, game_id) in MessageRecipient.objects.using(db).values_list('message', 'character__game'):
+        games.setdefault(game_id, set()).add(message_id)
+    for (game_id, message_ids) in games.items():
+        GameMessage.objects.using(db).filter(pk__in=message_ids).update(game_id=game_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0007_message_recipients'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='finished_on',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='state',
+            field=utils.choices_enum.ChoicesEnumField(default='active', editable=False, enum=game.models.gameplay.GameState),
+        ),
+        migrations.AddField(
+            model_name='gamemessage',
+            name='game',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='messages', to='game.Game'),
+        ),
+        migrations.AlterField(
+            model_name='gamemessage',
+            name='current_day',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='game.Day'),
+        ),
+        migrations.AlterField(
+            model_name='gamemessage',
+            name='current_night',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='game.Night'),
+        ),
+        migrations.AlterField(
+            model_name='gamemessage',
+            name='current_room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='game.GameRoom'),
+        ),
+        migrations.RunPython(link_games, migrations.RunPython.noop),
+    ]
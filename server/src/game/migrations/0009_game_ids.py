@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def continue_game_ids(apps, schema_editor):
+    """
+    Starts the id sequence after the existing games
+    """
+    Game = apps.get_model('game', 'Game')
+    GameId = apps.get_model('game', 'GameId')
+    last = Game.objects.using(schema_editor.connection.alias).order_by('-pk').values_list('pk', flat=True).first()
+    if last is not None:
+        GameId.objects.using(schema_editor.connection.alias).create(pk=last)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0008_game_state_retention'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameId',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+        ),
+        migrations.RunPython(continue_game_ids, migrations.RunPython.noop),
+    ]
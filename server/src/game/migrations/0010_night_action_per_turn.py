@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0009_game_ids'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='nightaction',
+            unique_together=set([('night_turn', 'character')]),
+        ),
+    ]
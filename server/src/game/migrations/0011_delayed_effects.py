@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0010_night_action_per_turn'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DelayedEffect',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due', models.IntegerField()),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delayed_effects', to='game.Game')),
+                ('killer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game.Character')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game.GameRoom')),
+                ('victim', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delayed_effects', to='game.Character')),
+                ('weapon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='game.CharacterWeapon')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='delayedeffect',
+            index_together=set([('game', 'due')]),
+        ),
+    ]
@@ -1,23 +1,25 @@
 
-from .gameplay import Game
+from .gameplay import GameState, GameId, Game
 from .persona import Persona
 from .ability import AbilityActionPhase, Ability, CharacterAbility
 from .objective import ObjectiveTrigger, Objective, CharacterObjective
-from .character import Character, Terror, Kill
+from .character import Character, Terror, Kill, DelayedEffect
 from .room import Room, RoomType, GameRoom
 from .weapon import Weapon, WeaponType, CharacterWeapon
-from .message import GameMessage
+from .message import MessageTemplates, GameMessage, MessageRecipient
 from .stage import Night, NightTurn, NightAction, Day
+from .vote import Vote, VoteTally, Execution
 
 
 __all__ = [
-    'Game',
+    'GameState', 'GameId', 'Game',
     'Night', 'NightAction', 'Day',
     'Persona',
     'AbilityActionPhase', 'Ability', 'CharacterAbility',
     'ObjectiveTrigger', 'Objective', 'CharacterObjective',
-    'Character', 'Terror', 'Kill',
+    'Character', 'Terror', 'Kill', 'DelayedEffect',
     'Room', 'RoomType', 'GameRoom',
     'Weapon', 'WeaponType', 'CharacterWeapon',
-    'GameMessage',
+    'MessageTemplates', 'GameMessage', 'MessageRecipient',
+    'Vote', 'VoteTally', 'Execution',
 ]
@@ -2,13 +2,16 @@
 from django.db import models
 from django.db.models import Q
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
 from functools import wraps
 
 from game.models.character import Character
 from game.models.weapon import Weapon, CharacterWeapon
 from game.models.room import GameRoom
-from game.exceptions import AbilityError
+from game.models.message import MessageTemplates
+from game.exceptions import AbilityError, WeaponUnavailable
+from game.versioning import bump_version
+from game.profiling import profiled
 
 
 class AbilityActionPhase(ChoicesEnum):
@@ -32,9 +35,7 @@ class Ability(models.Model):
     name = models.CharField(max_length=32, unique=True)
     description = models.CharField(max_length=512)
     room = models.ManyToManyField('Room', blank=True)
-    action_phase = models.CharField(max_length=16,
-                                    null=True,
-                                    choices=AbilityActionPhase.choices())
+    action_phase = ChoicesEnumField(AbilityActionPhase, null=True)
 
     class Meta:
         verbose_name_plural = 'abilities'
@@ -78,6 +79,7 @@ class CharacterAbility(models.Model):
 
         return getattr(self, ability_fn_name)
 
+    @profiled('ability.run')
     def run(self, *args, **kwargs):
         """
         executes this ability's specific method
@@ -87,7 +89,9 @@ class CharacterAbility(models.Model):
         if ability_fn is None:
             raise ValueError('ability "{}" can not be executed'.format(self.ability.name))
 
-        return ability_fn(self, *args, **kwargs)
+        ret = ability_fn(self, *args, **kwargs)
+        bump_version(self.character.game_id)
+        return ret
 
     def disable_after_run(fn):
         @wraps(fn)
@@ -106,13 +110,9 @@ class CharacterAbility(models.Model):
         the_undertaker = Character.objects.get(game=self.character.game, persona__title='The Undertaker')
         the_host = Character.objects.get(game=self.character.game, persona__title='The Host')
 
-        the_undertaker.post_message(
-            'As The Undertaker, you know The Host is {}'.format(the_host.player.username)
-        )
-
-        the_host.post_message(
-            'As The Host, you know The Undertaker is {}'.format(the_undertaker.player.username)
-        )
+        the_undertaker.post_message(template=MessageTemplates.HOST_REVEALED, player=the_host.player.username)
+        the_host.post_message(template=MessageTemplates.UNDERTAKER_REVEALED,
+                              player=the_undertaker.player.username)
 
     @disable_after_run
     def _ability_cutting_edge(self, *args, **kwargs):
@@ -138,20 +138,18 @@ class CharacterAbility(models.Model):
         The character reloads 2 Bullets
         """
         try:
-            gun = CharacterWeapon.objects.get(character=self.character, weapon__name="Gun")
-        except CharacterWeapon.DoesNotExist:
+            return CharacterWeapon.objects.reload(self.character, 'Gun', ammo=2)
+        except WeaponUnavailable:
             raise AbilityError('Character does not have a gun')
 
-        gun.ammo = 2
-        return gun.save()
-
     def _ability_gatekeeper(self, *args, room=None):
         """
         The character closes a door
         """
-        current = self.character.current_room
-        reachable_q = Q(pk=current.pk) | Q(room__pk__in=current.room.connections.all())
-        open_rooms = GameRoom.objects.open().filter(reachable_q, room__closeable=True)
+        game = self.character.game
+        current_id = game.occupancy.room_of(self.character)
+        reachable_q = Q(pk=current_id) | Q(room__connected_with__rooms__pk=current_id)
+        open_rooms = GameRoom.objects.open().filter(reachable_q, game=game, room__closeable=True)
 
         if room not in open_rooms:
             raise AbilityError('Room is closed, not closable, or out of reach')
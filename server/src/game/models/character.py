@@ -5,7 +5,7 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from game.models.message import GameMessage
-from game.models.stage import Night
+from game.versioning import bump_version
 
 class Character(models.Model):
     """
@@ -32,24 +32,47 @@ class Character(models.Model):
     def __str__(self):
         return "{} as {} on {}".format(self.player, self.persona.title, self.game)
 
-    def post_message(self, msg):
-        current_stage = {'current_day': self.game.current_day}
-        if self.game.current_day is None:
-            current_stage = {'current_night': self.game.current_night}
-
-        return GameMessage.objects.create(character=self,
-                                          current_room=self.current_room,
-                                          message=msg,
-                                          **current_stage)
+    def post_message(self, msg=None, template=None, **params):
+        """
+        Posts a message, a `MessageTemplates` template with its parameters or free text
+        """
+        return GameMessage.objects.post(self.game, [self], msg, current_room=self.current_room,
+                                        template=template, **params)
 
-    def available_actions(self):  # TODO
+    def available_actions(self):
         """
         Returns all available action that the character may execute at this point.
+
+        Computed once per night turn and game version, see `LegalMoves.cached`.
+        """
+        from game.moves import LegalMoves
+        return LegalMoves.cached(self)
+
+    def _tracked_occupancy(self):
         """
+        The game occupancy, only if it has already been built for this instance's game
+        """
+        if type(self).game.is_cached(self):
+            return self.game.__dict__.get('occupancy')
+
+    def move(self, room):
+        self.current_room = room
+        self.save(update_fields=('current_room', ))
+        bump_version(self.game_id)
+
+        occupancy = self._tracked_occupancy()
+        if occupancy is not None:
+            occupancy.move(self, room)
 
     def hide(self):
         self.hidden = True
-        return self.save(update_fields=('hidden', ))
+        ret = self.save(update_fields=('hidden', ))
+        bump_version(self.game_id)
+
+        occupancy = self._tracked_occupancy()
+        if occupancy is not None:
+            occupancy.hide(self)
+        return ret
 
 class Terror(models.Model):
     """
@@ -75,3 +98,36 @@ class Kill(models.Model):
 
     class Meta:
         unique_together = (('killer', 'killed'), )
+
+
+class DelayedEffectManager(models.Manager):
+
+    def pop_due(self, game_id, turn_index):
+        """
+        Removes and returns the effects of a game due by a turn, earliest first
+        """
+        effects = list(self.filter(game_id=game_id, due__lte=turn_index).order_by('due', 'pk'))
+        if effects:
+            self.filter(pk__in=[effect.pk for effect in effects]).delete()
+        return effects
+
+
+class DelayedEffect(models.Model):
+    """
+    A pending effect of a weapon with effect turns (poison) on its victim.
+
+    Effects are due at a night turn of the game, counted across nights (see
+    `NightTurn.index`). Through the (game, due) index the table works as a
+    priority queue per game: each turn reads only the effects firing in it.
+    """
+    game = models.ForeignKey('Game', related_name='delayed_effects', on_delete=models.CASCADE)
+    due = models.IntegerField()
+    victim = models.ForeignKey('Character', related_name='delayed_effects', on_delete=models.CASCADE)
+    killer = models.ForeignKey('Character', related_name='+', on_delete=models.CASCADE)
+    room = models.ForeignKey('GameRoom', related_name='+', on_delete=models.CASCADE)
+    weapon = models.ForeignKey('CharacterWeapon', related_name='+', on_delete=models.CASCADE)
+
+    objects = DelayedEffectManager()
+
+    class Meta:
+        index_together = (('game', 'due'), )
@@ -1,15 +1,44 @@
 
+import random
+from datetime import timedelta
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
 from mansion import settings
 
 from game.models.ability import CharacterAbility
 from game.models.stage import Night, Day
+from game.models.message import GameMessage
 from game.exceptions import GameUnstarted, GameComplete
+from game.occupancy import RoomOccupancy
+from game.versioning import bump_version
+from game.profiling import profiled
+
+
+def new_seed():
+    return random.SystemRandom().randrange(2 ** 31)
+
+
+class GameState(ChoicesEnum):
+    """
+    Lifecycle of a game. Completed games are archived after `GAME_ARCHIVE_AFTER`
+    days, and each state keeps its messages for a different time.
+    """
+    ACTIVE = 'active'
+    COMPLETE = 'complete'
+    ARCHIVED = 'archived'
+
+
+class GameId(models.Model):
+    """
+    Allocates game ids in the default database, unique across game shards
+    """
 
 
 class Game(models.Model):
@@ -29,20 +58,68 @@ class Game(models.Model):
                                       related_name='current_night')
     current_day = models.ForeignKey('Day', null=True, blank=True, on_delete=models.CASCADE,
                                     related_name='current_day')
+    version = models.PositiveIntegerField(default=0, editable=False)
+    seed = models.PositiveIntegerField(default=new_seed)
+    deadline = models.DateTimeField(null=True, blank=True, db_index=True, editable=False)
+    state = ChoicesEnumField(GameState, default=GameState.ACTIVE, editable=False)
+    finished_on = models.DateTimeField(null=True, blank=True, editable=False)
 
     def __str__(self):
         return "Game {}".format(self.pk)
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the game, leaving out the version of existing games: only
+        `bump_version` changes it, and an instance loaded earlier holds a stale one
+        """
+        if self.pk is not None and not self._state.adding and not kwargs.get('force_insert') \
+                and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [field.name for field in self._meta.concrete_fields
+                                       if not field.primary_key and field.name != 'version']
+        return super().save(*args, **kwargs)
+
+    @cached_property
+    def occupancy(self):
+        """
+        Who is in each room of the game.
+
+        Built with a single query on first use, and kept in sync as moves resolve
+        """
+        return RoomOccupancy.for_game(self)
+
+    def rng(self, *scope):
+        """
+        A random generator for one purpose of the game, such as `rng('characters')`.
+
+        Generators are derived from the game seed and the scope, so a game replayed
+        with the same seed draws the same numbers regardless of the process or
+        the order in which scopes are used.
+        """
+        return random.Random(':'.join(str(part) for part in (self.seed, ) + scope))
+
+    def schedule_deadline(self, seconds):
+        """
+        Sets when the current stage expires, `seconds` from now, or clears it if None.
+
+        Expired stages are advanced by the deadline worker (see `game.deadlines`).
+        """
+        self.deadline = None if seconds is None else timezone.now() + timedelta(seconds=seconds)
+        Game.objects.filter(pk=self.pk).update(deadline=self.deadline)
+
+    @profiled('game.start')
     def start(self):
         """
         Kickstarts the game
         """
         self.current_night = Night.objects.create(game=self)
-        self.save()
+        self.save(update_fields=('current_night', ))
 
         for ability in CharacterAbility.objects.phase_start():
             ability.run(game=self)
 
+        bump_version(self.pk)
+
+    @profiled('game.next_stage')
     def next_stage(self):
         """
         Cycles through Nights and Days until the end of the game is reached
@@ -50,20 +127,45 @@ class Game(models.Model):
         if self.current_day is None and self.current_night is None:
             raise GameUnstarted
         elif self.nights.all().count() == settings.GAME_NUMBER_NIGHTS:
+            self.finish()
             raise GameComplete
 
         elif self.current_day is None:
             stage_number = self.current_night.number
             self.current_day = Day.objects.create(game=self, number=stage_number)
             self.current_night = None
+            self.schedule_deadline(settings.GAME_DAY_TIMEOUT)
 
         elif self.current_night is None:
             stage_number = self.current_day.number + 1
             self.current_night = Night.objects.create(game=self, number=stage_number)
             self.current_day = None
 
-        return self.save()
+        ret = self.save(update_fields=('current_night', 'current_day'))
+        bump_version(self.pk)
+        return ret
 
-    def broadcast_message(self, msg):
-        for character in self.characters.all():
-            character.post_message(msg)
+    def clone(self):
+        """
+        Copies the game at its current stage, with bulk inserts in a single transaction
+        """
+        from game.cloning import clone_game
+        return clone_game(self)
+
+    def finish(self):
+        """
+        Marks the game as complete, with no deadline left to expire
+        """
+        if self.state != GameState.ACTIVE:
+            return
+
+        self.state, self.finished_on, self.deadline = GameState.COMPLETE, timezone.now(), None
+        Game.objects.filter(pk=self.pk, state=GameState.ACTIVE).update(state=self.state,
+                                                                       finished_on=self.finished_on,
+                                                                       deadline=None)
+
+    def broadcast_message(self, msg=None, template=None, **params):
+        """
+        Posts a message to every character, stored once
+        """
+        return GameMessage.objects.post(self, self.characters.all(), msg, template=template, **params)
@@ -1,22 +1,110 @@
 
+import json
+
 from django.db import models
 
+from utils import ChoicesEnum, ChoicesEnumField
+
+
+class MessageTemplates(ChoicesEnum):
+    """
+    Game generated messages, stored by code and rendered from `TEMPLATE_TEXTS`
+    with their parameters when read.
+    """
+    WEAPON_UNAVAILABLE = 'weapon_unavailable'
+    OUT_OF_AMMO = 'out_of_ammo'
+    ATTACK_INTENTION = 'attack_intention'
+    HOST_REVEALED = 'host_revealed'
+    UNDERTAKER_REVEALED = 'undertaker_revealed'
+
+
+TEMPLATE_TEXTS = {
+    MessageTemplates.WEAPON_UNAVAILABLE: 'The {weapon} was no longer there',
+    MessageTemplates.OUT_OF_AMMO: 'Your {weapon} is out of ammo',
+    MessageTemplates.ATTACK_INTENTION: 'Someone in the room is getting ready to use the {weapon}',
+    MessageTemplates.HOST_REVEALED: 'As The Undertaker, you know The Host is {player}',
+    MessageTemplates.UNDERTAKER_REVEALED: 'As The Host, you know The Undertaker is {player}',
+}
+
+
+class GameMessageManager(models.Manager):
+
+    def post(self, game, characters, msg=None, current_room=None, template=None, **params):
+        """
+        Posts a message to some characters.
+
+        The message is stored once, either as a `template` from `MessageTemplates`
+        with its parameters or as the free text `msg`, and linked to every
+        recipient. Rooms may be given as instances or primary keys. Returns the message.
+        """
+        current_stage = {'current_day': game.current_day}
+        if game.current_day is None:
+            current_stage = {'current_night': game.current_night}
+
+        message = self.create(game=game,
+                              template=template,
+                              params=json.dumps(params) if params else '',
+                              message='' if template else msg,
+                              current_room_id=getattr(current_room, 'pk', current_room),
+                              **current_stage)
+        MessageRecipient.objects.bulk_create(MessageRecipient(message=message, character=character)
+                                             for character in characters)
+        return message
+
 
 class GameMessage(models.Model):
     """
-    A Game message to a player.
+    A Game message to one or more players.
 
     Messages are crucial to the game development, as they are required
     for certain actions and events.
     """
-    character = models.ForeignKey('Character',
-                                  blank=True, null=True, on_delete=models.SET_NULL,
-                                  related_name='messages')
-    current_night = models.ForeignKey('Night', blank=True, null=True, on_delete=models.SET_NULL)
-    current_day = models.ForeignKey('Day', blank=True, null=True, on_delete=models.SET_NULL)
-    current_room = models.ForeignKey('GameRoom', blank=True, null=True, on_delete=models.SET_NULL)
-    message = models.TextField()
+    game = models.ForeignKey('Game', null=True, related_name='messages', on_delete=models.CASCADE)
+    recipients = models.ManyToManyField('Character', through='MessageRecipient', related_name='messages')
+    current_night = models.ForeignKey('Night', blank=True, null=True, on_delete=models.CASCADE)
+    current_day = models.ForeignKey('Day', blank=True, null=True, on_delete=models.CASCADE)
+    current_room = models.ForeignKey('GameRoom', blank=True, null=True, on_delete=models.CASCADE)
+    template = ChoicesEnumField(MessageTemplates, blank=True, null=True)
+    params = models.TextField(blank=True)
+    message = models.TextField(blank=True)
     received_on = models.DateTimeField(auto_now_add=True)
 
+    objects = GameMessageManager()
+
+    def __str__(self):
+        return 'Message {} ({})'.format(self.pk, self.received_on)
+
+    @property
+    def text(self):
+        if self.template is None:
+            return self.message
+        return TEMPLATE_TEXTS[self.template].format(**json.loads(self.params or '{}'))
+
+
+class MessageRecipientManager(models.Manager):
+
+    def mark_read(self, character, messages=None):
+        """
+        Marks the messages of a character as read, all of them by default
+        """
+        receipts = self.filter(character=character, read=False)
+        if messages is not None:
+            receipts = receipts.filter(message__in=messages)
+        return receipts.update(read=True)
+
+
+class MessageRecipient(models.Model):
+    """
+    A message delivered to a character
+    """
+    message = models.ForeignKey('GameMessage', related_name='receipts', on_delete=models.CASCADE)
+    character = models.ForeignKey('Character', related_name='receipts', on_delete=models.CASCADE)
+    read = models.BooleanField(default=False)
+
+    objects = MessageRecipientManager()
+
+    class Meta:
+        unique_together = (('character', 'message'), )
+
     def __str__(self):
-        return 'Message for "{}" ({})'.format(self.character, self.received_on)
+        return 'Message {} for "{}"'.format(self.message_id, self.character)
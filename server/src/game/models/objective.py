@@ -1,9 +1,12 @@
 
 from django.db import models
+from django.dispatch import Signal
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
 
 
+objective_triggered = Signal(providing_args=['trigger', 'objectives'])
+
 
 class ObjectiveTrigger(ChoicesEnum):
     """
@@ -27,13 +30,34 @@ class Objective(models.Model):
     """
     name = models.CharField(max_length=64, unique=True)
     description = models.CharField(max_length=256)
-    trigger = models.CharField(max_length=16, choices=ObjectiveTrigger.choices())
+    trigger = ChoicesEnumField(ObjectiveTrigger)
     points = models.IntegerField()
 
     def __str__(self):
         return self.name
 
 
+class CharacterObjectiveManager(models.Manager):
+
+    def triggered_by(self, trigger, characters):
+        """
+        Incomplete objectives of some characters that are checked on a trigger
+        """
+        return (self.filter(character__in=characters, objective__trigger=trigger, complete=False)
+                    .select_related('objective'))
+
+    def trigger(self, trigger, characters, **context):
+        """
+        Fires an objective trigger for some characters.
+
+        Receivers of `objective_triggered` get the objectives to check along with
+        the context of the event (for instance, the execution that fired it).
+        """
+        objectives = self.triggered_by(trigger, characters)
+        objective_triggered.send(sender=CharacterObjective, trigger=trigger, objectives=objectives, **context)
+        return objectives
+
+
 class CharacterObjective(models.Model):
     """
     Game character's objetive tracking.
@@ -43,6 +67,8 @@ class CharacterObjective(models.Model):
     points = models.IntegerField(default=0)
     complete = models.BooleanField(default=False)
 
+    objects = CharacterObjectiveManager()
+
     class Meta:
         unique_together = (('character', 'objective'), )
 
@@ -1,7 +1,8 @@
 
 from django.db import models
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
+from game.versioning import bump_version
 
 
 class RoomType(ChoicesEnum):
@@ -31,7 +32,7 @@ class Room(models.Model):
     Rooms have doors that may be closed by ghosts and open by living players.
     """
     name = models.CharField(max_length=64, unique=True)
-    room_type = models.CharField(max_length=16, choices=RoomType.choices())
+    room_type = ChoicesEnumField(RoomType)
     closeable = models.BooleanField(default=True)
     connections = models.ManyToManyField('self',
                                          blank=True,
@@ -75,7 +76,9 @@ class GameRoom(models.Model):
     def close(self):
         self.is_open = False
         self.save(update_fields=('is_open', ))
+        bump_version(self.game_id)
 
     def open(self):
         self.is_open = True
         self.save(update_fields=('is_open', ))
+        bump_version(self.game_id)
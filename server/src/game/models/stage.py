@@ -1,12 +1,22 @@
 
 from django.db import models
+from django.db.models import Case, When, Value
 from django.contrib.auth.models import User
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
 from mansion import settings
 
+from game.models.character import Terror, Kill, DelayedEffect
+from game.models.message import GameMessage, MessageTemplates
+from game.models.objective import ObjectiveTrigger, CharacterObjective
+from game.models.vote import Vote, Execution
+from game.models.weapon import CharacterWeapon, WEAPON_PRIORITY
+from game.exceptions import OutOfAmmo, WeaponUnavailable, InvalidVote
+from game.versioning import bump_version
+from game.profiling import profiled
+
 
 class Night(models.Model):
     """
@@ -29,13 +39,18 @@ class Night(models.Model):
     def is_new(self):
         return self.turn_count() == 0
 
+    @profiled('night.next_turn')
     def next_turn(self):
         turn_count = self.turn_count() + 1
         if turn_count > settings.GAME_NIGHT_TURNS:
             return self.game.next_stage()
 
         self.current_turn = NightTurn.objects.create(night=self, number=turn_count)
-        return self.save()
+        ret = self.save()
+        self.current_turn.resolve_effects()
+        self.game.schedule_deadline(settings.GAME_TURN_TIMEOUT)
+        bump_version(self.game_id)
+        return ret
 
 @receiver(post_save, sender=Night)
 def start_new_night(sender, instance, *args, **kwargs):
@@ -56,6 +71,202 @@ class NightTurn(models.Model):
     def __str__(self):
         return "Turn {} in {}".format(self.number, self.night)
 
+    @property
+    def index(self):
+        """
+        Position of the turn in the game, counting the turns of every night
+        """
+        return self.night.number * settings.GAME_NIGHT_TURNS + self.number
+
+    def resolve(self):
+        """
+        Applies the confirmed actions of the turn.
+
+        Characters move first, then pick up weapons and finally attack. The game
+        occupancy is kept in sync all along, and terrors are recorded once
+        everyone is in place.
+        """
+        occupancy = self.night.game.occupancy
+        actions = list(self.actions.confirmed().select_related('weapon_target').order_by('pk'))
+
+        def of_type(action_type):
+            return [action for action in actions if action.action == action_type]
+
+        self.resolve_moves(occupancy, of_type(NightActions.MOVE))
+        self.resolve_pickups(occupancy, of_type(NightActions.PICK_WEAPON))
+        self.resolve_attacks(occupancy, of_type(NightActions.ATTACK_KILL))
+        self.record_terrors(occupancy)
+
+        bump_version(self.night.game_id)
+
+    def expire(self):
+        """
+        Closes the turn when its deadline passes.
+
+        Pending actions are confirmed as selected, characters who did not act
+        pass, and the turn is resolved as if everyone had confirmed.
+        """
+        self.actions.pending().update(confirmed=True)
+        acted = self.actions.values_list('character', flat=True)
+        idle = self.night.game.characters.exclude(pk__in=acted).values_list('pk', flat=True)
+        NightAction.objects.bulk_create(
+            NightAction(night_turn=self, character_id=character_id,
+                        action=NightActions.ATTACK_BLANK, confirmed=True)
+            for character_id in idle
+        )
+
+        self.resolve()
+        return self.night.next_turn()
+
+    def is_resolved(self):
+        """
+        Whether every character confirmed an action, which resolves the turn
+        """
+        return self.actions.confirmed().count() >= self.night.game.characters.all().count()
+
+    def advance_if_complete(self):
+        """
+        Resolves the turn and moves on once every character confirmed an action
+        """
+        if self.is_resolved():
+            self.resolve()
+            return self.night.next_turn()
+
+    def resolve_moves(self, occupancy, actions):
+        """
+        Writes all moves with a single UPDATE
+        """
+        moves = dict((action.character_id, action.room_target_id)
+                     for action in actions if action.room_target_id is not None)
+        if not moves:
+            return
+
+        destination = Case(*[When(pk=character_id, then=Value(room_id))
+                             for (character_id, room_id) in moves.items()],
+                           output_field=models.IntegerField())
+        self.night.game.characters.filter(pk__in=moves.keys()).update(current_room=destination)
+
+        for (character_id, room_id) in moves.items():
+            occupancy.move(character_id, room_id)
+
+    def resolve_pickups(self, occupancy, actions):
+        for action in actions:
+            if action.weapon_target is None:
+                continue
+
+            room_id = occupancy.room_of(action.character_id)
+            try:
+                CharacterWeapon.objects.pick_up(action.character_id, room_id, action.weapon_target)
+            except WeaponUnavailable:
+                occupancy[action.character_id].post_message(template=MessageTemplates.WEAPON_UNAVAILABLE,
+                                                             weapon=action.weapon_target.name)
+
+    def resolve_attacks(self, occupancy, actions):
+        """
+        Resolves attacks by weapon priority, spending one round per attack.
+
+        Weapons with effect turns (poison) only start the countdown of the victim,
+        scheduling a delayed effect that kills them when it is due. Characters
+        are in no room until they first move, and can not attack or be attacked.
+        """
+        actions = [action for action in actions
+                   if action.weapon_target is not None and action.character_target_id is not None]
+        if not actions:
+            return
+
+        actions.sort(key=lambda action: WEAPON_PRIORITY.index(action.weapon_target.weapon_type))
+        carried = CharacterWeapon.objects.filter(character__in=[action.character_id for action in actions])
+        carried = dict(((character_id, weapon_id), pk)
+                       for (character_id, weapon_id, pk) in carried.values_list('character', 'weapon', 'pk'))
+
+        kills, effects = [], []
+        for action in actions:
+            attacker, victim, weapon = action.character_id, action.character_target_id, action.weapon_target
+            room_id = occupancy.room_of(attacker)
+            character_weapon = carried.get((attacker, weapon.pk))
+
+            if character_weapon is None or not occupancy[attacker].alive or not occupancy[victim].alive:
+                continue
+            if room_id is None or occupancy.room_of(victim) != room_id:
+                continue
+
+            try:
+                CharacterWeapon.objects.consume_ammo(character_weapon)
+            except OutOfAmmo:
+                occupancy[attacker].post_message(template=MessageTemplates.OUT_OF_AMMO, weapon=weapon.name)
+                continue
+
+            if weapon.effect_turns:
+                self.night.game.characters.filter(pk=victim).update(turns_to_die=weapon.effect_turns)
+                effects.append(DelayedEffect(game_id=self.night.game_id, due=self.index + weapon.effect_turns,
+                                             victim_id=victim, killer_id=attacker, room_id=room_id,
+                                             weapon_id=character_weapon))
+                continue
+
+            occupancy.kill(victim)
+            kills.append(Kill(killer_id=attacker, killed_id=victim, room_id=room_id,
+                              weapon_id=character_weapon))
+
+        if kills:
+            Kill.objects.bulk_create(kills)
+            self.night.game.characters.filter(pk__in=[kill.killed_id for kill in kills]).update(alive=False)
+        if effects:
+            DelayedEffect.objects.bulk_create(effects)
+
+    def resolve_effects(self):
+        """
+        Applies the delayed effects due by this turn.
+
+        Poisoned characters still alive die: their Kill rows are created and
+        KILLED and DEAD fire for them. Turns without due effects cost a single
+        indexed query.
+        """
+        game = self.night.game
+        effects = DelayedEffect.objects.pop_due(game.pk, self.index)
+        if not effects:
+            return []
+
+        victims = set(effect.victim_id for effect in effects)
+        dead = set(game.characters.filter(pk__in=victims, alive=False).values_list('pk', flat=True))
+        kills = []
+        for effect in effects:
+            if effect.victim_id in dead:
+                continue
+            dead.add(effect.victim_id)
+            kills.append(Kill(killer_id=effect.killer_id, killed_id=effect.victim_id,
+                              room_id=effect.room_id, weapon_id=effect.weapon_id))
+        if not kills:
+            return []
+
+        killed = [kill.killed_id for kill in kills]
+        Kill.objects.bulk_create(kills)
+        game.characters.filter(pk__in=killed).update(alive=False)
+
+        occupancy = game.__dict__.get('occupancy')
+        if occupancy is not None:
+            for character_id in killed:
+                occupancy.kill(character_id)
+
+        CharacterObjective.objects.trigger(ObjectiveTrigger.KILLED, killed, turn=self, kills=kills)
+        CharacterObjective.objects.trigger(ObjectiveTrigger.DEAD, killed, turn=self, kills=kills)
+        return kills
+
+    def record_terrors(self, occupancy):
+        """
+        Creates the Terror rows for every ghost finding a living character alone
+        """
+        terrors = list(occupancy.terrors())
+        if not terrors:
+            return []
+
+        game_rooms = [room_id for (room_id, terrorized, ghosts) in terrors]
+        rooms = dict(self.night.game.rooms.filter(pk__in=game_rooms).values_list('pk', 'room_id'))
+        return Terror.objects.bulk_create(
+            Terror(ghost=ghost, terrorized=terrorized, room_id=rooms[room_id])
+            for (room_id, terrorized, ghosts) in terrors
+            for ghost in ghosts
+        )
+
 class NightActions(ChoicesEnum):
     """
     All the actions a player may execute during a night's turn.
@@ -71,6 +282,9 @@ class NightActions(ChoicesEnum):
     OPEN_DOOR = 'open_door'
 
 
+NIGHT_ACTIONS = frozenset(NightActions.values())
+
+
 class NightActionManager(models.Manager):
 
     def confirmed(self):
@@ -92,7 +306,7 @@ class NightAction(models.Model):
     """
     night_turn = models.ForeignKey('NightTurn', related_name='actions', on_delete=models.CASCADE)
     character = models.ForeignKey('Character', related_name='night_turns', on_delete=models.PROTECT)
-    action = models.CharField(max_length=32, choices=NightActions.choices())
+    action = ChoicesEnumField(NightActions)
     confirmed = models.BooleanField(default=False)
     character_target = models.ForeignKey('Character', null=True, on_delete=models.PROTECT)
     room_target = models.ForeignKey('GameRoom', null=True, on_delete=models.PROTECT)
@@ -100,20 +314,39 @@ class NightAction(models.Model):
 
     objects = NightActionManager()
 
+    class Meta:
+        unique_together = (('night_turn', 'character'), )
+
     def __str__(self):
         return "{} by {} in {}".format(self.action, self.character.persona.name, self.night_turn)
 
+@receiver(post_save, sender=NightAction)
+def announce_intention(sender, instance, created, *args, **kwargs):
+    """
+    Intention weapons inform the players in the room when an attack
+    with them is selected.
+    """
+    weapon = instance.weapon_target
+    if not created or instance.action != NightActions.ATTACK_KILL or weapon is None or not weapon.intention:
+        return
+
+    attacker = instance.character
+    occupancy = attacker.game.occupancy
+    room_id = occupancy.room_of(attacker)
+    others = [character for character in occupancy.visible(room_id) if character.pk != attacker.pk]
+    if others:
+        GameMessage.objects.post(attacker.game, others, template=MessageTemplates.ATTACK_INTENTION,
+                                 current_room=room_id, weapon=weapon.name)
+
+
 @receiver(post_save, sender=NightAction)
 def check_if_turn_is_complete(sender, instance, *args, **kwargs):
     """
     Checks if this is the last confirmed action of the turn,
     and advances the night in that case.
     """
-    action_count = instance.night_turn.actions.confirmed().count()
-    characters_count = instance.night_turn.night.game.characters.all().count()
-
-    if action_count == characters_count:
-        return instance.night_turn.night.next_turn()
+    if instance.confirmed:
+        return instance.night_turn.advance_if_complete()
 
 
 class Day(models.Model):
@@ -125,7 +358,57 @@ class Day(models.Model):
     game = models.ForeignKey('game', on_delete=models.CASCADE, related_name='days')
     number = models.IntegerField(default=0)
 
+    def vote(self, voter, target):
+        """
+        Casts, changes or withdraws (when target is None) a vote for an execution
+        """
+        if self.game.current_day_id != self.pk:
+            raise InvalidVote('day {} is over'.format(self.number))
+        if not voter.alive:
+            raise InvalidVote('dead characters can not vote')
+        if target is not None and (target.game_id != self.game_id or not target.alive):
+            raise InvalidVote('only living characters in the game can be executed')
+
+        return Vote.objects.cast(self, voter, target)
+
+    def tally(self):
+        """
+        Votes per character, read from the running counts
+        """
+        return dict(self.tallies.filter(votes__gt=0).values_list('target', 'votes'))
+
+    def execute(self):
+        """
+        Executes the most voted characters, all of them on a tie.
+
+        Fires EXECUTE for the characters who voted for them, and EXECUTED and
+        DEAD for the executed.
+        """
+        tally = self.tally()
+        if not tally:
+            return []
+
+        most = max(tally.values())
+        executed = sorted(target for (target, votes) in tally.items() if votes == most)
+        executions = Execution.objects.bulk_create(
+            Execution(day=self, executed_id=character_id, votes=most) for character_id in executed
+        )
+        self.game.characters.filter(pk__in=executed).update(alive=False)
+
+        occupancy = self.game.__dict__.get('occupancy')
+        if occupancy is not None:
+            for character_id in executed:
+                occupancy.kill(character_id)
+
+        executioners = list(self.votes.filter(target__in=executed).values_list('voter', flat=True))
+        CharacterObjective.objects.trigger(ObjectiveTrigger.EXECUTE, executioners, day=self,
+                                           executed=executed)
+        CharacterObjective.objects.trigger(ObjectiveTrigger.EXECUTED, executed, day=self, executed=executed)
+        CharacterObjective.objects.trigger(ObjectiveTrigger.DEAD, executed, day=self, executed=executed)
+        return executions
+
     def end(self):
+        self.execute()
         return self.game.next_stage()
 
 
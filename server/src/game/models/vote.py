@@ -0,0 +1,107 @@
+
+from django.db import models, router, transaction, IntegrityError
+from django.db.models import F
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+class VoteManager(models.Manager):
+
+    def cast(self, day, voter, target):
+        """
+        Casts, changes or withdraws (when target is None) a character's vote.
+
+        The running tally of the previous and the new target are adjusted in the
+        same transaction. Returns False if the vote did not change.
+        """
+        day_id, voter_id, target_id = _pk(day), _pk(voter), _pk(target)
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            votes = self.filter(day_id=day_id, voter_id=voter_id)
+            previous = votes.values_list('target', flat=True).first()
+            if previous == target_id:
+                return False
+
+            if previous is not None:
+                VoteTally.objects.remove(day_id, previous)
+
+            if target_id is None:
+                votes.delete()
+            elif previous is None:
+                self.create(day_id=day_id, voter_id=voter_id, target_id=target_id)
+            else:
+                votes.update(target_id=target_id)
+
+            if target_id is not None:
+                VoteTally.objects.add(day_id, target_id)
+
+        return True
+
+
+class Vote(models.Model):
+    """
+    A character's vote for an execution during a day
+    """
+    day = models.ForeignKey('Day', related_name='votes', on_delete=models.CASCADE)
+    voter = models.ForeignKey('Character', related_name='votes', on_delete=models.CASCADE)
+    target = models.ForeignKey('Character', related_name='votes_against', on_delete=models.CASCADE)
+
+    objects = VoteManager()
+
+    class Meta:
+        unique_together = (('day', 'voter'), )
+
+    def __str__(self):
+        return "{} votes {} on day {}".format(self.voter_id, self.target_id, self.day_id)
+
+
+class VoteTallyManager(models.Manager):
+    """
+    Running vote counts.
+
+    Counts are only changed with single-statement increments, so concurrent
+    votes can not lose updates.
+    """
+
+    def add(self, day, target):
+        counted = self.filter(day_id=_pk(day), target_id=_pk(target))
+        if counted.update(votes=F('votes') + 1):
+            return
+
+        try:
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                self.create(day_id=_pk(day), target_id=_pk(target), votes=1)
+        except IntegrityError:
+            # someone else counted the first vote
+            counted.update(votes=F('votes') + 1)
+
+    def remove(self, day, target):
+        self.filter(day_id=_pk(day), target_id=_pk(target), votes__gt=0).update(votes=F('votes') - 1)
+
+
+class VoteTally(models.Model):
+    """
+    The number of votes a character has in a day, kept in step with the votes
+    """
+    day = models.ForeignKey('Day', related_name='tallies', on_delete=models.CASCADE)
+    target = models.ForeignKey('Character', related_name='tallies', on_delete=models.CASCADE)
+    votes = models.PositiveIntegerField(default=0)
+
+    objects = VoteTallyManager()
+
+    class Meta:
+        unique_together = (('day', 'target'), )
+
+
+class Execution(models.Model):
+    """
+    A character executed by vote at the end of a day
+    """
+    day = models.ForeignKey('Day', related_name='executions', on_delete=models.CASCADE)
+    executed = models.ForeignKey('Character', related_name='executions', on_delete=models.CASCADE)
+    votes = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = (('day', 'executed'), )
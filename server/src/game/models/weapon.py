@@ -1,7 +1,14 @@
 
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models import F, Q
 
-from utils import ChoicesEnum
+from utils import ChoicesEnum, ChoicesEnumField
+from game.models.room import GameRoom
+from game.exceptions import OutOfAmmo, WeaponUnavailable
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
 
 
 class WeaponType(ChoicesEnum):
@@ -17,6 +24,10 @@ class WeaponType(ChoicesEnum):
     POISON = 'poison'
 
 
+# Attacks are resolved in this order, so faster weapons may prevent slower attacks
+WEAPON_PRIORITY = (WeaponType.GUN, WeaponType.KNIFE, WeaponType.STUNT, WeaponType.POISON)
+
+
 class Weapon(models.Model):
     """
     A `The Mansion` weapon.
@@ -28,7 +39,7 @@ class Weapon(models.Model):
     """
     name = models.CharField(max_length=16, unique=True)
     description = models.CharField(max_length=256)
-    weapon_type = models.CharField(max_length=16, choices=WeaponType.choices())
+    weapon_type = ChoicesEnumField(WeaponType)
     max_ammo = models.IntegerField(blank=True, null=True)
     starting_ammo = models.IntegerField(blank=True, null=True)
     starting_room = models.ForeignKey('Room', on_delete=models.PROTECT)
@@ -40,6 +51,70 @@ class Weapon(models.Model):
         return self.name
 
 
+class CharacterWeaponManager(models.Manager):
+    """
+    Inventory operations.
+
+    Every change is a conditional single-statement write, so concurrent turns
+    can not lose updates, and failures are detected from the affected row count.
+    Characters, rooms and carried weapons may be given as instances or primary keys.
+    """
+
+    def consume_ammo(self, character_weapon):
+        """
+        Spends one round of a carried weapon. Weapons without ammo never run out.
+        """
+        loaded = Q(ammo__isnull=True) | Q(ammo__gt=0)
+        if not self.filter(loaded, pk=_pk(character_weapon)).update(ammo=F('ammo') - 1):
+            raise OutOfAmmo('weapon {} is out of ammo'.format(_pk(character_weapon)))
+
+    def reload(self, character, weapon_name, ammo):
+        """
+        Sets the ammo of a carried weapon
+        """
+        if not self.filter(character=character, weapon__name=weapon_name).update(ammo=ammo):
+            raise WeaponUnavailable('character does not carry a {}'.format(weapon_name))
+
+    def pick_up(self, character, game_room, weapon):
+        """
+        Picks a weapon from a room.
+
+        Resource weapons stay in the room, any other weapon is taken out of it.
+        A resource weapon is carried once: picking it up again returns the
+        weapon already carried.
+        """
+        RoomWeapon = GameRoom.weapons.through
+
+        with transaction.atomic(using=router.db_for_write(RoomWeapon)):
+            in_room = RoomWeapon.objects.filter(gameroom=_pk(game_room), weapon=weapon)
+            if weapon.resource:
+                carried = self.filter(character=_pk(character), weapon=weapon).first()
+                if carried is not None:
+                    return carried
+                available = in_room.exists()
+            else:
+                available = in_room.delete()[0]
+
+            if not available:
+                raise WeaponUnavailable('{} is not in the room'.format(weapon.name))
+
+            return self.create(character_id=_pk(character), weapon=weapon,
+                               picked_at_id=_pk(game_room), ammo=weapon.starting_ammo)
+
+    def drop(self, character, game_room, weapon):
+        """
+        Leaves a carried weapon in a room.
+        """
+        RoomWeapon = GameRoom.weapons.through
+
+        with transaction.atomic(using=router.db_for_write(RoomWeapon)):
+            if not self.filter(character=character, weapon=weapon).delete()[0]:
+                raise WeaponUnavailable('character does not carry a {}'.format(weapon.name))
+
+            if not weapon.resource:
+                RoomWeapon.objects.create(gameroom_id=_pk(game_room), weapon=weapon)
+
+
 class CharacterWeapon(models.Model):
     """
     A weapon carried by a player.
@@ -48,3 +123,5 @@ class CharacterWeapon(models.Model):
     weapon = models.ForeignKey('Weapon', on_delete=models.CASCADE)
     picked_at = models.ForeignKey('GameRoom', blank=True, null=True, on_delete=models.PROTECT)
     ammo = models.IntegerField(null=True)
+
+    objects = CharacterWeaponManager()
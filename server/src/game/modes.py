@@ -1,14 +1,15 @@
 
 import abc
-import random
 
 from game.models.gameplay import Game
-from game.models.weapon import Weapon, CharacterWeapon
-from game.models.room import Room, GameRoom
-from game.models.persona import Persona
-from game.models.ability import Ability, CharacterAbility
-from game.models.objective import Objective, CharacterObjective
+from game.models.weapon import CharacterWeapon
+from game.models.room import GameRoom
+from game.models.ability import CharacterAbility
+from game.models.objective import CharacterObjective
 from game.models.character import Character
+from game.catalog import get_catalog_index
+from game.sharding import new_game_shard
+from game.profiling import profiled
 
 from game.exceptions import GameModeUnavailable, InvalidPlayerCount
 
@@ -48,8 +49,26 @@ class BaseGameMode(metaclass=abc.ABCMeta):
         pass
 
     @classmethod
-    def create(cls, owner, players):
-        game = Game.objects.create(created_by=owner)
+    def warm_up(cls):
+        """
+        Resolves every catalog entity the mode uses, so a misconfigured mode
+        fails at startup and the first game is as fast as the next ones.
+        """
+        for room in cls.get_rooms():
+            cls.get_weapons_for_room(room)
+
+    @classmethod
+    @profiled('mode.create')
+    def create(cls, owner, players, seed=None):
+        with new_game_shard([owner] + list(players)) as game_id:
+            return cls.create_game(owner, players, seed, game_id)
+
+    @classmethod
+    def create_game(cls, owner, players, seed=None, game_id=None):
+        game = Game(pk=game_id, created_by=owner)
+        if seed is not None:
+            game.seed = seed
+        game.save(force_insert=True)
 
         for room in cls.get_rooms():
             weapons = cls.get_weapons_for_room(room)
@@ -57,16 +76,18 @@ class BaseGameMode(metaclass=abc.ABCMeta):
 
         game.starting_room = cls.get_starting_room(game)
 
+        abilities, objectives, weapons = [], [], []
         for character in cls.create_characters(game, players):
-            for ability in cls.get_abilities_for_character(character):
-                CharacterAbility.objects.create(character=character, ability=ability)
-
-            for objective in cls.get_objectives_for_character(character):
-                CharacterObjective.objects.create(character=character, objective=objective)
+            abilities.extend(CharacterAbility(character=character, ability=ability)
+                             for ability in cls.get_abilities_for_character(character))
+            objectives.extend(CharacterObjective(character=character, objective=objective)
+                              for objective in cls.get_objectives_for_character(character))
+            weapons.extend(CharacterWeapon(character=character, weapon=weapon, ammo=weapon.starting_ammo)
+                           for weapon in cls.get_weapons_for_character(character=character))
 
-            for weapon in cls.get_weapons_for_character(character=character):
-                CharacterWeapon.objects.create(character=character, weapon=weapon,
-                                               ammo=weapon.starting_ammo)
+        CharacterAbility.objects.bulk_create(abilities)
+        CharacterObjective.objects.bulk_create(objectives)
+        CharacterWeapon.objects.bulk_create(weapons)
 
         return game
 
@@ -128,11 +149,13 @@ class DefaultCharactersMixin:
         else:
             raise InvalidPlayerCount('Invalid number of characters ({})'.format(len(players)))
 
+        personas = get_catalog_index().personas
+        rng = game.rng('characters')
         titles = []
 
         for pool in pools:
             picked = 0
-            random.shuffle(pool['titles'])
+            rng.shuffle(pool['titles'])
 
             while picked < pool['picking']:
                 titles.append(pool['titles'].pop())
@@ -142,13 +165,13 @@ class DefaultCharactersMixin:
                 titles.remove("The Undertaker")
                 titles.append(pool['titles'].pop())
 
-        random.shuffle(titles)
+        rng.shuffle(titles)
         characters = []
 
         for (title, player) in zip(titles, players):
             try:
-                persona = Persona.objects.get(title=title)
-            except:
+                persona = personas[title]
+            except KeyError:
                 raise GameModeUnavailable('persona "{}" is not available'.format(title))
 
             character = Character.objects.create(game=game, player=player, persona=persona)
@@ -177,13 +200,14 @@ class DefaultAbilitiesMixin:
         try:
             abilities = []
             for abl_name in cls.DEFAULT_ABILITIES[character.persona.title]:
-                ability = Ability.objects.get(name=abl_name)
-                abilities.append(ability)
+                try:
+                    abilities.append(get_catalog_index().abilities[abl_name])
+                except KeyError:
+                    raise GameModeUnavailable('ability "{}" is not available'.format(abl_name))
             return abilities
-        except Ability.DoesNotExist:
-            raise GameModeUnavailable('room "{}" is not available'.format(abl_name))
         except KeyError:
-            raise GameModeUnavailable('character "{}" has no abilities defined'.format(character.title))
+            raise GameModeUnavailable('character "{}" has no abilities defined'.format(
+                character.persona.title))
 
 
 class DefaultObjectivesMixin:
@@ -206,13 +230,13 @@ class DefaultObjectivesMixin:
         try:
             objectives = []
             for obj_name in cls.DEFAULT_OBJECTIVES[character.persona.title]:
-                objective = Objective.objects.get(name=obj_name)
-                objectives.append(objective)
+                try:
+                    objectives.append(get_catalog_index().objectives[obj_name])
+                except KeyError:
+                    raise GameModeUnavailable('objective "{}" is not available'.format(obj_name))
             return objectives
-        except Objective.DoesNotExist:
-            raise GameModeUnavailable('objective "{}" is not available'.format(obj_name))
         except KeyError:
-            raise GameModeUnavailable('character "{}" is not available'.format(character.title))
+            raise GameModeUnavailable('character "{}" is not available'.format(character.persona.title))
 
 
 class DefaultRoomsMixin:
@@ -233,17 +257,17 @@ class DefaultRoomsMixin:
         try:
             rooms = []
             for room in cls.DEFAULT_ROOM_NAMES:
-                rooms.append(Room.objects.get(name=room))
+                rooms.append(get_catalog_index().rooms[room])
             return rooms
-        except Room.DoesNotExist:
+        except KeyError:
             raise GameModeUnavailable('room "{}" is not available'.format(room))
 
     @classmethod
     def get_starting_room(cls, game):
         try:
-            starting_room = Room.objects.get(name=cls.DEFAULT_STARTING_ROOM)
-        except Room.DoesNotExist:
-            raise GameModeUnavailable('room "{}" is not available'.format(starting_room))
+            starting_room = get_catalog_index().rooms[cls.DEFAULT_STARTING_ROOM]
+        except KeyError:
+            raise GameModeUnavailable('room "{}" is not available'.format(cls.DEFAULT_STARTING_ROOM))
 
         try:
             return GameRoom.objects.get(game=game, room=starting_room)
@@ -279,11 +303,11 @@ class DefaultWeaponsMixin:
         try:
             weapons = []
             for weapon_name in cls.DEFAULT_ROOM_WEAPONS[room.name]:
-                weapon = Weapon.objects.get(name=weapon_name)
-                weapons.append(weapon)
+                try:
+                    weapons.append(get_catalog_index().weapons[weapon_name])
+                except KeyError:
+                    raise GameModeUnavailable('weapon "{}" is not available'.format(weapon_name))
             return weapons
-        except Weapon.DoesNotExist:
-            raise GameModeUnavailable('weapon "{}" is not available'.format(weapon_name))
         except KeyError:
             raise GameModeUnavailable('room "{}" has no weapons defined'.format(room.name))
 
@@ -292,10 +316,9 @@ class DefaultWeaponsMixin:
         try:
             weapons = []
             for weapon_name in cls.STARTING_CHARACTER_WEAPONS:
-                weapon = Weapon.objects.get(name=weapon_name)
-                weapons.append(weapon)
+                weapons.append(get_catalog_index().weapons[weapon_name])
             return weapons
-        except Weapon.DoesNotExist:
+        except KeyError:
             raise GameModeUnavailable('weapon "{}" is not available'.format(weapon_name))
 
 class DefaultGameMode(DefaultCharactersMixin,
@@ -0,0 +1,150 @@
+"""
+Legal night moves.
+
+The legal moves of a character are the night actions it may select in the
+current turn, each with the ids it accepts for every target. They are built
+with a fixed number of queries, and checking an intent against them is a set
+lookup, so illegal intents are rejected without touching the database.
+
+Legal moves are cached per character, night turn and game version. Everything
+that changes them (moves, hiding, doors, abilities, and the pickups, ammo and
+deaths of a turn resolution) bumps the game version, so a cached entry is valid
+for as long as its key can be built.
+"""
+from django.core.cache import cache
+
+from mansion import settings
+
+from game.models.ability import AbilityActionPhase
+from game.models.stage import NightActions
+from game.exceptions import IllegalMove
+from game.versioning import get_version
+
+
+TARGETS = ('character_target', 'room_target', 'weapon_target')
+
+
+def moves_key(game_id, character_id, turn_id, version):
+    return 'game:{}:moves:{}:{}:{}'.format(game_id, character_id, turn_id, version)
+
+
+class LegalMoves:
+    """
+    Maps each legal action to the targets it requires and the targets it
+    accepts, as `{action: (required, {target: ids})}`.
+    """
+
+    def __init__(self, moves):
+        self.moves = moves
+
+    def __contains__(self, action):
+        return action in self.moves
+
+    def actions(self):
+        return sorted(self.moves)
+
+    def check(self, intent):
+        """
+        Validates an intent, returning its action and targets. Raises
+        `IllegalMove` with the reason otherwise.
+        """
+        action = intent.get('action')
+        if action not in self.moves:
+            raise IllegalMove('{} is not available'.format(action))
+
+        required, accepted = self.moves[action]
+        targets = {}
+        for field in TARGETS:
+            target = intent.get(field)
+            if target is None:
+                if field in required:
+                    raise IllegalMove('{} requires a {}'.format(action, field))
+            elif not isinstance(target, int) or target not in accepted.get(field, ()):
+                raise IllegalMove('invalid {}'.format(field))
+            targets[field] = target
+
+        return action, targets
+
+    def as_dict(self):
+        return dict((action, dict((field, sorted(ids)) for (field, ids) in accepted.items()))
+                    for (action, (required, accepted)) in self.moves.items())
+
+    @classmethod
+    def cached(cls, character):
+        """
+        The legal moves of a character in the current night turn, computed once
+        per game version. There are none outside night turns.
+        """
+        night = character.game.current_night
+        turn_id = night.current_turn_id if night is not None else None
+        if turn_id is None:
+            return cls({})
+
+        key = moves_key(character.game_id, character.pk, turn_id, get_version(character.game_id))
+        moves = cache.get(key)
+        if moves is None:
+            moves = cls.for_character(character).moves
+            cache.set(key, moves, settings.GAME_MOVES_CACHE_TIMEOUT)
+        return cls(moves)
+
+    @classmethod
+    def for_character(cls, character):
+        """
+        The legal moves of a character, given the game occupancy and its rooms.
+
+        The living move between connected rooms, close and open their
+        closeable doors, pick the weapons in their room, attack the visible
+        characters in their room with the weapons they carry, and use their
+        available night abilities on anyone. The dead may only move or pass.
+        """
+        game = character.game
+        occupancy = game.occupancy
+        room_id = occupancy.room_of(character)
+
+        rooms = list(game.rooms.select_related('room').prefetch_related('room__connections'))
+        game_rooms = dict((game_room.room_id, game_room) for game_room in rooms)
+        if room_id is None:
+            # characters who never moved may go anywhere
+            connections = rooms
+        else:
+            current = next(game_room for game_room in rooms if game_room.pk == room_id)
+            connections = [game_rooms[room.pk] for room in current.room.connections.all()
+                           if room.pk in game_rooms]
+        reachable = frozenset(game_room.pk for game_room in connections)
+
+        moves = {
+            NightActions.ATTACK_BLANK: ((), {}),
+            NightActions.MOVE: (('room_target', ), {'room_target': reachable}),
+        }
+        if not occupancy[character].alive:
+            return cls(moves)
+
+        doors = frozenset(game_room.pk for game_room in connections if game_room.room.closeable)
+        moves[NightActions.ATTACK_DEFEND] = ((), {})
+        moves[NightActions.CLOSE_DOOR] = (('room_target', ), {'room_target': doors})
+        moves[NightActions.OPEN_DOOR] = (('room_target', ), {'room_target': doors})
+
+        if room_id is not None:
+            in_room = game.rooms.filter(pk=room_id).values_list('weapons', flat=True)
+            in_room = frozenset(weapon_id for weapon_id in in_room if weapon_id is not None)
+            if in_room:
+                moves[NightActions.PICK_WEAPON] = (('weapon_target', ), {'weapon_target': in_room})
+
+        # characters who never moved are in no room, with nobody to attack
+        victims = frozenset()
+        if room_id is not None:
+            victims = frozenset(other.pk for other in occupancy.visible(room_id) if other.pk != character.pk)
+        carried = frozenset(character.characterweapon_set.values_list('weapon', flat=True))
+        if victims and carried:
+            moves[NightActions.ATTACK_KILL] = (('character_target', 'weapon_target'),
+                                               {'character_target': victims, 'weapon_target': carried})
+
+        abilities = character.characterability_set.filter(available=True,
+                                                          ability__action_phase=AbilityActionPhase.NIGHT)
+        if abilities.exists():
+            moves[NightActions.SPECIAL] = ((), {
+                'character_target': frozenset(other.pk for other in occupancy if other.alive),
+                'room_target': frozenset(game_room.pk for game_room in rooms),
+            })
+
+        return cls(moves)
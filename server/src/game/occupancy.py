@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+
+def _pk(obj):
+    return getattr(obj, 'pk', obj)
+
+
+class RoomOccupancy:
+    """
+    Who is in each room of a game.
+
+    The map is built from a single query over the game characters and then kept
+    in sync as characters move, hide or die, so room-scoped rules never need to
+    query the rooms one by one.
+
+    Rooms and characters may be given either as instances or as primary keys.
+    """
+
+    def __init__(self, characters):
+        self._characters = {}
+        self._locations = {}
+        self._rooms = defaultdict(set)
+
+        for character in characters:
+            self._characters[character.pk] = character
+            self._locations[character.pk] = character.current_room_id
+            self._rooms[character.current_room_id].add(character.pk)
+
+    @classmethod
+    def for_game(cls, game):
+        return cls(game.characters.all())
+
+    def __contains__(self, character):
+        return _pk(character) in self._characters
+
+    def __getitem__(self, character):
+        return self._characters[_pk(character)]
+
+    def __iter__(self):
+        return iter(self._characters.values())
+
+    def rooms(self):
+        """
+        Ids of the rooms with at least one character in them
+        """
+        return [room_id for (room_id, pks) in self._rooms.items() if pks and room_id is not None]
+
+    def room_of(self, character):
+        return self._locations[_pk(character)]
+
+    def characters(self, room):
+        return [self._characters[pk] for pk in self._rooms.get(_pk(room), ())]
+
+    def living(self, room):
+        return [c for c in self.characters(room) if c.alive]
+
+    def visible(self, room):
+        return [c for c in self.characters(room) if c.alive and not c.hidden]
+
+    def hidden(self, room):
+        return [c for c in self.characters(room) if c.alive and c.hidden]
+
+    def dead(self, room):
+        return [c for c in self.characters(room) if not c.alive]
+
+    def terrors(self):
+        """
+        Rooms where ghosts find a living character alone.
+
+        Yields `(room_id, terrorized, ghosts)` for every room with exactly one
+        visible living character and at least one ghost, in a single pass.
+        """
+        for room_id in self.rooms():
+            visible, ghosts = [], []
+            for character in self.characters(room_id):
+                if not character.alive:
+                    ghosts.append(character)
+                elif not character.hidden:
+                    visible.append(character)
+
+            if len(visible) == 1 and ghosts:
+                yield (room_id, visible[0], ghosts)
+
+    def move(self, character, room):
+        character_id, room_id = _pk(character), _pk(room)
+        self._rooms[self._locations[character_id]].discard(character_id)
+        self._rooms[room_id].add(character_id)
+        self._locations[character_id] = room_id
+        self._characters[character_id].current_room_id = room_id
+
+    def hide(self, character):
+        self._characters[_pk(character)].hidden = True
+
+    def kill(self, character):
+        self._characters[_pk(character)].alive = False
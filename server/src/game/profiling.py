@@ -0,0 +1,262 @@
+"""
+Sampled profiling of the game entry points.
+
+With `GAME_PROFILE_RATE` above 0, that fraction of the calls to the functions
+decorated with `profiled()` (creating, starting and advancing games, night
+turns and abilities) runs under cProfile, with tracemalloc tracing the memory
+allocated during the call. Calls made from a profiled call are part of its
+profile, and are never sampled on their own.
+
+Each sampled call writes two files to `GAME_PROFILE_DIR`, in the collapsed
+stack format read by flame graph tools (one `frame;frame;frame value` line per
+stack): `.cpu.folded` with microseconds spent in each stack, and `.mem.folded`
+with the bytes allocated by each stack and still alive when the call returns.
+Only the newest `GAME_PROFILE_KEEP` files are kept. `hotspots()` sums them up.
+"""
+import cProfile
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import warnings
+from collections import Counter, defaultdict
+from functools import wraps
+
+from mansion import settings
+
+
+KINDS = ('cpu', 'mem')
+
+# cProfile attributes the call that stops it to the profiled code
+PROFILER_FRAMES = ("<method 'disable' of '_lsprof.Profiler' objects>", )
+
+# stacks below this many microseconds are not worth a line in a flame graph
+MIN_CPU_WEIGHT = 1
+
+_local = threading.local()
+_random = random.Random()
+
+# calls of profile_call() tracing memory allocations right now
+_tracing_calls = 0
+_tracing_lock = threading.Lock()
+
+
+def short_path(filename):
+    """
+    A source file path relative to the longest `sys.path` entry containing it
+    """
+    prefixes = [path for path in sys.path if path and filename.startswith(os.path.join(path, ''))]
+    if not prefixes:
+        return filename
+    return os.path.relpath(filename, max(prefixes, key=len))
+
+
+def cpu_frame(func):
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return '{}:{}({})'.format(short_path(filename), lineno, name)
+
+
+def collapse_cpu(profile):
+    """
+    Collapsed stacks of a cProfile profile, as `{stack: microseconds}`.
+
+    cProfile only records caller to callee edges, so the time of a function is
+    split between the stacks leading to it in proportion to the time of each
+    call edge. Recursive calls are folded into the first call.
+    """
+    stats = pstats.Stats(profile).stats
+    callees = defaultdict(dict)
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+
+    stacks = Counter()
+
+    def walk(func, path, frames, time_in_stack):
+        path, frames = path + (func, ), frames + (cpu_frame(func), )
+        own, cumulative = stats[func][2], stats[func][3]
+        share = time_in_stack / cumulative if cumulative else 0
+        stacks[';'.join(frames)] += own * share * 1e6
+        for (callee, edge_time) in callees[func].items():
+            if callee not in path and edge_time * share * 1e6 >= MIN_CPU_WEIGHT:
+                walk(callee, path, frames, edge_time * share)
+
+    for (func, (cc, nc, tt, ct, callers)) in stats.items():
+        if not callers and func[2] not in PROFILER_FRAMES:
+            walk(func, (), (), ct)
+
+    return dict((stack, int(weight)) for (stack, weight) in stacks.items() if weight >= MIN_CPU_WEIGHT)
+
+
+def collapse_mem(before, after):
+    """
+    Collapsed stacks of the memory allocated between two tracemalloc
+    snapshots by a profiled call, as `{stack: bytes}`
+    """
+    ignored = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    before, after = before.filter_traces(ignored), after.filter_traces(ignored)
+
+    stacks = Counter()
+    for stat in after.compare_to(before, 'traceback'):
+        if stat.size_diff <= 0:
+            continue
+        frames = list(stat.traceback)
+        if sys.version_info < (3, 7):
+            frames.reverse()  # most recent frame first until 3.7
+        # start at the profiled call, leaving out its callers and the profiler
+        calls = [index for (index, frame) in enumerate(frames) if frame.filename == cProfile.__file__]
+        if calls:
+            frames = frames[calls[-1] + 1:]
+        stacks[';'.join('{}:{}'.format(short_path(frame.filename), frame.lineno) for frame in frames)] += \
+            stat.size_diff
+    return dict(stacks)
+
+
+def rotate(directory, keep):
+    """
+    Deletes all but the newest `keep` profiles
+    """
+    profiles = sorted(name for name in os.listdir(directory) if name.endswith('.folded'))
+    for name in profiles[:max(len(profiles) - keep, 0)]:
+        os.remove(os.path.join(directory, name))
+
+
+def write_profile(entry, stacks, directory=None):
+    """
+    Writes the collapsed stacks of a call to `entry`, `{kind: {stack: value}}`
+    """
+    directory = directory or settings.GAME_PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    # names start with the time, so they sort from the oldest to the newest
+    prefix = '{:.6f}-{}-{}'.format(time.time(), os.getpid(), entry)
+    for (kind, collapsed) in stacks.items():
+        with open(os.path.join(directory, '{}.{}.folded'.format(prefix, kind)), 'w') as output:
+            for (stack, value) in sorted(collapsed.items()):
+                output.write('{} {}\n'.format(stack, value))
+
+    rotate(directory, settings.GAME_PROFILE_KEEP)
+
+
+def sampled():
+    rate = settings.GAME_PROFILE_RATE
+    return rate > 0 and not getattr(_local, 'active', False) and _random.random() < rate
+
+
+def start_tracing():
+    """
+    Starts tracemalloc for a profiled call, unless another call already did.
+
+    Tracing is global to the process, so it is counted by the calls using it,
+    and left alone if something other than the profiler started it.
+    """
+    global _tracing_calls
+    with _tracing_lock:
+        if _tracing_calls == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(settings.GAME_PROFILE_FRAMES)
+            _tracing_calls = 1
+        elif _tracing_calls:
+            _tracing_calls += 1
+
+
+def stop_tracing():
+    global _tracing_calls
+    with _tracing_lock:
+        if _tracing_calls:
+            _tracing_calls -= 1
+            if _tracing_calls == 0:
+                tracemalloc.stop()
+
+
+def take_snapshot():
+    try:
+        return tracemalloc.take_snapshot()
+    except RuntimeError:
+        return None  # stopped by something other than the profiler
+
+
+def profile_call(entry, fn, *args, **kwargs):
+    """
+    Calls a function under cProfile and tracemalloc, and writes its profile.
+
+    Failures of the profiler are warnings, they never reach the caller.
+    """
+    _local.active = True
+    tracing = False
+    try:
+        start_tracing()
+        tracing = True
+        before = take_snapshot()
+        profile = cProfile.Profile()
+    except Exception as error:
+        if tracing:
+            stop_tracing()
+        _local.active = False
+        warnings.warn('could not profile {}: {}'.format(entry, error))
+        return fn(*args, **kwargs)
+
+    try:
+        return profile.runcall(fn, *args, **kwargs)
+    finally:
+        after = take_snapshot()
+        stop_tracing()
+        _local.active = False
+        try:
+            stacks = {'cpu': collapse_cpu(profile)}
+            if before is not None and after is not None:
+                stacks['mem'] = collapse_mem(before, after)
+            write_profile(entry, stacks)
+        except Exception as error:
+            warnings.warn('could not write the profile of {}: {}'.format(entry, error))
+
+
+def profiled(entry):
+    """
+    Profiles a sample of the calls to the decorated function, as `entry`
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not sampled():
+                return fn(*args, **kwargs)
+            return profile_call(entry, fn, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def read_profiles(directory, kind, entry=None):
+    """
+    Yields the `(stack, value)` pairs of every profile of a kind
+    """
+    suffix = '.{}.folded'.format(kind)
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(suffix) or (entry is not None and name[:-len(suffix)].split('-', 2)[2] != entry):
+            continue
+        with open(os.path.join(directory, name)) as profile:
+            for line in profile:
+                stack, value = line.rstrip('\n').rsplit(' ', 1)
+                yield stack, int(value)
+
+
+def hotspots(directory=None, kind='cpu', entry=None, limit=20, inclusive=False):
+    """
+    The frames with the most time (`cpu`) or allocated bytes (`mem`) across the
+    profiles, as `(frame, self, total)` tuples. Self values count the stacks
+    ending in the frame, and totals every stack going through it. Sorted by
+    self values, or by totals with `inclusive`.
+    """
+    directory = directory or settings.GAME_PROFILE_DIR
+    own, total = Counter(), Counter()
+    for (stack, value) in read_profiles(directory, kind, entry):
+        frames = stack.split(';')
+        own[frames[-1]] += value
+        for frame in set(frames):
+            total[frame] += value
+
+    ranked = sorted(total, key=lambda frame: (total if inclusive else own)[frame], reverse=True)
+    return [(frame, own[frame], total[frame]) for frame in ranked[:limit]]
@@ -0,0 +1,144 @@
+"""
+Game recording and replay.
+
+A recording holds a game's seed and the confirmed night actions of every turn,
+with characters referred to by their position (in creation order) and rooms and
+weapons by their catalog names, so it can be replayed in any database. Replaying
+recreates the game from the same seed, feeds it the same actions and returns the
+resulting outcome together with the time it took, which makes performance
+regressions measurable over identical workloads.
+"""
+import time
+
+from game.models import CharacterWeapon, GameRoom, Kill, Night, NightAction, Terror, Weapon
+from game.modes import DefaultGameMode
+from game.players import create_guests
+from game.exceptions import GameComplete
+from game.sharding import using_game
+
+
+FORMAT = 1
+
+
+def _positions(game):
+    return dict((pk, index) for (index, pk) in
+                enumerate(game.characters.order_by('pk').values_list('pk', flat=True)))
+
+
+def outcome(game):
+    """
+    A database independent summary of the state of a game
+    """
+    positions = _positions(game)
+    characters = game.characters.order_by('pk').select_related('persona', 'current_room__room')
+    weapons = CharacterWeapon.objects.filter(character__game=game).select_related('weapon')
+
+    carried = dict((pk, []) for pk in positions)
+    for character_weapon in weapons.order_by('weapon__name', 'pk'):
+        carried[character_weapon.character_id].append([character_weapon.weapon.name, character_weapon.ammo])
+
+    kills = Kill.objects.filter(killer__game=game).select_related('weapon__weapon').order_by('pk')
+    return {
+        'nights': game.nights.count(),
+        'days': game.days.count(),
+        'characters': [{
+            'persona': character.persona.title,
+            'alive': character.alive,
+            'hidden': character.hidden,
+            'turns_to_die': character.turns_to_die,
+            'room': character.current_room.room.name if character.current_room else None,
+            'weapons': carried[character.pk],
+        } for character in characters],
+        'kills': [[positions[kill.killer_id], positions[kill.killed_id], kill.weapon.weapon.name]
+                  for kill in kills],
+        'terrors': Terror.objects.filter(terrorized__game=game).count(),
+    }
+
+
+def record(game):
+    """
+    Records the seed and confirmed actions of a game, along with its outcome
+    """
+    positions = _positions(game)
+    actions = (NightAction.objects.confirmed()
+                                  .filter(night_turn__night__game=game)
+                                  .select_related('night_turn__night', 'room_target__room', 'weapon_target')
+                                  .order_by('night_turn__night__number', 'night_turn__number', 'pk'))
+
+    turns = []
+    for action in actions:
+        stage = [action.night_turn.night.number, action.night_turn.number]
+        if not turns or turns[-1]['stage'] != stage:
+            turns.append({'stage': stage, 'actions': []})
+
+        turns[-1]['actions'].append({
+            'character': positions[action.character_id],
+            'action': action.action,
+            'character_target': positions.get(action.character_target_id),
+            'room_target': action.room_target.room.name if action.room_target else None,
+            'weapon_target': action.weapon_target.name if action.weapon_target else None,
+        })
+
+    return {
+        'format': FORMAT,
+        'seed': game.seed,
+        'players': len(positions),
+        'turns': turns,
+        'outcome': outcome(game),
+    }
+
+
+def _end_days(game):
+    game.refresh_from_db()
+    while game.current_day is not None:
+        game.current_day.end()
+        game.refresh_from_db()
+
+
+def replay(recording, prefix='replay'):
+    """
+    Replays a recording in a new game.
+
+    Returns `(game, outcome, elapsed)`, where elapsed only accounts for playing
+    the recorded actions, not for creating the game and its players.
+    """
+    if recording['format'] != FORMAT:
+        raise ValueError('unsupported recording format {}'.format(recording['format']))
+
+    players = create_guests(recording['players'], prefix)
+
+    game = DefaultGameMode.create(players[0], players, seed=recording['seed'])
+    with using_game(game.pk):
+        return _replay(game, recording)
+
+
+def _replay(game, recording):
+    game.start()
+
+    characters = list(game.characters.order_by('pk'))
+    rooms = dict((game_room.room.name, game_room)
+                 for game_room in GameRoom.objects.filter(game=game).select_related('room'))
+    weapons = dict((weapon.name, weapon) for weapon in Weapon.objects.all())
+
+    started = time.perf_counter()
+    try:
+        for turn in recording['turns']:
+            _end_days(game)
+            night = Night.objects.select_related('current_turn').get(pk=game.current_night_id)
+            night_turn = night.current_turn
+            for action in turn['actions']:
+                target = action['character_target']
+                NightAction.objects.create(night_turn=night_turn,
+                                           character=characters[action['character']],
+                                           action=action['action'],
+                                           character_target=None if target is None else characters[target],
+                                           room_target=rooms.get(action['room_target']),
+                                           weapon_target=weapons.get(action['weapon_target']),
+                                           confirmed=True)
+        _end_days(game)
+    except GameComplete:
+        pass
+    elapsed = time.perf_counter() - started
+
+    game.refresh_from_db()
+    return game, outcome(game), elapsed
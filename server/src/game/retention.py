@@ -0,0 +1,118 @@
+"""
+Message retention.
+
+Messages are kept for a number of days that depends on the state of their game
+(`GAME_MESSAGE_RETENTION`), and completed games are archived after
+`GAME_ARCHIVE_AFTER` days. Expired messages are pruned in bounded primary key
+ranges, each one in its own short transaction followed by a pause, so pruning
+never holds the database write lock for long (SQLite locks the whole file).
+With sharding, every shard is archived and pruned in turn.
+"""
+import time
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.db.models import Q, Max, Min
+from django.utils import timezone
+
+from mansion import settings
+
+from game.models import Game, GameMessage, GameState, MessageRecipient
+from game.sharding import shards, using_shard
+
+
+def archive_games(now=None, days=None):
+    """
+    Archives the games completed more than `days` ago. Returns how many
+    """
+    now = now or timezone.now()
+    days = settings.GAME_ARCHIVE_AFTER if days is None else days
+    archived = 0
+    for alias in shards() or [None]:
+        with using_shard(alias):
+            completed = Game.objects.filter(state=GameState.COMPLETE,
+                                            finished_on__lt=now - timedelta(days=days))
+            archived += completed.update(state=GameState.ARCHIVED)
+    return archived
+
+
+def expired_messages(now=None, retention=None):
+    """
+    The messages past the retention of their game state
+    """
+    now = now or timezone.now()
+    retention = settings.GAME_MESSAGE_RETENTION if retention is None else retention
+
+    expired = Q(pk__in=[])
+    for (state, days) in retention.items():
+        if days is not None:
+            expired |= Q(game__state=state, received_on__lt=now - timedelta(days=days))
+    return GameMessage.objects.filter(expired)
+
+
+class Pruner:
+    """
+    Deletes expired messages and their receipts in chunks of `chunk_size`
+    primary keys, pausing `pause` seconds between chunks.
+
+    Throughput is measured over the time spent deleting, without the pauses.
+    """
+
+    def __init__(self, chunk_size=1000, pause=0.1, retention=None):
+        self.chunk_size = chunk_size
+        self.pause = pause
+        self.retention = retention
+        self.stats = {'chunks': 0, 'messages': 0, 'receipts': 0, 'elapsed': 0.0}
+
+    @property
+    def rows_per_second(self):
+        rows = self.stats['messages'] + self.stats['receipts']
+        return rows / self.stats['elapsed'] if self.stats['elapsed'] else 0.0
+
+    def prune_chunk(self, messages, start, end):
+        """
+        Deletes the expired messages in `[start, end)`, in a single transaction
+        """
+        with transaction.atomic(using=router.db_for_write(GameMessage)):
+            ids = list(messages.filter(pk__gte=start, pk__lt=end).values_list('pk', flat=True))
+            if not ids:
+                return 0, 0
+
+            receipts = MessageRecipient.objects.filter(message__in=ids).delete()[0]
+            deleted = GameMessage.objects.filter(pk__in=ids).delete()[1].get(GameMessage._meta.label, 0)
+        return deleted, receipts
+
+    def run(self, now=None, on_chunk=None):
+        """
+        Prunes every expired message, calling `on_chunk(stats)` after each chunk
+        """
+        now = now or timezone.now()
+        for alias in shards() or [None]:
+            with using_shard(alias):
+                self.prune(now, on_chunk)
+        return self.stats
+
+    def prune(self, now, on_chunk=None):
+        """
+        Prunes the expired messages of the current database
+        """
+        messages = expired_messages(now, self.retention)
+        bounds = messages.aggregate(first=Min('pk'), last=Max('pk'))
+        if bounds['first'] is None:
+            return self.stats
+
+        for start in range(bounds['first'], bounds['last'] + 1, self.chunk_size):
+            started = time.perf_counter()
+            deleted, receipts = self.prune_chunk(messages, start, start + self.chunk_size)
+            self.stats['elapsed'] += time.perf_counter() - started
+            if not deleted:
+                continue
+
+            self.stats['chunks'] += 1
+            self.stats['messages'] += deleted
+            self.stats['receipts'] += receipts
+            if on_chunk is not None:
+                on_chunk(self.stats)
+            time.sleep(self.pause)
+
+        return self.stats
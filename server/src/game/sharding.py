@@ -0,0 +1,218 @@
+"""
+Game sharding.
+
+With `GAME_SHARDS` set, every game and the rows that depend on it (rooms,
+characters, stages, actions, messages, kills, terrors...) live in one of the
+`shard<n>` databases, chosen by game id; games never reference each other, so
+each game is served by a single shard and games on different shards never wait
+for the same SQLite write lock.
+
+The catalog (personas, abilities, objectives, rooms and weapons) and the users
+are read and written in the default database, and replicated to every shard
+with the same primary keys so game rows can join them there. Game ids are
+allocated in the default database (`GameId`) so they are unique across shards.
+
+Queries of sharded models need to know their game: they either go through an
+instance (`game.characters...`) or run inside `using_game()`, which requests
+get from `GameShardMiddleware`; anywhere else the router raises
+`ShardNotSelected` rather than guess a database. The admin serves the games of
+each shard from a site of its own, at `admin/<shard>/`. Without sharding,
+everything stays in the default database and none of this has any effect.
+"""
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from mansion import settings
+
+
+CATALOG_MODELS = ('Persona', 'Ability', 'Objective', 'Room', 'Weapon')
+
+_local = threading.local()
+
+
+class ShardNotSelected(Exception):
+    """
+    A sharded model was queried outside of any game or shard
+    """
+
+
+def shards():
+    """
+    The database alias of every shard, empty without sharding
+    """
+    return ['shard{}'.format(n) for n in range(settings.GAME_SHARDS)]
+
+
+def shard_for(game_id):
+    if not settings.GAME_SHARDS:
+        return DEFAULT_DB_ALIAS
+    return 'shard{}'.format(int(game_id) % settings.GAME_SHARDS)
+
+
+def current_shard():
+    return getattr(_local, 'shard', None)
+
+
+@contextmanager
+def using_shard(alias):
+    """
+    Routes the queries of sharded models in this thread to `alias`
+    """
+    previous = current_shard()
+    _local.shard = alias
+    try:
+        yield alias
+    finally:
+        _local.shard = previous
+
+
+def using_game(game_id):
+    """
+    Routes the queries of sharded models in this thread to the shard of a game
+    """
+    return using_shard(shard_for(game_id))
+
+
+@contextmanager
+def atomic_everywhere(rollback=False):
+    """
+    A transaction on the default database and on every shard, rolled back at
+    the end with `rollback`
+    """
+    aliases = [DEFAULT_DB_ALIAS] + shards()
+    with ExitStack() as databases:
+        for alias in aliases:
+            databases.enter_context(transaction.atomic(using=alias))
+        yield
+        if rollback:
+            for alias in aliases:
+                transaction.set_rollback(True, using=alias)
+
+
+def catalog_models():
+    """
+    The catalog models, with the many to many tables between them
+    """
+    models = [apps.get_model('game', name) for name in CATALOG_MODELS]
+    through = [field.remote_field.through for model in models for field in model._meta.local_many_to_many]
+    return models + through
+
+
+def is_sharded(model):
+    return (model._meta.app_label == 'game' and model._meta.model_name != 'gameid' and
+            model not in catalog_models())
+
+
+def replicate(queryset, alias, update=False):
+    """
+    Copies rows of the default database to another one, keeping their primary
+    keys. Rows already there are left alone, or updated with `update`.
+    Returns how many rows were copied.
+    """
+    model = queryset.model
+    pk = model._meta.pk.attname
+    rows = dict((row[pk], row) for row in queryset.using(DEFAULT_DB_ALIAS).values())
+    replicated = model.objects.using(alias)
+
+    existing = set(replicated.filter(pk__in=rows).values_list('pk', flat=True))
+    if update:
+        for key in existing:
+            replicated.filter(pk=key).update(**rows[key])
+
+    replicated.bulk_create(model(**row) for row in rows.values() if row[pk] not in existing)
+    return len(rows) - len(existing)
+
+
+def replicate_catalog(alias):
+    """
+    Brings the catalog of a shard up to date with the default database
+    """
+    return sum(replicate(model.objects.all(), alias, update=True) for model in catalog_models())
+
+
+def replicate_players(players, alias):
+    """
+    Copies the players of a game to its shard, given as users or their ids
+    """
+    return replicate(User.objects.filter(pk__in=[getattr(player, 'pk', player) for player in players]), alias)
+
+
+def allocate_game_id():
+    GameId = apps.get_model('game', 'GameId')
+    return GameId.objects.using(DEFAULT_DB_ALIAS).create().pk
+
+
+@contextmanager
+def new_game_shard(players):
+    """
+    Allocates the id of a new game and routes to its shard, with its players
+    copied there. Yields the id, or None without sharding.
+    """
+    if not settings.GAME_SHARDS:
+        yield None
+        return
+
+    game_id = allocate_game_id()
+    with using_game(game_id) as alias:
+        replicate_players(players, alias)
+        yield game_id
+
+
+class GameShardRouter:
+    """
+    Routes sharded models to the shard of their instance or of the current
+    game, and everything else to the default database.
+
+    Sharded models have no default: queries outside of `using_game()` or
+    `using_shard()` must name their database with `using()`.
+    """
+
+    def route(self, model, instance=None):
+        if not settings.GAME_SHARDS:
+            return None
+        if not is_sharded(model):
+            return DEFAULT_DB_ALIAS
+        if instance is not None and is_sharded(type(instance)) and instance._state.db is not None:
+            return instance._state.db
+
+        shard = current_shard()
+        if shard is None:
+            raise ShardNotSelected('{} queried outside of a game shard'.format(model._meta.label))
+        return shard
+
+    def db_for_read(self, model, **hints):
+        return self.route(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self.route(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the catalog and users are replicated to every shard
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
+
+
+class GameShardMiddleware:
+    """
+    Serves each request of a game from the shard of the game
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        previous = current_shard()
+        try:
+            return self.get_response(request)
+        finally:
+            _local.shard = previous
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if 'game_id' in view_kwargs:
+            _local.shard = shard_for(view_kwargs['game_id'])
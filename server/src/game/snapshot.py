@@ -0,0 +1,122 @@
+import json
+
+from django.core.cache import cache
+
+from mansion import settings
+
+from game.models import GameRoom, Character, CharacterWeapon, CharacterAbility
+from game import wire
+
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+def encode_json(snapshot):
+    return json.dumps(snapshot, separators=(',', ':')).encode('utf-8')
+
+
+ENCODERS = {
+    JSON_CONTENT_TYPE: encode_json,
+    wire.CONTENT_TYPE: wire.encode_snapshot,
+}
+
+
+def snapshot_key(game_id, version, player_id, content_type=JSON_CONTENT_TYPE):
+    return 'game:{}:snapshot:{}:{}:{}'.format(game_id, version, player_id, content_type)
+
+
+def snapshot_etag(game_id, version, player_id, content_type=JSON_CONTENT_TYPE):
+    etag = '{}-{}-{}'.format(game_id, version, player_id)
+    if content_type != JSON_CONTENT_TYPE:
+        etag += '-bin'
+    return etag
+
+
+def build_snapshot(game, character):
+    """
+    The whole state of a game as seen by one of its characters.
+
+    Hidden characters do not disclose their room to anyone but themselves.
+    """
+    turn = game.current_night.current_turn if game.current_night else None
+
+    rooms = list(GameRoom.objects.filter(game=game)
+                                 .select_related('room')
+                                 .prefetch_related('weapons', 'room__connections'))
+    game_rooms = dict((game_room.room_id, game_room.pk) for game_room in rooms)
+
+    characters = Character.objects.filter(game=game).select_related('player').order_by('pk')
+    weapons = CharacterWeapon.objects.filter(character=character).select_related('weapon').order_by('pk')
+    abilities = CharacterAbility.objects.filter(character=character).select_related('ability').order_by('pk')
+
+    return {
+        'game': game.pk,
+        'version': game.version,
+        'stage': {
+            'night': game.current_night.number if game.current_night else None,
+            'day': game.current_day.number if game.current_day else None,
+            'turn': turn.number if turn else None,
+        },
+        'rooms': [{
+            'id': game_room.pk,
+            'room': game_room.room_id,
+            'name': game_room.room.name,
+            'room_type': game_room.room.room_type,
+            'closeable': game_room.room.closeable,
+            'open': game_room.is_open,
+            'connections': [game_rooms[room.pk] for room in game_room.room.connections.all()
+                            if room.pk in game_rooms],
+            'weapons': [{'id': weapon.pk, 'name': weapon.name} for weapon in game_room.weapons.all()],
+        } for game_room in rooms],
+        'characters': [{
+            'id': other.pk,
+            'player': other.player.username,
+            'player_id': other.player_id,
+            'alive': other.alive,
+            'hidden': other.hidden,
+            'room': other.current_room_id if (not other.hidden or other.pk == character.pk) else None,
+        } for other in characters],
+        'me': {
+            'character': character.pk,
+            'persona_id': character.persona_id,
+            'persona': character.persona.name,
+            'title': character.persona.title,
+            'abilities': [{
+                'id': owned.ability_id,
+                'name': owned.ability.name,
+                'available': owned.available,
+            } for owned in abilities],
+            'weapons': [{
+                'id': carried.weapon_id,
+                'name': carried.weapon.name,
+                'weapon_type': carried.weapon.weapon_type,
+                'ammo': carried.ammo,
+            } for carried in weapons],
+        },
+    }
+
+
+def render_snapshot(game_id, version, player, content_type=JSON_CONTENT_TYPE):
+    """
+    Rendered snapshot of a game for a player, as `(version, content)`.
+
+    Content is cached per game version, player and encoding, and only rendered
+    on a cache miss. Returns `(None, None)` if the player has no character in the game.
+    """
+    content = cache.get(snapshot_key(game_id, version, player.pk, content_type))
+    if content is not None:
+        return (version, content)
+
+    character = (Character.objects.filter(game_id=game_id, player=player)
+                                  .select_related('persona', 'game__current_night__current_turn',
+                                                  'game__current_day')
+                                  .first())
+    if character is None:
+        return (None, None)
+
+    snapshot = build_snapshot(character.game, character)
+    content = ENCODERS[content_type](snapshot)
+    cache.set(snapshot_key(game_id, snapshot['version'], player.pk, content_type), content,
+              settings.GAME_SNAPSHOT_CACHE_TIMEOUT)
+
+    return (snapshot['version'], content)
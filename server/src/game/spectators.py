@@ -0,0 +1,152 @@
+"""
+Spectator feeds.
+
+Spectators see a public view of a game: the stage, the rooms, and who is alive
+and where, with roles, abilities, weapons, messages and the rooms of hidden
+characters left out. The view is rendered at most once per game version, when
+a spectator first asks for it, and appended as a JSON line to the game's feed
+file in `GAME_FEED_DIR`, which only ever grows.
+
+Spectators read the feed from the offset they already have with HTTP range
+requests. The feed position (version, length and offset of the last frame) is
+kept in the cache, so once a version is published each read is a cache lookup
+and a file read, however many spectators and however complex the game.
+"""
+import fcntl
+import json
+import os
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from mansion import settings
+
+from game.models import Character, Game, GameRoom
+from game.snapshot import encode_json
+from game.versioning import get_version
+
+
+CONTENT_TYPE = 'application/x-ndjson'
+
+# how far back to look at a time for the start of the last frame
+TAIL_SIZE = 4096
+
+FeedState = namedtuple('FeedState', ('version', 'length', 'last_frame'))
+
+EMPTY_FEED = FeedState(None, 0, 0)
+
+
+def feed_key(game_id):
+    return 'game:{}:feed'.format(game_id)
+
+
+def feed_path(game_id):
+    return os.path.join(settings.GAME_FEED_DIR, '{}.jsonl'.format(game_id))
+
+
+def build_public_view(game, version):
+    """
+    The state of a game anyone may see, at `version`
+    """
+    turn = game.current_night.current_turn if game.current_night else None
+    rooms = (GameRoom.objects.filter(game=game).select_related('room')
+                             .prefetch_related('weapons').order_by('pk'))
+    characters = Character.objects.filter(game=game).select_related('player').order_by('pk')
+
+    return {
+        'game': game.pk,
+        'version': version,
+        'state': game.state,
+        'stage': {
+            'night': game.current_night.number if game.current_night else None,
+            'day': game.current_day.number if game.current_day else None,
+            'turn': turn.number if turn else None,
+        },
+        'rooms': [{
+            'id': game_room.pk,
+            'name': game_room.room.name,
+            'open': game_room.is_open,
+            'weapons': [weapon.name for weapon in game_room.weapons.all()],
+        } for game_room in rooms],
+        'characters': [{
+            'id': character.pk,
+            'player': character.player.username,
+            'alive': character.alive,
+            'room': None if character.hidden else character.current_room_id,
+        } for character in characters],
+    }
+
+
+def encode_frame(view):
+    return encode_json(view) + b'\n'
+
+
+def read_state(feed):
+    """
+    The position of a feed, read from the end of its file
+    """
+    length = feed.seek(0, os.SEEK_END)
+    if not length:
+        return EMPTY_FEED
+
+    # frames end with a newline, the last frame starts after the one before it
+    start = length - 1
+    while start > 0:
+        block = max(start - TAIL_SIZE, 0)
+        feed.seek(block)
+        newline = feed.read(start - block).rfind(b'\n')
+        if newline >= 0:
+            start = block + newline + 1
+            break
+        start = block
+
+    feed.seek(start)
+    return FeedState(json.loads(feed.read().decode('utf-8'))['version'], length, start)
+
+
+def publish(game_id):
+    """
+    Appends the public view of a game to its feed, unless the feed is already
+    at the current version. Returns the position of the feed.
+
+    Only one process appends at a time; the others wait for it and find the
+    frame it appended, so each version is still rendered once.
+    """
+    os.makedirs(settings.GAME_FEED_DIR, exist_ok=True)
+    with open(feed_path(game_id), 'a+b') as feed:
+        fcntl.flock(feed, fcntl.LOCK_EX)
+        state, version = read_state(feed), get_version(game_id)
+        if state.version != version:
+            game = (Game.objects.select_related('current_night__current_turn', 'current_day')
+                                .get(pk=game_id))
+            frame = encode_frame(build_public_view(game, version))
+            feed.write(frame)
+            feed.flush()
+            state = FeedState(version, state.length + len(frame), state.length)
+
+    cache.set(feed_key(game_id), state, settings.GAME_FEED_CACHE_TIMEOUT)
+    return state
+
+
+def feed_state(game_id):
+    """
+    The position of a game's feed at the current version of the game, publishing
+    it if needed. Returns None if the game does not exist.
+    """
+    version = get_version(game_id)
+    if version is None:
+        return None
+
+    state = cache.get(feed_key(game_id))
+    if state is None or state.version != version:
+        state = publish(game_id)
+    return state
+
+
+def read_feed(game_id, offset, length):
+    """
+    The bytes of a feed from `offset` up to `length`
+    """
+    with open(feed_path(game_id), 'rb') as feed:
+        feed.seek(offset)
+        return feed.read(length - offset)
@@ -0,0 +1,216 @@
+"""
+Concurrency stress testing.
+
+Many workers, threads or processes, play one game at once through the HTTP
+API, with several workers per player so that every player races against
+itself as well as against the others: confirmed turns, two step submissions
+and confirmations, replaced pending actions, abilities and, for the owner,
+ending days. Once they are done, the game is checked against the invariants
+that races would break.
+
+Workers retry requests that find the database locked, and count every
+response: accepted, rejected (4xx other than 409), conflicting (409, such as
+an action confirmed by another worker first), or failed with an exception.
+"""
+import json
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from django.db.models import Count
+from django.test.utils import override_settings
+
+from mansion import settings
+
+from game.bots import Bot, RandomPolicy
+from game.models import CharacterWeapon, Game, GameState, Night, NightTurn
+from game.sharding import using_game
+
+
+OPERATIONS = ('turn', 'submit_and_confirm', 'replace_and_confirm')
+
+
+def check_invariants(game):
+    """
+    The invariants of a game broken by concurrent writes, as a list of
+    violations, empty when they all hold
+    """
+    violations = []
+    game = Game.objects.get(pk=game.pk)
+
+    duplicated = (NightTurn.objects.filter(night__game=game).values('night__number', 'number')
+                                   .annotate(turns=Count('pk')).filter(turns__gt=1))
+    violations.extend('night {night__number} has {turns} turns number {number}'.format(**turn)
+                      for turn in duplicated)
+
+    nights = list(game.nights.order_by('number').values_list('number', flat=True))
+    days = list(game.days.order_by('number').values_list('number', flat=True))
+    if nights != list(range(len(nights))):
+        violations.append('nights are numbered {}'.format(nights))
+    if days != list(range(len(days))):
+        violations.append('days are numbered {}'.format(days))
+    if len(nights) - len(days) not in (0, 1):
+        violations.append('{} nights and {} days'.format(len(nights), len(days)))
+    if game.current_night is not None and game.current_day is not None:
+        violations.append('a night and a day are both current')
+    if game.current_night is not None and game.current_night.number != len(nights) - 1:
+        violations.append('night {} is current, not the last one'.format(game.current_night.number))
+    if game.current_day is not None and (game.current_day.number != len(days) - 1 or
+                                         len(days) != len(nights)):
+        violations.append('day {} is current, not the last stage'.format(game.current_day.number))
+
+    for night in Night.objects.filter(game=game).select_related('current_turn'):
+        turns = sorted(night.night_turns.values_list('number', flat=True))
+        numbered = sorted(set(turns)) == list(range(1, len(set(turns)) + 1))
+        if not numbered or len(turns) > settings.GAME_NIGHT_TURNS:
+            violations.append('night {} has turns {}'.format(night.number, turns))
+        if night.current_turn is not None and night.current_turn.number != max(turns):
+            violations.append('turn {} of night {} is current, not the last one'.format(
+                night.current_turn.number, night.number))
+
+    negative = CharacterWeapon.objects.filter(character__game=game, ammo__lt=0)
+    violations.extend('weapon {} has {} rounds'.format(weapon.pk, weapon.ammo) for weapon in negative)
+
+    return violations
+
+
+class StressBot(Bot):
+    """
+    A bot that keeps acting, whether or not another worker for the same
+    player already did, counting the outcome of every request
+    """
+
+    def __init__(self, player, game_id, rng, owner=False):
+        super().__init__(player, game_id, RandomPolicy(rng))
+        self.rng = rng
+        self.owner = owner
+        self.stats.update({'accepted': 0, 'conflicts': 0, 'rejected': 0, 'errors': 0})
+        self.errors = Counter()
+
+    def request(self, method, path, data=None, **headers):
+        response = super().request(method, path, data, **headers)
+        if method == 'post' and response.status_code in (200, 201):
+            self.stats['accepted'] += 1
+        elif response.status_code == 409:
+            self.stats['conflicts'] += 1
+        elif response.status_code >= 400:
+            self.stats['rejected'] += 1
+        return response
+
+    def complete(self, response):
+        if response.status_code != 200:
+            return False
+        return json.loads(response.content.decode('utf-8')).get('complete', False)
+
+    def act(self):
+        """
+        Performs one random operation, returns whether the game completed
+        """
+        snapshot = self.observe()
+        if snapshot['stage']['day'] is not None:
+            if not self.owner:
+                return False
+            return self.complete(self.request('post', 'day/end/'))
+
+        intent = self.policy.choose(snapshot)
+        operation = self.rng.choice(OPERATIONS)
+        if operation == 'turn':
+            return self.complete(self.request('post', 'turn/', dict(intent, confirm=True)))
+
+        if operation == 'submit_and_confirm':
+            response = self.request('post', 'actions/', intent)
+            if response.status_code != 201:
+                return False
+            action_id = json.loads(response.content.decode('utf-8'))['id']
+            return self.complete(self.request('post', 'actions/{}/confirm/'.format(action_id)))
+
+        self.request('post', 'turn/', dict(intent, confirm=False))
+        return self.complete(self.request('post', 'turn/', dict(intent, confirm=True)))
+
+    def hammer(self, operations):
+        """
+        Acts until the game is over or after `operations` operations
+        """
+        for operation in range(operations):
+            if not Game.objects.filter(pk=self.game_id, state=GameState.ACTIVE).exists():
+                break
+            try:
+                if self.act():
+                    break
+            except Exception as error:
+                # a race the API does not handle, reported as such
+                self.stats['errors'] += 1
+                self.errors[type(error).__name__] += 1
+        return dict(self.stats, errors_by_type=dict(self.errors))
+
+
+def hammer(player_id, game_id, seed, operations, owner, process=False):
+    """
+    Runs one worker, in a thread or in a process of its own
+    """
+    if process:
+        # connections are not shared with the parent, and local memory caches
+        # are per process: without a shared cache, read versions from the database
+        connections.close_all()
+        if isinstance(caches['default'], LocMemCache):
+            override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}).enable()
+    try:
+        with using_game(game_id):
+            player = User.objects.get(pk=player_id)
+            return StressBot(player, game_id, random.Random(seed), owner).hammer(operations)
+    finally:
+        connections.close_all()
+
+
+class StressRun:
+    """
+    Plays a started game with `contention` workers per player, each making up
+    to `operations` operations, in threads or with `processes`
+    """
+
+    def __init__(self, game, contention=2, operations=200, processes=False, seed=None):
+        self.game = game
+        self.contention = contention
+        self.operations = operations
+        self.processes = processes
+        self.rng = random.Random(seed)
+        self.stats = {}
+
+    def workers(self):
+        players = self.game.characters.order_by('pk').values_list('player', flat=True)
+        return [(player, self.game.pk, self.rng.random(), self.operations,
+                 player == self.game.created_by_id, self.processes)
+                for player in players for worker in range(self.contention)]
+
+    def run(self):
+        workers = self.workers()
+        Executor = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+
+        connections.close_all()
+        started = time.perf_counter()
+        with Executor(max_workers=len(workers)) as pool:
+            results = list(pool.map(hammer, *zip(*workers)))
+        elapsed = time.perf_counter() - started
+
+        totals, errors = Counter(), Counter()
+        for result in results:
+            errors.update(result.pop('errors_by_type'))
+            totals.update(result)
+
+        with using_game(self.game.pk):
+            violations = check_invariants(self.game)
+            complete = Game.objects.filter(pk=self.game.pk).exclude(state=GameState.ACTIVE).exists()
+
+        requests = totals['requests'] or 1
+        self.stats = dict(totals, workers=len(workers), elapsed=elapsed, complete=complete,
+                          errors_by_type=dict(errors), violations=violations,
+                          requests_per_second=totals['requests'] / elapsed if elapsed else 0.0,
+                          conflict_rate=totals['conflicts'] / requests,
+                          retry_rate=totals['retries'] / requests)
+        return self.stats
@@ -2,3 +2,24 @@
 from game._tests.test_modes import *
 from game._tests.test_abilities import *
 from game._tests.test_gameplay import *
+from game._tests.test_occupancy import *
+from game._tests.test_weapons import *
+from game._tests.test_admin import *
+from game._tests.test_snapshot import *
+from game._tests.test_bots import *
+from game._tests.test_replay import *
+from game._tests.test_deadlines import *
+from game._tests.test_votes import *
+from game._tests.test_choices_enum import *
+from game._tests.test_warmup import *
+from game._tests.test_messages import *
+from game._tests.test_retention import *
+from game._tests.test_export import *
+from game._tests.test_sharding import *
+from game._tests.test_moves import *
+from game._tests.test_cloning import *
+from game._tests.test_profiling import *
+from game._tests.test_stress import *
+from game._tests.test_throttling import *
+from game._tests.test_players import *
+from game._tests.test_spectators import *
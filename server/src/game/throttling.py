@@ -0,0 +1,90 @@
+"""
+Rate limiting of game actions.
+
+Every player in a game, and every game, has a token bucket: requests spend a
+token, tokens come back at a steady rate up to the burst size, and requests
+finding the bucket empty are rejected with the time until the next token. A
+player spamming actions runs out of tokens long before its game does, so the
+other players keep playing.
+
+Buckets are stored in the cache as the time their next token is due (the
+generic cell rate algorithm), a single value per bucket, so limiting never
+touches the database. Buckets are only shared by processes sharing the cache:
+with the default local memory cache each process has its own, which is why
+serving from several processes requires memcached (`MANSION_MEMCACHED`).
+Concurrent requests may both take the last token; limits are best effort.
+"""
+import math
+import time
+
+from django.core.cache import cache
+
+from mansion import settings
+
+
+def bucket_key(scope, *ids):
+    return 'throttle:{}:{}'.format(scope, ':'.join(str(pk) for pk in ids))
+
+
+def rejected_key(scope):
+    return 'throttle:rejected:{}'.format(scope)
+
+
+class TokenBucket:
+    """
+    `burst` tokens refilled at `rate` tokens per second
+    """
+
+    def __init__(self, key, burst, rate):
+        self.key = key
+        self.burst = burst
+        self.rate = rate
+
+    def take(self, now=None):
+        """
+        Takes a token. Returns 0 if there was one, or the seconds until the next one
+        """
+        now = time.time() if now is None else now
+        interval = 1.0 / self.rate
+        due = max(cache.get(self.key) or now, now)
+
+        wait = due - (self.burst - 1) * interval - now
+        if wait > 0:
+            return wait
+
+        cache.set(self.key, due + interval, math.ceil(due + interval - now))
+        return 0.0
+
+
+def count_rejected(scope):
+    if not cache.add(rejected_key(scope), 1, None):
+        try:
+            cache.incr(rejected_key(scope))
+        except ValueError:
+            pass  # evicted in between, this one is lost
+
+
+def throttle(game_id, player_id, now=None):
+    """
+    Takes a token for an action of a player, first from the player's bucket and
+    then from the game's. Returns 0 if allowed, or the seconds to wait.
+    """
+    buckets = (('player', (game_id, player_id)), ('game', (game_id, )))
+    for (scope, ids) in buckets:
+        limit = settings.GAME_THROTTLE.get(scope)
+        if limit is None:
+            continue
+
+        wait = TokenBucket(bucket_key(scope, *ids), *limit).take(now)
+        if wait:
+            count_rejected(scope)
+            return wait
+    return 0.0
+
+
+def rejected():
+    """
+    Requests rejected by each limit since the counters were last evicted
+    """
+    counts = cache.get_many([rejected_key(scope) for scope in settings.GAME_THROTTLE])
+    return dict((scope, counts.get(rejected_key(scope), 0)) for scope in settings.GAME_THROTTLE)
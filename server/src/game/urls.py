@@ -0,0 +1,20 @@
+from django.conf.urls import url
+
+from game import views
+
+
+urlpatterns = [
+    url(r'^catalog/$', views.catalog, name='catalog'),
+    url(r'^throttling/$', views.throttling, name='throttling'),
+    url(r'^games/(?P<game_id>\d+)/$', views.game_snapshot, name='game-snapshot'),
+    url(r'^games/(?P<game_id>\d+)/spectate/$', views.spectate, name='spectate'),
+    url(r'^games/(?P<game_id>\d+)/token/$', views.player_token, name='player-token'),
+    url(r'^games/(?P<game_id>\d+)/actions/$', views.submit_action, name='submit-action'),
+    url(r'^games/(?P<game_id>\d+)/actions/(?P<action_id>\d+)/confirm/$', views.confirm_action,
+        name='confirm-action'),
+    url(r'^games/(?P<game_id>\d+)/turn/$', views.play_turn, name='play-turn'),
+    url(r'^games/(?P<game_id>\d+)/day/end/$', views.end_day, name='end-day'),
+    url(r'^games/(?P<game_id>\d+)/votes/$', views.votes, name='votes'),
+    url(r'^games/(?P<game_id>\d+)/messages/$', views.messages, name='messages'),
+    url(r'^games/(?P<game_id>\d+)/messages/read/$', views.read_messages, name='read-messages'),
+]
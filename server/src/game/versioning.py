@@ -0,0 +1,37 @@
+from django.apps import apps
+from django.core.cache import cache
+from django.db.models import F
+
+
+def version_key(game_id):
+    return 'game:{}:version'.format(game_id)
+
+
+def bump_version(game_id):
+    """
+    Marks a game as changed.
+
+    The counter lives in the game row, and is mirrored in the cache so that
+    clients can check for changes without touching the game tables.
+    """
+    Game = apps.get_model('game', 'Game')
+    Game.objects.filter(pk=game_id).update(version=F('version') + 1)
+
+    try:
+        cache.incr(version_key(game_id))
+    except ValueError:
+        pass  # not cached, the next read will load it
+
+
+def get_version(game_id):
+    """
+    Current version of a game, or None if the game does not exist
+    """
+    version = cache.get(version_key(game_id))
+    if version is None:
+        Game = apps.get_model('game', 'Game')
+        version = Game.objects.filter(pk=game_id).values_list('version', flat=True).first()
+        if version is not None:
+            cache.add(version_key(game_id), version)
+
+    return version
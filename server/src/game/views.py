@@ -1,3 +1,505 @@
-from django.shortcuts import render
+import json
+import math
+import re
+from functools import wraps
 
-# Create your views here.
+from django.db import IntegrityError, router, transaction
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.urls import reverse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
+
+from mansion import settings
+
+from game.models import Character, Day, GameRoom, MessageRecipient, Weapon, NightAction
+from game.models.stage import NIGHT_ACTIONS
+from game.exceptions import GameComplete, IllegalMove, InvalidVote
+from game.catalog import get_catalog
+from game.snapshot import render_snapshot, snapshot_etag, JSON_CONTENT_TYPE
+from game.versioning import get_version
+from game.throttling import throttle, rejected
+from game.players import issue_token
+from game import spectators
+from game import wire
+
+
+MESSAGES_PAGE_SIZE = 50
+
+RANGE_RE = re.compile(r'^bytes=(\d+)-$')
+
+
+def error_response(status, error):
+    return JsonResponse({'error': error}, status=status)
+
+
+def throttled(view):
+    """
+    Rate limits the POST requests of players to a game, answering 429 with the
+    seconds to wait in `Retry-After` when they go over their limit. Requests of
+    users not playing the game are rejected before spending any token.
+    """
+    @wraps(view)
+    def throttled_view(request, game_id, *args, **kwargs):
+        if request.method == 'POST':
+            if get_player_character(request, game_id) is None:
+                return error_response(403, 'not playing this game')
+            wait = throttle(game_id, request.user.pk)
+            if wait:
+                response = JsonResponse({'error': 'too many requests', 'retry_after': wait}, status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+        return view(request, game_id, *args, **kwargs)
+    return throttled_view
+
+
+def deprecated(replacement):
+    """
+    Marks the responses of a view superseded by the `replacement` view with a
+    `Warning` header pointing to it
+    """
+    def decorator(view):
+        @wraps(view)
+        def deprecated_view(request, game_id, *args, **kwargs):
+            response = view(request, game_id, *args, **kwargs)
+            response['Warning'] = '299 - "Deprecated, use {}"'.format(
+                reverse(replacement, kwargs={'game_id': game_id}))
+            return response
+        return deprecated_view
+    return decorator
+
+
+def get_player_character(request, game_id):
+    """
+    The requesting player's character in a game, with its current stage.
+
+    Looked up once per request, throttled views and the views themselves share it
+    """
+    if not request.user.is_authenticated:
+        return None
+
+    cached = getattr(request, 'game_character', None)
+    if cached is not None and cached.game_id == int(game_id):
+        return cached
+
+    characters = Character.objects.filter(game_id=game_id, player=request.user)
+    if getattr(request, 'player', None) is not None:
+        characters = characters.filter(pk=request.player.character_id)
+    character = characters.select_related('game__current_night__current_turn', 'game__current_day').first()
+    request.game_character = character
+    return character
+
+
+def select_action(turn, character, fields):
+    """
+    Selects a character's action for a night turn with a single INSERT, or a
+    single UPDATE of its pending action when it already selected one, so that
+    concurrent requests never insert two actions nor undo a confirmation.
+
+    Returns whether the action was selected, False if it was already
+    confirmed, and whether confirming it completed the game. Errors of the
+    turn resolution a confirmation triggers are raised.
+    """
+    complete = False
+    using = router.db_for_write(NightAction)
+    with transaction.atomic(using=using):
+        try:
+            with transaction.atomic(using=using):
+                try:
+                    NightAction(night_turn=turn, character=character, **fields).save(force_insert=True)
+                except GameComplete:
+                    complete = True
+        except IntegrityError:
+            # the insert was rolled back, so unless an action was already
+            # selected for this turn the error came from resolving the turn
+            if not NightAction.objects.filter(night_turn=turn, character=character).exists():
+                raise
+
+            pending = NightAction.objects.pending().filter(night_turn=turn, character=character)
+            if not pending.update(**fields):
+                return False, False
+            if fields.get('confirmed'):
+                try:
+                    turn.advance_if_complete()
+                except GameComplete:
+                    complete = True
+
+    return True, complete
+
+
+def parse_accept(header):
+    """
+    The quality of each media range in an Accept header
+    """
+    ranges = {}
+    for media_range in header.split(','):
+        media_type, *params = [part.strip() for part in media_range.split(';')]
+        if not media_type:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges[media_type.lower()] = quality
+    return ranges
+
+
+def accepted_quality(ranges, content_type):
+    """
+    The quality of a content type, from the most specific range matching it
+    """
+    for media_range in (content_type, content_type.split('/')[0] + '/*', '*/*'):
+        if media_range in ranges:
+            return ranges[media_range]
+    return 0.0
+
+
+def negotiate_snapshot_type(request):
+    """
+    Clients opt into the compact binary encoding through the Accept header, it
+    is used when accepted at least as well as JSON
+    """
+    ranges = parse_accept(request.META.get('HTTP_ACCEPT', ''))
+    binary = accepted_quality(ranges, wire.CONTENT_TYPE)
+    if binary > 0 and binary >= accepted_quality(ranges, JSON_CONTENT_TYPE):
+        return wire.CONTENT_TYPE
+    return JSON_CONTENT_TYPE
+
+
+@require_GET
+def game_snapshot(request, game_id):
+    """
+    The whole game as seen by the requesting player.
+
+    Answers `If-None-Match` from the cached game version alone, without touching
+    the game tables.
+    """
+    if not request.user.is_authenticated:
+        return error_response(403, 'authentication required')
+
+    version = get_version(game_id)
+    if version is None:
+        return error_response(404, 'game not found')
+
+    content_type = negotiate_snapshot_type(request)
+    etag = snapshot_etag(game_id, version, request.user.pk, content_type)
+    if_none_match = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        version, content = render_snapshot(game_id, version, request.user, content_type)
+        if content is None:
+            return error_response(403, 'not playing this game')
+
+        response = HttpResponse(content, content_type=content_type)
+        etag = snapshot_etag(game_id, version, request.user.pk, content_type)
+
+    response['ETag'] = quote_etag(etag)
+    patch_vary_headers(response, ('Accept', ))
+    return response
+
+
+@require_GET
+def throttling(request):
+    """
+    The requests rejected by each rate limit, for staff
+    """
+    if not request.user.is_staff:
+        return error_response(403, 'staff only')
+    return JsonResponse({'rejected': rejected()})
+
+
+@require_GET
+def catalog(request):
+    """
+    The rules catalog, to resolve the ids used by compact snapshots
+    """
+    return JsonResponse(get_catalog())
+
+
+@require_GET
+def spectate(request, game_id):
+    """
+    The public feed of a game, one JSON frame per line and per game version.
+
+    Spectators ask for the frames after the bytes they already have with a
+    `Range: bytes=<offset>-` header, and get 416 when there are none yet.
+    """
+    state = spectators.feed_state(game_id)
+    if state is None:
+        return error_response(404, 'game not found')
+
+    offset = 0
+    range_match = RANGE_RE.match(request.META.get('HTTP_RANGE', ''))
+    if range_match:
+        offset = int(range_match.group(1))
+        if offset >= state.length:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(state.length)
+            return response
+
+    response = HttpResponse(spectators.read_feed(game_id, offset, state.length),
+                            content_type=spectators.CONTENT_TYPE, status=206 if offset else 200)
+    if offset:
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(offset, state.length - 1, state.length)
+    response['Accept-Ranges'] = 'bytes'
+    response['X-Feed-Version'] = str(state.version)
+    response['X-Feed-Last-Frame'] = str(state.last_frame)
+    return response
+
+
+@require_POST
+def player_token(request, game_id):
+    """
+    A signed token for the requesting player in a game, to authenticate
+    further requests with an `Authorization: Bearer` header instead of a session.
+
+    Tokens are only issued to active users logged in with a session, so a
+    token cannot renew itself past `GAME_TOKEN_MAX_AGE`.
+    """
+    if getattr(request, 'player', None) is not None:
+        return error_response(403, 'tokens cannot issue tokens')
+    if request.user.is_authenticated and not request.user.is_active:
+        return error_response(403, 'inactive user')
+
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    return JsonResponse({'token': issue_token(request.user.pk, character.game_id, character.pk),
+                         'character': character.pk, 'expires_in': settings.GAME_TOKEN_MAX_AGE})
+
+
+@require_POST
+@deprecated('play-turn')
+@throttled
+def submit_action(request, game_id):
+    """
+    Selects the requesting player's action for the current night turn.
+
+    Expects a JSON body with the `action` and its optional `character_target`,
+    `room_target` and `weapon_target` ids. A pending action may be replaced
+    until it is confirmed.
+
+    Deprecated in favour of `play_turn`, which checks the action against the
+    legal moves and confirms it in the same request. Kept, and writing through
+    the same `select_action`, until older clients are gone.
+    """
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    game = character.game
+    if game.current_night is None or game.current_night.current_turn is None:
+        return error_response(409, 'no night turn in progress')
+
+    try:
+        intent = json.loads(request.body.decode('utf-8'))
+    except ValueError:
+        return error_response(400, 'invalid JSON body')
+
+    if intent.get('action') not in NIGHT_ACTIONS:
+        return error_response(400, 'unknown action')
+
+    targets = {
+        'character_target': Character.objects.filter(game=game),
+        'room_target': GameRoom.objects.filter(game=game),
+        'weapon_target': Weapon.objects.all(),
+    }
+    for (field, queryset) in targets.items():
+        target_id = intent.get(field)
+        if target_id is not None and not queryset.filter(pk=target_id).exists():
+            return error_response(400, 'invalid {}'.format(field))
+
+    turn = game.current_night.current_turn
+    fields = dict(('{}_id'.format(field), intent.get(field)) for field in targets)
+    fields.update(action=intent['action'], confirmed=False)
+    selected, complete = select_action(turn, character, fields)
+    if not selected:
+        return error_response(409, 'action already confirmed')
+
+    action_id = (NightAction.objects.filter(night_turn=turn, character=character)
+                                    .values_list('pk', flat=True).get())
+    return JsonResponse({'id': action_id, 'turn': turn.number}, status=201)
+
+
+@require_http_methods(['GET', 'POST'])
+@throttled
+def play_turn(request, game_id):
+    """
+    The requesting player's legal moves in the current night turn, or their
+    whole turn in a single request.
+
+    POST a JSON body with the `action`, its optional `character_target`,
+    `room_target` and `weapon_target` ids, and `confirm`. Illegal moves are
+    rejected from the legal move set alone; legal ones are written with a
+    single INSERT, or a single UPDATE when replacing a pending action.
+    """
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    game = character.game
+    if game.current_night is None or game.current_night.current_turn is None:
+        return error_response(409, 'no night turn in progress')
+
+    turn = game.current_night.current_turn
+    moves = character.available_actions()
+    if request.method == 'GET':
+        return JsonResponse({'turn': turn.number, 'moves': moves.as_dict()})
+
+    try:
+        intent = json.loads(request.body.decode('utf-8'))
+        action, targets = moves.check(intent)
+    except (ValueError, AttributeError):
+        return error_response(400, 'invalid JSON body')
+    except IllegalMove as e:
+        return error_response(400, e.msg)
+
+    confirmed = bool(intent.get('confirm', False))
+    fields = dict(('{}_id'.format(field), target) for (field, target) in targets.items())
+    fields.update(action=action, confirmed=confirmed)
+
+    selected, complete = select_action(turn, character, fields)
+    if not selected:
+        return error_response(409, 'action already confirmed')
+
+    return JsonResponse({'turn': turn.number, 'confirmed': confirmed, 'complete': complete})
+
+
+@require_POST
+@deprecated('play-turn')
+@throttled
+def confirm_action(request, game_id, action_id):
+    """
+    Confirms a pending action of the current night turn. The turn is resolved
+    once every character confirms.
+
+    Deprecated in favour of `play_turn`, like `submit_action`.
+    """
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    game = character.game
+    if game.current_night is None or game.current_night.current_turn is None:
+        return error_response(409, 'no night turn in progress')
+
+    action = NightAction.objects.filter(pk=action_id, character=character,
+                                        night_turn=game.current_night.current_turn).first()
+    if action is None:
+        return error_response(404, 'action not found')
+    if action.confirmed:
+        return error_response(409, 'action already confirmed')
+
+    action.confirmed = True
+    complete = False
+    with transaction.atomic(using=router.db_for_write(NightAction)):
+        try:
+            action.save(update_fields=('confirmed', ))
+        except GameComplete:
+            complete = True
+
+    return JsonResponse({'confirmed': True, 'complete': complete})
+
+
+@require_POST
+def end_day(request, game_id):
+    """
+    Ends the current day. Only the game owner may end it.
+    """
+    character = get_player_character(request, game_id)
+    if character is None or character.game.created_by_id != request.user.pk:
+        return error_response(403, 'only the game owner may end the day')
+
+    day = character.game.current_day
+    if day is None:
+        return error_response(409, 'no day in progress')
+
+    complete = False
+    with transaction.atomic(using=router.db_for_write(Day)):
+        try:
+            day.end()
+        except GameComplete:
+            complete = True
+
+    return JsonResponse({'complete': complete})
+
+
+@require_http_methods(['GET', 'POST'])
+def votes(request, game_id):
+    """
+    The running vote tally of the current day.
+
+    Anyone may read the tally. Players POST a JSON body with the `target`
+    character id to vote, or a null target to withdraw their vote.
+    """
+    day = Day.objects.filter(current_day__pk=game_id).first()
+    if day is None:
+        return error_response(409, 'no day in progress')
+
+    if request.method == 'POST':
+        voter = get_player_character(request, game_id)
+        if voter is None:
+            return error_response(403, 'not playing this game')
+
+        try:
+            target_id = json.loads(request.body.decode('utf-8')).get('target')
+        except (ValueError, AttributeError):
+            return error_response(400, 'invalid JSON body')
+
+        target = None
+        if target_id is not None:
+            target = Character.objects.filter(game_id=game_id, pk=target_id).first()
+            if target is None:
+                return error_response(400, 'invalid target')
+
+        try:
+            day.vote(voter, target)
+        except InvalidVote as e:
+            return error_response(409, e.msg)
+
+    tally = [{'character': target, 'votes': count} for (target, count) in sorted(day.tally().items())]
+    return JsonResponse({'day': day.number, 'tally': tally})
+
+
+@require_GET
+def messages(request, game_id):
+    """
+    The requesting player's latest messages, newest first, rendered when read
+    """
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    receipts = (MessageRecipient.objects.filter(character=character)
+                                        .select_related('message')
+                                        .order_by('-message__pk')[:MESSAGES_PAGE_SIZE])
+    return JsonResponse({'messages': [{
+        'id': receipt.message_id,
+        'text': receipt.message.text,
+        'received_on': receipt.message.received_on.isoformat(),
+        'read': receipt.read,
+    } for receipt in receipts]})
+
+
+@require_POST
+def read_messages(request, game_id):
+    """
+    Marks the player's messages as read: the ones listed in the optional
+    `messages` JSON body, or all of them.
+    """
+    character = get_player_character(request, game_id)
+    if character is None:
+        return error_response(403, 'not playing this game')
+
+    try:
+        message_ids = json.loads(request.body.decode('utf-8') or '{}').get('messages')
+    except (ValueError, AttributeError):
+        return error_response(400, 'invalid JSON body')
+
+    return JsonResponse({'read': MessageRecipient.objects.mark_read(character, message_ids)})
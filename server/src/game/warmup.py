@@ -0,0 +1,27 @@
+"""
+Process warm-up.
+
+Imports and validates the project, and preloads the rules catalog and the game
+mode plans, so a master process can do it once and fork workers that inherit
+the result copy-on-write, instead of every worker paying for it on its first
+requests. Callers must close their database connections before forking.
+"""
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+from game.catalog import get_catalog, get_catalog_index
+from game.modes import DefaultGameMode
+
+
+MODES = (DefaultGameMode, )
+
+
+def warm_up(modes=MODES):
+    errors = [error for error in checks.run_checks() if error.is_serious()]
+    if errors:
+        raise ImproperlyConfigured('\n'.join(str(error) for error in errors))
+
+    get_catalog()
+    get_catalog_index()
+    for mode in modes:
+        mode.warm_up()
@@ -0,0 +1,161 @@
+"""
+Compact binary encoding of game snapshots.
+
+Catalog entities (rooms, weapons, abilities, personas) travel as their integer
+ids, to be resolved by clients against the catalog, and per-character state is
+packed in fixed-size structs. All integers are big endian.
+
+    header      magic, format, game, version, night, day, turn
+    rooms       count, then per room:
+                    game room, room, flags, connection count, weapon count,
+                    connected game rooms, weapons
+    characters  count, then per character:
+                    character, player, flags, game room,
+                    player name (utf-8, prefixed by its length)
+    me          character, persona, ability count, weapon count,
+                    abilities (ability, available), weapons (weapon, ammo)
+
+Missing stage numbers are sent as -1, unknown rooms as 0 and weapons without
+ammo as -1.
+"""
+import struct
+
+
+CONTENT_TYPE = 'application/vnd.mansion.snapshot+binary'
+
+MAGIC = b'MNS'
+FORMAT = 1
+
+HEADER = struct.Struct('!3sBIIbbb')
+COUNT = struct.Struct('!B')
+LENGTH = struct.Struct('!H')
+ROOM = struct.Struct('!IHBBB')
+ROOM_ID = struct.Struct('!I')
+CATALOG_ID = struct.Struct('!H')
+CHARACTER = struct.Struct('!IIBI')
+ME = struct.Struct('!IHBB')
+ABILITY = struct.Struct('!HB')
+WEAPON = struct.Struct('!Hh')
+
+ROOM_OPEN = 1
+ROOM_CLOSEABLE = 2
+
+CHARACTER_ALIVE = 1
+CHARACTER_HIDDEN = 2
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+def encode_snapshot(snapshot):
+    """
+    Packs a snapshot, as built by `game.snapshot.build_snapshot`
+    """
+    stage = snapshot['stage']
+    chunks = [HEADER.pack(MAGIC, FORMAT, snapshot['game'], snapshot['version'],
+                          _or(stage['night'], -1), _or(stage['day'], -1), _or(stage['turn'], -1))]
+
+    chunks.append(COUNT.pack(len(snapshot['rooms'])))
+    for room in snapshot['rooms']:
+        flags = (ROOM_OPEN if room['open'] else 0) | (ROOM_CLOSEABLE if room['closeable'] else 0)
+        chunks.append(ROOM.pack(room['id'], room['room'], flags,
+                                len(room['connections']), len(room['weapons'])))
+        chunks.extend(ROOM_ID.pack(connection) for connection in room['connections'])
+        chunks.extend(CATALOG_ID.pack(weapon['id']) for weapon in room['weapons'])
+
+    chunks.append(COUNT.pack(len(snapshot['characters'])))
+    for character in snapshot['characters']:
+        flags = ((CHARACTER_ALIVE if character['alive'] else 0) |
+                 (CHARACTER_HIDDEN if character['hidden'] else 0))
+        name = character['player'].encode('utf-8')
+        chunks.append(CHARACTER.pack(character['id'], character['player_id'], flags,
+                                     _or(character['room'], 0)))
+        chunks.append(LENGTH.pack(len(name)))
+        chunks.append(name)
+
+    me = snapshot['me']
+    chunks.append(ME.pack(me['character'], me['persona_id'], len(me['abilities']), len(me['weapons'])))
+    chunks.extend(ABILITY.pack(ability['id'], ability['available']) for ability in me['abilities'])
+    chunks.extend(WEAPON.pack(weapon['id'], _or(weapon['ammo'], -1)) for weapon in me['weapons'])
+
+    return b''.join(chunks)
+
+
+class _Reader:
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, layout):
+        values = layout.unpack_from(self.data, self.offset)
+        self.offset += layout.size
+        return values
+
+    def read_bytes(self, length):
+        value = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return value
+
+
+def decode_snapshot(data):
+    """
+    Unpacks a binary snapshot, keeping catalog entities as ids
+    """
+    reader = _Reader(data)
+
+    magic, fmt, game, version, night, day, turn = reader.read(HEADER)
+    if magic != MAGIC or fmt != FORMAT:
+        raise ValueError('not a format {} snapshot'.format(FORMAT))
+
+    def stage(number):
+        return None if number < 0 else number
+
+    rooms = []
+    for i in range(reader.read(COUNT)[0]):
+        room_id, room, flags, connections, weapons = reader.read(ROOM)
+        rooms.append({
+            'id': room_id,
+            'room': room,
+            'open': bool(flags & ROOM_OPEN),
+            'closeable': bool(flags & ROOM_CLOSEABLE),
+            'connections': [reader.read(ROOM_ID)[0] for j in range(connections)],
+            'weapons': [reader.read(CATALOG_ID)[0] for j in range(weapons)],
+        })
+
+    characters = []
+    for i in range(reader.read(COUNT)[0]):
+        character_id, player_id, flags, room = reader.read(CHARACTER)
+        name = reader.read_bytes(reader.read(LENGTH)[0]).decode('utf-8')
+        characters.append({
+            'id': character_id,
+            'player': name,
+            'player_id': player_id,
+            'alive': bool(flags & CHARACTER_ALIVE),
+            'hidden': bool(flags & CHARACTER_HIDDEN),
+            'room': room or None,
+        })
+
+    character, persona, abilities, weapons = reader.read(ME)
+    me = {
+        'character': character,
+        'persona_id': persona,
+        'abilities': [],
+        'weapons': [],
+    }
+    for i in range(abilities):
+        ability, available = reader.read(ABILITY)
+        me['abilities'].append({'id': ability, 'available': bool(available)})
+    for i in range(weapons):
+        weapon, ammo = reader.read(WEAPON)
+        me['weapons'].append({'id': weapon, 'ammo': None if ammo < 0 else ammo})
+
+    return {
+        'game': game,
+        'version': version,
+        'stage': {'night': stage(night), 'day': stage(day), 'turn': stage(turn)},
+        'rooms': rooms,
+        'characters': characters,
+        'me': me,
+    }
@@ -1,3 +1,4 @@
+import os
 
 # Number of nights in a game
 GAME_NUMBER_NIGHTS = 4
@@ -7,3 +8,60 @@ GAME_NUMBER_DAYS = 3
 
 # Number of actions in a night
 GAME_NIGHT_TURNS = 3
+
+# Seconds a rendered game snapshot is kept in the cache
+GAME_SNAPSHOT_CACHE_TIMEOUT = 60 * 60
+
+# Seconds the legal moves of a character are kept in the cache
+GAME_MOVES_CACHE_TIMEOUT = 10 * 60
+
+# Seconds players have to confirm their night actions, or None to wait forever
+GAME_TURN_TIMEOUT = 5 * 60
+
+# Seconds before a day ends on its own, or None to wait for the owner
+GAME_DAY_TIMEOUT = 30 * 60
+
+# Days a completed game stays available before it is archived
+GAME_ARCHIVE_AFTER = 90
+
+# Days messages are kept, by game state; None keeps them for as long as the game
+GAME_MESSAGE_RETENTION = {
+    'active': None,
+    'complete': 30,
+    'archived': 0,
+}
+
+# Databases games are spread over by id, 0 keeps every game in the default database
+GAME_SHARDS = int(os.environ.get('MANSION_SHARDS', 0))
+
+# Fraction of calls to the game entry points that are profiled, 0 disables profiling
+GAME_PROFILE_RATE = float(os.environ.get('MANSION_PROFILE_RATE', 0))
+
+# Directory profiles are written to, as collapsed stacks
+GAME_PROFILE_DIR = os.environ.get('MANSION_PROFILE_DIR',
+                                  os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                               'profiles'))
+
+# Number of profile files kept in `GAME_PROFILE_DIR`, the oldest are deleted first
+GAME_PROFILE_KEEP = 200
+
+# Frames kept in the traceback of each traced allocation
+GAME_PROFILE_FRAMES = 25
+
+# Token buckets for the action requests of each player in a game and of each game,
+# as (burst, requests per second); None lifts a limit
+GAME_THROTTLE = {
+    'player': (30, 5.0),
+    'game': (200, 50.0),
+}
+
+# Seconds a signed player token is valid for
+GAME_TOKEN_MAX_AGE = 24 * 60 * 60
+
+# Directory the spectator feeds of games are appended to, one file per game
+GAME_FEED_DIR = os.environ.get('MANSION_FEED_DIR',
+                               os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                            'feeds'))
+
+# Seconds the position of a spectator feed is kept in the cache
+GAME_FEED_CACHE_TIMEOUT = 60 * 60
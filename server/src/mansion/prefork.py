@@ -0,0 +1,87 @@
+"""
+A pre-forking WSGI server.
+
+The master process loads the application, warms it up and binds the listening
+socket; workers are forked from it and inherit everything copy-on-write. Dead
+workers are replaced until the master is asked to stop (SIGINT or SIGTERM).
+
+Workers share nothing but the socket after forking, so with more than one the
+cache must be shared too (`MANSION_MEMCACHED`, see the `CACHES` setting).
+"""
+import os
+import signal
+import socket
+
+from django.core.servers.basehttp import WSGIServer, WSGIRequestHandler
+
+
+class PreforkServer:
+
+    def __init__(self, application, host, port, workers):
+        self.application = application
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.pids = set()
+        self.running = False
+
+    def bind(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(128)
+
+    def spawn(self):
+        pid = os.fork()
+        if pid:
+            self.pids.add(pid)
+            return pid
+
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            self.work()
+        finally:
+            os._exit(0)
+
+    def work(self):
+        server = WSGIServer((self.host, self.port), WSGIRequestHandler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = self.socket
+        server.server_address = self.socket.getsockname()
+        server.server_name = socket.getfqdn(self.host)
+        server.server_port = self.port
+        server.setup_environ()
+        server.set_app(self.application)
+        server.serve_forever()
+
+    def stop(self, *args):
+        self.running = False
+        for pid in self.pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def serve(self):
+        self.bind()
+        self.running = True
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        for i in range(self.workers):
+            self.spawn()
+
+        while self.pids:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+
+            self.pids.discard(pid)
+            if self.running:
+                self.spawn()
+
+        self.socket.close()
@@ -47,8 +47,10 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'game.players.PlayerTokenMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'game.sharding.GameShardMiddleware',
 ]
 
 ROOT_URLCONF = 'mansion.urls'
@@ -75,13 +77,41 @@ WSGI_APPLICATION = 'mansion.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/1.10/ref/settings/#databases
 
+DATABASE_DIR = os.environ.get('MANSION_DATABASE_DIR', BASE_DIR)
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'NAME': os.path.join(DATABASE_DIR, 'db.sqlite3'),
     }
 }
 
+DATABASE_ROUTERS = ['game.sharding.GameShardRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/1.10/topics/cache/
+#
+# Game versions, legal moves, rate limits and spectator feeds live in the cache,
+# so processes serving the same games must share it: set MANSION_MEMCACHED to
+# the memcached servers (host:port, separated by commas) to serve from several.
+
+MEMCACHED = os.environ.get('MANSION_MEMCACHED')
+
+if MEMCACHED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': MEMCACHED.split(','),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/1.10/ref/settings/#auth-password-validators
@@ -124,6 +154,12 @@ STATIC_URL = '/static/'
 
 from mansion.game_settings import *
 
+for shard in range(GAME_SHARDS):
+    DATABASES['shard{}'.format(shard)] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(DATABASE_DIR, 'db-shard{}.sqlite3'.format(shard)),
+    }
+
 if DEBUG:
     AUTH_PASSWORD_VALIDATORS = []
     ALLOWED_HOSTS = ['127.0.0.1', ]
@@ -13,9 +13,12 @@ Including another URLconf
     1. Import the include() function: from django.conf.urls import url, include
     2. Add a URL to urlpatterns:  url(r'^blog/', include('blog.urls'))
 """
-from django.conf.urls import url
+from django.conf.urls import url, include
 from django.contrib import admin
 
-urlpatterns = [
+from game.admin import shard_sites
+
+urlpatterns = [url(r'^admin/{}/'.format(site.alias), site.urls) for site in shard_sites] + [
     url(r'^admin/', admin.site.urls),
+    url(r'^api/', include('game.urls')),
 ]
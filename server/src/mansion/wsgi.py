@@ -14,3 +14,11 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mansion.settings")
 
 application = get_wsgi_application()
+
+# Servers that load the application before forking (such as `gunicorn --preload`)
+# can have workers inherit a warmed-up process
+if os.environ.get('MANSION_WARM_UP'):
+    from django.db import connections
+    from game.warmup import warm_up
+    warm_up()
+    connections.close_all()
@@ -1,6 +1,6 @@
 
 
-from .choices_enum import ChoicesEnum
+from .choices_enum import ChoicesEnum, ChoicesEnumField
 
 
-__all__ = ['ChoicesEnum', ]
+__all__ = ['ChoicesEnum', 'ChoicesEnumField', ]
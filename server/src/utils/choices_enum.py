@@ -1,12 +1,33 @@
 
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+def _is_member(name, value):
+    return not name.startswith('_') and not callable(value) and \
+        not isinstance(value, (classmethod, staticmethod, property))
+
 
 class ChoicesEnumMeta(type):
     """
-    Metaclass that copies non underscored class attributes into _choices
+    Metaclass that collects the public class attributes of each enum, in
+    declaration order, and builds its choices and storage code maps once.
     """
+
+    @classmethod
+    def __prepare__(mcls, name, bases):
+        return OrderedDict()
+
     def __new__(mcls, name, bases, namespace):
-        mcls._choices = dict(filter(lambda i: not i[0].startswith('__'), namespace.items()))
-        return super().__new__(mcls, name, bases, namespace)
+        cls = super().__new__(mcls, name, bases, dict(namespace))
+
+        members = OrderedDict((name, value) for (name, value) in namespace.items() if _is_member(name, value))
+        cls._choices = tuple((value, name) for (name, value) in members.items())
+        cls._codes = dict((value, code) for (code, value) in enumerate(members.values(), 1))
+        cls._values = dict((code, value) for (value, code) in cls._codes.items())
+        return cls
 
 
 class ChoicesEnum(metaclass=ChoicesEnumMeta):
@@ -18,8 +39,61 @@ class ChoicesEnum(metaclass=ChoicesEnumMeta):
             BAR = 'bar_Value'
         >>> MyChoices.choices()
         (('foo_value', 'FOO'), ('bar_value', 'BAR'))
+
+    Members also get a small integer storage code, by declaration order starting
+    at 1, used by `ChoicesEnumField`. New members must be appended, and existing
+    members never reordered or removed, so stored codes keep their meaning.
     """
 
     @classmethod
     def choices(cls):
-        return tuple((value, name) for (name, value) in cls._choices.items())
+        return cls._choices
+
+    @classmethod
+    def values(cls):
+        return tuple(value for (value, name) in cls._choices)
+
+    @classmethod
+    def to_code(cls, value):
+        return cls._codes[value]
+
+    @classmethod
+    def from_code(cls, code):
+        return cls._values[code]
+
+
+class ChoicesEnumField(models.PositiveSmallIntegerField):
+    """
+    Stores the values of a `ChoicesEnum` as their small integer codes.
+
+    Model instances, queries, forms and fixtures keep using the enum values;
+    only the database column holds codes.
+    """
+
+    def __init__(self, enum, *args, **kwargs):
+        self.enum = enum
+        kwargs['choices'] = enum.choices()
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        del kwargs['choices']
+        kwargs['enum'] = self.enum
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection, context):
+        return None if value is None else self.enum.from_code(value)
+
+    def to_python(self, value):
+        if value is None or value in self.enum._codes:
+            return value
+        try:
+            return self.enum.from_code(int(value))
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError('"{}" is not a valid {}'.format(value, self.enum.__name__), code='invalid')
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return None
+        return self.enum.to_code(self.to_python(value))